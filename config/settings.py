@@ -10,8 +10,13 @@ HONEYPOT_CONFIG = {
         'port': 2222,  
         'banner': 'SSH-2.0-OpenSSH_8.2p1 Ubuntu-4ubuntu0.5',
         'host_key': BASE_DIR / 'keys' / 'ssh_host_key',
+        # sunulan host key türleri; listeden çıkarılan tür sunulmaz. Ed25519 ve ECDSA imzası RSA'dan
+        # çok daha ucuzdur. Eksik anahtarlar açılışta thread'de veya "python -m core.host_keys" ile üretilir
+        'host_key_types': ['ssh-ed25519', 'ecdsa-sha2-nistp256', 'ssh-rsa'],
+        'rsa_key_size': 2048,
         'max_connections': 100,
         'connection_timeout': 300,  
+        'max_session_duration': 3600,
     },
     
     'telnet': {
@@ -21,6 +26,8 @@ HONEYPOT_CONFIG = {
         'banner': 'Ubuntu 20.04.5 LTS',
         'max_connections': 100,
         'connection_timeout': 300,  
+        'login_timeout': 30,
+        'max_session_duration': 3600,
     },
     
     'shell': {
@@ -29,6 +36,10 @@ HONEYPOT_CONFIG = {
         'initial_path': '/home',
         'command_delay': 0.1,  
         'max_command_length': 1000,
+        # SSH oturumunda sırada bekleyebilecek en fazla komut satırı; dolunca okuma durdurulur
+        'max_pending_commands': 16,
+        # isteğe bağlı JSON imaj: {"directories": {yol: [isimler]}, "files": {yol: içerik}}
+        'filesystem_image': None,
     },
     
     'logging': {
@@ -38,17 +49,109 @@ HONEYPOT_CONFIG = {
         'backup_count': 5,
         'log_format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         'date_format': '%Y-%m-%d %H:%M:%S',
+        'queue': {
+            'enabled': True,
+            'max_size': 10000,
+            'overflow_policy': 'drop_oldest',  # block, drop_oldest, sample
+            'sample_every': 10,  # sample modunda kuyruk dolarken her N INFO kaydından biri tutulur
+            'batch_size': 256,
+            'flush_interval': 0.5,
+        },
+        # dolan log dosyaları arka planda bloklar halinde sıkıştırılır ve yanına zaman aralığı /
+        # IP konumları dizini yazılır; aynı disk alanında backup_count'un ~10 katı parça saklanır
+        'archive': {
+            'enabled': True,
+            'compression': 'gzip',  # gzip, zstd (zstandard paketi gerekir)
+            'compression_level': 6,
+            'block_size': 1024 * 1024,  # bağımsız sıkıştırılan blok boyutu; aramalar blok düzeyinde atlar
+            'retention_segments': 50,  # log dosyası başına saklanan arşiv parçası
+            'queue_size': 1000,
+        },
+        # client_ip alanı olan kayıtlara ASN/ülke eklenir; veritabanı yerel dosyadır, ağ erişimi gerekmez.
+        # .mmdb dosyaları maxminddb paketi ile, diğerleri "python -m utils.geoip kaynak.tsv" ile derlenir
+        'enrichment': {
+            'enabled': True,
+            'database': BASE_DIR / 'data' / 'ipasn.bin',
+            'cache_size': 65536,
+        },
     },
     
     'security': {
         'max_login_attempts': 3,
+        'max_total_connections': 150,  # tüm protokoller toplamı
+        'max_concurrent_per_ip': 10,  # bir IP'den aynı anda açık bağlantı sayısı
         'rate_limit': {
             'enabled': True,
             'max_connections_per_ip': 5,
             'time_window': 60,  
+            'max_tracked_ips': 100000,  # en uzun süredir görülmeyen IP'ler bu sınırın üzerinde atılır
         },
-        'blocked_ips': [],  
+        'blocked_ips': [],  # tek IP veya CIDR önekleri ("203.0.113.0/24", "2001:db8::/32")
         'allowed_ips': [],   #if its empty everybody can try
+        # satır başına bir önek içeren besleme dosyaları ("önek ; açıklama" ve # yorumları desteklenir)
+        'blocklist_files': [],
+        'allowlist_files': [],
+        # derlenmiş listeler burada önbelleklenir; kaynak dosyalar değişmedikçe açılışta ayrıştırma yapılmaz
+        'ip_list_cache_dir': BASE_DIR / 'data',
+        # failure_window içinde max_login_attempts başarısız girişten sonra IP ban_duration süre yasaklanır
+        'auto_ban': {
+            'enabled': True,
+            'failure_window': 600,
+            'ban_duration': 3600,
+            'max_bans': 100000,  # aşılırsa süresi en yakın biten yasak atılır
+            'persist_path': BASE_DIR / 'data' / 'bans.bin',  # None ise yasaklar diske yazılmaz
+        },
+        # boşta kalma denetimi için ortak zamanlama çarkı (tick saniye, yuva sayısı)
+        'timer_wheel': {
+            'tick': 1.0,
+            'slots': 512,
+        },
+        # reddedilen kaynakları hemen düşürmek yerine oyalar: Telnet istemi bayt bayt,
+        # SSH sürüm satırından önce bitmeyen satırlar (RFC 4253 4.2) gönderilir
+        'tarpit': {
+            'enabled': False,
+            'reasons': ['blocked', 'rate_limit'],
+            'interval': 2.0,  # tutulan her bağlantıya bir bayt/satır gönderme aralığı
+            'max_connections': 4096,
+            'max_hold': 3600,
+        },
+    },
+    
+    # Prometheus metin biçiminde yerel metrik uç noktası (GET /metrics);
+    # çok süreçli modda worker N, port + N üzerinden dinler
+    'metrics': {
+        'enabled': True,
+        'host': '127.0.0.1',
+        'port': 9108,
+    },
+    
+    'workers': {
+        'count': 1,  # 1'den büyükse SO_REUSEPORT ile çok süreçli mod
+        'rate_table_slots': 1 << 18,  # paylaşımlı rate limit tablosu (slot başına 8 bayt)
+        'restart_delay': 1.0,
+    },
+    
+    # her oturumun girdi/çıktısı zaman damgalı, sıkıştırılmış ikili kayıt olarak saklanır
+    # oynatma: python -m utils.session_recorder replay <dosya>
+    'recording': {
+        'enabled': True,
+        'directory': BASE_DIR / 'recordings',
+        'chunk_size': 64 * 1024,  # oturum tamponu bu boyuta ulaşınca sıkıştırılıp yazılır
+        'flush_interval': 30,  # uzun oturumlarda tampon en geç bu kadar saniyede bir yazılır
+        'compression_level': 6,
+        'queue_size': 10000,
+    },
+    
+    # panolar için en sık IP / kullanıcı adı / parola / komut istatistikleri; bellek sabittir
+    'stats': {
+        'enabled': True,
+        'snapshot_path': BASE_DIR / 'data' / 'attack_stats.json',
+        'snapshot_interval': 60,
+        'top_n': 50,
+        'capacity': 1000,  # Space-Saving ile alan başına izlenen değer sayısı
+        'sketch_width': 4096,  # Count-Min: genişlik x derinlik x 4 bayt
+        'sketch_depth': 4,
+        'hll_precision': 14,  # HyperLogLog: 2^14 bayt, ~%0.8 hata
     },
     
     'database': {
@@ -60,6 +163,9 @@ HONEYPOT_CONFIG = {
         'name': 'honeypot',
         'user': 'honeypot',
         'password': 'password',
+        'batch_size': 500,
+        'flush_interval': 1.0,
+        'queue_size': 50000,
     }
 }
 
@@ -76,13 +182,16 @@ FAKE_USERS = {
     'service': 'service123'
 }
 
+# '/' ile biten isimler dizindir
 FAKE_FILESYSTEM = {
-    '/': ['bin', 'boot', 'dev', 'etc', 'home', 'lib', 'media', 'mnt', 'opt', 'proc', 'root', 'run', 'sbin', 'srv', 'sys', 'tmp', 'usr', 'var'],
-    '/home': ['user', 'admin', 'guest'],
-    '/etc': ['passwd', 'shadow', 'hosts', 'fstab', 'crontab', 'ssh'],
-    '/var': ['log', 'www', 'lib', 'tmp'],
+    '/': ['bin/', 'boot/', 'dev/', 'etc/', 'home/', 'lib/', 'media/', 'mnt/', 'opt/', 'proc/', 'root/', 'run/', 'sbin/', 'srv/', 'sys/', 'tmp/', 'usr/', 'var/'],
+    '/home': ['user/', 'admin/', 'guest/'],
+    '/home/user': ['Documents/', 'Downloads/', 'Music/', 'Pictures/', 'Videos/', '.bashrc', '.profile'],
+    '/etc': ['passwd', 'shadow', 'hosts', 'fstab', 'crontab', 'ssh/'],
+    '/etc/ssh': ['sshd_config', 'ssh_config'],
+    '/var': ['log/', 'www/', 'lib/', 'tmp/'],
     '/var/log': ['auth.log', 'syslog', 'messages', 'secure'],
-    '/usr': ['bin', 'lib', 'local', 'share'],
+    '/usr': ['bin/', 'lib/', 'local/', 'share/'],
     '/usr/bin': ['ls', 'cat', 'grep', 'ps', 'top', 'netstat', 'wget', 'curl'],
     '/bin': ['sh', 'bash', 'ls', 'cat', 'cp', 'mv', 'rm', 'mkdir', 'rmdir'],
     '/sbin': ['ifconfig', 'iptables', 'service', 'systemctl'],
@@ -118,6 +227,14 @@ bin:x:2:2:bin:/bin:/usr/sbin/nologin
 user:x:1000:1000:User:/home/user:/bin/bash''',
 }
 
+FAKE_FILE_CONTENTS = {
+    '/etc/passwd': FAKE_COMMAND_OUTPUTS['cat /etc/passwd'],
+    '/etc/hosts': '127.0.0.1\tlocalhost\n127.0.1.1\tserver01',
+    '/etc/hostname': 'server01',
+    '/home/user/.bashrc': '# ~/.bashrc: executed by bash(1) for non-login shells.\nexport HISTSIZE=1000',
+    '/home/user/.profile': '# ~/.profile: executed by the command interpreter for login shells.',
+}
+
 ENVIRONMENT_VARS = {
     'PATH': '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin',
     'HOME': '/home/user',
@@ -0,0 +1,325 @@
+import posixpath
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from config.settings import FAKE_COMMAND_OUTPUTS
+from core.response_cache import ResponseCache, frame_output
+
+
+# run() ya str döner ya da gönderilmeye hazır, çerçevelenmiş bayt dizisi
+CommandOutput = Union[str, bytes]
+
+response_cache = ResponseCache(FAKE_COMMAND_OUTPUTS)
+
+
+class Command:
+    
+    names: Tuple[str, ...] = ()
+    # builtin komutlar FAKE_COMMAND_OUTPUTS içindeki aynı isimli sabit çıktılardan önce gelir
+    builtin = False
+    
+    def run(self, shell, args: list, full_command: str) -> CommandOutput:
+        raise NotImplementedError
+
+
+class StaticOutputCommand(Command):
+    
+    def __init__(self, names: Tuple[str, ...], output_key: str):
+        self.names = names
+        self.output_key = output_key
+        self.response = response_cache.get(output_key)
+        
+    def run(self, shell, args, full_command):
+        return self.response
+
+
+class ListCommand(Command):
+    names = ('ls',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        flags = ''.join(arg[1:] for arg in args if arg.startswith('-'))
+        paths = [arg for arg in args if not arg.startswith('-')]
+        path = paths[0] if paths else shell.current_path
+        resolved_path = shell.resolve_path(path)
+        
+        node = shell.fs.lookup(resolved_path)
+        if node is None:
+            return f"ls: cannot access '{path}': No such file or directory"
+            
+        entries = shell.fs.listdir(resolved_path) if node.is_dir else [node]
+        if 'a' not in flags:
+            entries = [entry for entry in entries if not entry.name.startswith('.')]
+            
+        rows = [(entry.name, entry) for entry in entries]
+        if 'a' in flags and node.is_dir:
+            parent = shell.fs.lookup(posixpath.dirname(resolved_path))
+            rows = [('.', node), ('..', parent)] + rows
+            
+        if 'l' not in flags:
+            return '  '.join(name for name, _ in rows)
+            
+        lines = [f"total {len(rows) * 4}"]
+        for name, entry in rows:
+            date = time.strftime('%b %d %H:%M', time.localtime(entry.mtime))
+            links = 2 if entry.is_dir else 1
+            lines.append(f"{entry.mode} {links} {entry.owner} {entry.owner} {entry.size:>5} {date} {name}")
+        return '\n'.join(lines)
+
+
+class ChangeDirCommand(Command):
+    names = ('cd',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        if not args:
+            shell.current_path = shell.env_vars['HOME']
+            return ""
+        new_path = shell.resolve_path(args[0])
+        node = shell.fs.lookup(new_path)
+        if node is None:
+            return f"cd: {args[0]}: No such file or directory"
+        if not node.is_dir:
+            return f"cd: {args[0]}: Not a directory"
+        shell.current_path = new_path
+        shell.env_vars['PWD'] = new_path
+        return ""
+
+
+class PwdCommand(Command):
+    names = ('pwd',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        return shell.current_path
+
+
+class WhoamiCommand(Command):
+    names = ('whoami',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        return shell.username
+
+
+class CatCommand(Command):
+    names = ('cat',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        if not args:
+            return "cat: missing file operand"
+            
+        outputs = []
+        for filename in args:
+            node = shell.fs.lookup(shell.resolve_path(filename))
+            if node is None:
+                outputs.append(f"cat: {filename}: No such file or directory")
+            elif node.is_dir:
+                outputs.append(f"cat: {filename}: Is a directory")
+            elif len(args) == 1:
+                return node.response if node.content else ""
+            else:
+                outputs.append(node.content.rstrip('\n'))
+        return '\n'.join(outputs)
+
+
+class EchoCommand(Command):
+    names = ('echo',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        for index, arg in enumerate(args):
+            if not arg.startswith('>'):
+                continue
+                
+            append = arg.startswith('>>')
+            target = arg[2 if append else 1:]
+            if not target and index + 1 < len(args):
+                target = args[index + 1]
+            if not target:
+                return "bash: syntax error near unexpected token `newline'"
+                
+            text = ' '.join(args[:index]) + '\n'
+            error = shell.fs.write_file(shell.resolve_path(target), text, append)
+            return f"bash: {target}: {error}" if error else ""
+            
+        return ' '.join(args)
+
+
+class MkdirCommand(Command):
+    names = ('mkdir',)
+    
+    def run(self, shell, args, full_command):
+        flags = ''.join(arg[1:] for arg in args if arg.startswith('-'))
+        paths = [arg for arg in args if not arg.startswith('-')]
+        if not paths:
+            return "mkdir: missing operand"
+            
+        outputs = []
+        for path in paths:
+            error = shell.fs.mkdir(shell.resolve_path(path), parents='p' in flags)
+            if error:
+                outputs.append(f"mkdir: cannot create directory '{path}': {error}")
+        return '\n'.join(outputs)
+
+
+class TouchCommand(Command):
+    names = ('touch',)
+    
+    def run(self, shell, args, full_command):
+        if not args:
+            return "touch: missing file operand"
+        outputs = []
+        for path in (arg for arg in args if not arg.startswith('-')):
+            error = shell.fs.touch(shell.resolve_path(path))
+            if error:
+                outputs.append(f"touch: cannot touch '{path}': {error}")
+        return '\n'.join(outputs)
+
+
+class HistoryCommand(Command):
+    names = ('history',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        output = []
+        for i, cmd in enumerate(shell.command_history[-20:], 1):
+            output.append(f"  {i}  {cmd}")
+        return '\n'.join(output)
+
+
+class EnvCommand(Command):
+    names = ('env',)
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        return '\n'.join(f"{key}={value}" for key, value in shell.env_vars.items())
+
+
+class ClearCommand(Command):
+    names = ('clear',)
+    builtin = True
+    response = frame_output('\033[2J\033[H')
+    
+    def run(self, shell, args, full_command):
+        return self.response
+
+
+class ExitCommand(Command):
+    names = ('exit', 'logout')
+    builtin = True
+    
+    def run(self, shell, args, full_command):
+        return "EXIT_SHELL"
+
+
+class RemoveCommand(Command):
+    names = ('rm', 'rmdir', 'del', 'delete')
+    
+    def run(self, shell, args, full_command):
+        shell.logger.warning(f"TEHLIKELI KOMUT - IP: {shell.client_ip}, Cmd: {full_command}")
+        
+        command = full_command.split()[0]
+        flags = ''.join(arg[1:] for arg in args if arg.startswith('-'))
+        paths = [arg for arg in args if not arg.startswith('-')]
+        if not paths:
+            return f"{command}: missing operand"
+            
+        outputs = []
+        for path in paths:
+            error = shell.fs.remove(
+                shell.resolve_path(path),
+                recursive='r' in flags or 'R' in flags,
+                directory=command == 'rmdir'
+            )
+            if error and not ('f' in flags and error == 'No such file or directory'):
+                if command == 'rmdir':
+                    outputs.append(f"rmdir: failed to remove '{path}': {error}")
+                else:
+                    outputs.append(f"rm: cannot remove '{path}': {error}")
+        return '\n'.join(outputs)
+
+
+class DownloadCommand(Command):
+    names = ('wget', 'curl', 'download')
+    
+    def run(self, shell, args, full_command):
+        shell.logger.warning(f"İNDİRME KOMUTU - IP: {shell.client_ip}, Cmd: {full_command}")
+        return "wget: unable to resolve host address"
+
+
+class NetworkCommand(Command):
+    names = ('nc', 'netcat', 'ncat')
+    
+    def run(self, shell, args, full_command):
+        shell.logger.warning(f"NETWORK KOMUT - IP: {shell.client_ip}, Cmd: {full_command}")
+        return "nc: connection refused"
+
+
+class ScriptCommand(Command):
+    names = ('python', 'python3', 'perl', 'php', 'bash', 'sh')
+    
+    def run(self, shell, args, full_command):
+        shell.logger.warning(f"SCRIPT ÇALIŞTIRMA - IP: {shell.client_ip}, Cmd: {full_command}")
+        return f"{full_command.split()[0]}: command not found"
+
+
+class CommandRegistry:
+    
+    def __init__(self):
+        self.commands: Dict[str, Command] = {}
+        # tam komut satırı -> kodlanmış sabit çıktı (ör. 'ps aux'); komut adına göre aramadan önce bakılır
+        self.static_outputs: Dict[str, bytes] = {}
+        
+    def register(self, command: Command):
+        for name in command.names:
+            self.commands[name] = command
+            
+        if command.builtin:
+            self.static_outputs = {
+                line: output for line, output in self.static_outputs.items()
+                if line.split()[0] not in command.names
+            }
+            
+    def index_static_outputs(self, outputs: Dict[str, str]):
+        for line, output in outputs.items():
+            handler = self.commands.get(line.split()[0])
+            if handler and handler.builtin:
+                continue
+            self.static_outputs[line] = frame_output(output)
+            
+    def get(self, name: str) -> Optional[Command]:
+        return self.commands.get(name)
+        
+    def dispatch(self, shell, command: str, args: list, full_command: str) -> CommandOutput:
+        output = self.static_outputs.get(full_command)
+        if output is not None:
+            return output
+            
+        handler = self.commands.get(command)
+        if handler is None:
+            return f"{command}: command not found"
+        return handler.run(shell, args, full_command)
+
+
+def build_default_registry() -> CommandRegistry:
+    registry = CommandRegistry()
+    
+    for command_class in (ListCommand, ChangeDirCommand, PwdCommand, WhoamiCommand, CatCommand,
+                          EchoCommand, MkdirCommand, TouchCommand, HistoryCommand, EnvCommand,
+                          ClearCommand, ExitCommand, RemoveCommand, DownloadCommand, NetworkCommand, ScriptCommand):
+        registry.register(command_class())
+        
+    registry.register(StaticOutputCommand(('ps', 'top', 'htop'), 'ps aux'))
+    registry.register(StaticOutputCommand(('netstat', 'ss'), 'netstat -an'))
+    registry.register(StaticOutputCommand(('ifconfig', 'ip'), 'ifconfig'))
+    registry.register(StaticOutputCommand(('df', 'du'), 'df -h'))
+    registry.register(StaticOutputCommand(('free', 'vmstat'), 'free -m'))
+    registry.register(StaticOutputCommand(('uname',), 'uname -a'))
+    
+    registry.index_static_outputs(FAKE_COMMAND_OUTPUTS)
+    return registry
+
+
+command_registry = build_default_registry()
@@ -1,34 +1,74 @@
 import asyncio
+import posixpath
 import time
-import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from config.settings import (
-    HONEYPOT_CONFIG, FAKE_FILESYSTEM, FAKE_COMMAND_OUTPUTS, 
-    ENVIRONMENT_VARS
+    HONEYPOT_CONFIG, ENVIRONMENT_VARS
 )
-from utils.logger import setup_logger
+from core.commands import CommandRegistry, command_registry
+from core.response_cache import ByteTemplate, frame_output
+from core.virtual_fs import SessionFilesystem, base_filesystem
+from utils.attack_stats import attack_stats
+from utils.event_store import event_store
+from utils.geoip import enrich_ip
+from utils.logger import get_session_logger, new_session_id
+from utils.metrics import command_latency, commands_total
+from utils.session_recorder import session_recorder
 from utils.session_manager import SessionManager
 
 
+GOODBYE_MESSAGE = b"\r\nGoodbye!\r\n"
+
+# hostname sabit olduğu için başlangıçta yerleştirilir; oturumda kullanıcı, cd ile yol değişir
+PROMPT_TEMPLATE = ByteTemplate(
+    HONEYPOT_CONFIG['shell']['prompt_format'],
+    hostname=HONEYPOT_CONFIG['shell']['hostname']
+)
+
+
+def format_origin(origin: Optional[Dict]) -> str:
+    # yalnızca ülke içeren veritabanlarında ASN ve AS adı boş gelir; eksik alanlar yazılmaz
+    if not origin:
+        return ""
+    parts = []
+    asn = f"AS{origin['asn']}" if origin.get('asn') else ""
+    as_text = f"{asn} {origin.get('as_org') or ''}".strip()
+    if as_text:
+        parts.append(f"ASN: {as_text}")
+    if origin.get('country'):
+        parts.append(f"Ülke: {origin['country']}")
+    return "".join(f", {part}" for part in parts)
+
+
 class FakeShell:
     
-    def __init__(self, client_ip: str, protocol: str, username: str, session_manager: SessionManager):
+    def __init__(self, client_ip: str, protocol: str, username: str, session_manager: SessionManager,
+                 session_id: Optional[str] = None, commands: Optional[CommandRegistry] = None):
         self.client_ip = client_ip
         self.protocol = protocol
         self.username = username
         self.session_manager = session_manager
-        self.logger = setup_logger(f'shell_{protocol.lower()}_{client_ip}')
+        self.session_id = session_id or new_session_id()
+        self.logger = get_session_logger('shell', client_ip=client_ip, protocol=protocol,
+                                         username=username, session_id=self.session_id)
         
         self.current_path = ENVIRONMENT_VARS['HOME']
         self.hostname = HONEYPOT_CONFIG['shell']['hostname']
         self.env_vars = ENVIRONMENT_VARS.copy()
         self.command_history = []
         self.session_start_time = time.time()
+        self.session_ended = False
+        self.commands = commands or command_registry
+        self.fs = SessionFilesystem(base_filesystem, username)
         
+        self.prompt_template = PROMPT_TEMPLATE.bind(user=username)
+        self._prompt_path = None
+        self._prompt_bytes = b''
+        
+        # SSH kanalı veya Telnet transport'u; ikisi de bloklamayan write() sunar
         self.channel = None  
-        self.reader = None   
-        self.writer = None  
+        self.recording = None
         
     def get_prompt(self) -> str:
         path_display = self.current_path.replace(self.env_vars['HOME'], '~')
@@ -38,15 +78,27 @@ class FakeShell:
             path=path_display
         )
         
-    async def send_output(self, data: str):
-        if self.protocol == 'SSH' and self.channel:
-            self.channel.write(data)
-        elif self.protocol == 'Telnet' and self.writer:
+    def get_prompt_bytes(self) -> bytes:
+        if self.current_path != self._prompt_path:
+            path_display = self.current_path.replace(self.env_vars['HOME'], '~')
+            self._prompt_bytes = self.prompt_template.render(path=path_display)
+            self._prompt_path = self.current_path
+        return self._prompt_bytes
+        
+    def write(self, data: bytes):
+        if self.recording:
+            self.recording.output(data)
+        self.channel.write(data)
+        
+    async def send_output(self, data: Union[str, bytes]):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+            
+        if self.channel:
             try:
-                self.writer.write(data.encode('utf-8'))
-                await self.writer.drain()
+                self.write(data)
             except Exception as e:
-                self.logger.error(f"Telnet çıktı gönderme hatası: {e}")
+                self.logger.error(f"{self.protocol} çıktı gönderme hatası: {e}")
                 
     def parse_command(self, command_line: str) -> tuple:
         parts = command_line.strip().split()
@@ -55,140 +107,44 @@ class FakeShell:
         return parts[0], parts[1:]
         
     def resolve_path(self, path: str) -> str:
-        if path.startswith('/'):
-            return path
-        elif path == '~':
-            return self.env_vars['HOME']
+        if path == '~':
+            path = self.env_vars['HOME']
         elif path.startswith('~/'):
-            return path.replace('~', self.env_vars['HOME'])
-        elif path == '..':
-            if self.current_path == '/':
-                return '/'
-            return '/'.join(self.current_path.split('/')[:-1]) or '/'
-        elif path == '.':
-            return self.current_path
-        else:
-            return f"{self.current_path.rstrip('/')}/{path}"
-            
+            path = self.env_vars['HOME'] + path[1:]
+        elif not path.startswith('/'):
+            path = posixpath.join(self.current_path, path)
+        return SessionFilesystem.normalize(path)
+        
     def list_directory(self, path: str) -> List[str]:
-        path = path.rstrip('/')
-        if path == '':
-            path = '/'
-            
-        if path in FAKE_FILESYSTEM:
-            return FAKE_FILESYSTEM[path]
-        else:
-            fake_files = ['file1.txt', 'file2.log', 'data.conf', 'backup.tar.gz']
-            return random.sample(fake_files, random.randint(1, len(fake_files)))
+        entries = self.fs.listdir(path)
+        if entries is None:
+            return []
+        return [entry.name for entry in entries]
             
-    async def execute_command(self, command: str, args: List[str]) -> str:
+    async def execute_command(self, command: str, args: List[str]) -> Union[str, bytes]:
         full_command = f"{command} {' '.join(args)}".strip()
         
         await asyncio.sleep(HONEYPOT_CONFIG['shell']['command_delay'])
+        started = time.perf_counter()
         
         self.logger.info(f"Komut çalıştırıldı - IP: {self.client_ip}, User: {self.username}, Cmd: {full_command}")
+        event_store.record_command(self.client_ip, self.protocol, self.username, self.session_id, full_command)
+        attack_stats.record_command(self.client_ip, full_command)
         
-        if command == 'ls':
-            path = args[0] if args else self.current_path
-            resolved_path = self.resolve_path(path)
-            files = self.list_directory(resolved_path)
-            return '  '.join(files)
-            
-        elif command == 'cd':
-            if not args:
-                self.current_path = self.env_vars['HOME']
-                return ""
-            new_path = self.resolve_path(args[0])
-            if new_path in FAKE_FILESYSTEM or new_path.startswith('/'):
-                self.current_path = new_path
-                self.env_vars['PWD'] = new_path
-                return ""
-            else:
-                return f"cd: {args[0]}: No such file or directory"
-                
-        elif command == 'pwd':
-            return self.current_path
-            
-        elif command == 'whoami':
-            return self.username
-            
-        elif command == 'cat':
-            if not args:
-                return "cat: missing file operand"
-            filename = args[0]
-            if filename in ['/etc/passwd', 'passwd']:
-                return FAKE_COMMAND_OUTPUTS['cat /etc/passwd']
-            elif filename.endswith('.txt'):
-                return f"This is the content of {filename}\nSample text file content."
-            else:
-                return f"cat: {filename}: No such file or directory"
-                
-        elif command == 'echo':
-            return ' '.join(args)
-            
-        elif command == 'history':
-            output = []
-            for i, cmd in enumerate(self.command_history[-20:], 1):
-                output.append(f"  {i}  {cmd}")
-            return '\n'.join(output)
-            
-        elif command == 'env':
-            output = []
-            for key, value in self.env_vars.items():
-                output.append(f"{key}={value}")
-            return '\n'.join(output)
-            
-        elif command == 'clear':
-            return '\033[2J\033[H' 
-            
-        elif command == 'exit' or command == 'logout':
-            return "EXIT_SHELL"
-            
-        elif full_command in FAKE_COMMAND_OUTPUTS:
-            return FAKE_COMMAND_OUTPUTS[full_command]
-            
-        elif command in ['ps', 'top', 'htop']:
-            return FAKE_COMMAND_OUTPUTS['ps aux']
-            
-        elif command in ['netstat', 'ss']:
-            return FAKE_COMMAND_OUTPUTS['netstat -an']
-            
-        elif command in ['ifconfig', 'ip']:
-            return FAKE_COMMAND_OUTPUTS['ifconfig']
-            
-        elif command in ['df', 'du']:
-            return FAKE_COMMAND_OUTPUTS['df -h']
-            
-        elif command in ['free', 'vmstat']:
-            return FAKE_COMMAND_OUTPUTS['free -m']
-            
-        elif command in ['uname']:
-            return FAKE_COMMAND_OUTPUTS['uname -a']
-            
-        elif command in ['rm', 'rmdir', 'del', 'delete']:
-            self.logger.warning(f"TEHLIKELI KOMUT - IP: {self.client_ip}, Cmd: {full_command}")
-            if args and '-rf' in ' '.join(args):
-                return f"rm: cannot remove '{args[-1]}': Operation not permitted"
-            return f"rm: cannot remove '{args[0] if args else 'file'}': No such file or directory"
-            
-        elif command in ['wget', 'curl', 'download']:
-            self.logger.warning(f"İNDİRME KOMUTU - IP: {self.client_ip}, Cmd: {full_command}")
-            return f"wget: unable to resolve host address"
-            
-        elif command in ['nc', 'netcat', 'ncat']:
-            self.logger.warning(f"NETWORK KOMUT - IP: {self.client_ip}, Cmd: {full_command}")
-            return f"nc: connection refused"
-            
-        elif command in ['python', 'python3', 'perl', 'php', 'bash', 'sh']:
-            self.logger.warning(f"SCRIPT ÇALIŞTIRMA - IP: {self.client_ip}, Cmd: {full_command}")
-            return f"{command}: command not found"
-            
-        else:
-            return f"{command}: command not found"
+        output = self.commands.dispatch(self, command, args, full_command)
+        
+        # etiket yalnızca tanımlı komut adlarından oluşur; saldırgan girdisi seri sayısını büyütmez
+        commands_total.inc(self.protocol)
+        command_latency.observe(time.perf_counter() - started, command if self.commands.get(command) else 'other')
+        return output
             
     async def handle_input(self, data: str):
         """Girdi işle"""
-        if not data:
+        if self.recording:
+            self.recording.input(data)
+            
+        if not data or not data.strip():
+            await self.send_output(self.get_prompt_bytes())
             return
             
         command_line = data.strip()
@@ -202,67 +158,65 @@ class FakeShell:
                 output = await self.execute_command(command, args)
                 
                 if output == "EXIT_SHELL":
-                    await self.send_output("\r\nGoodbye!\r\n")
+                    await self.send_output(GOODBYE_MESSAGE)
                     await self.end_session()
                     return
                     
-                if output:
-                    await self.send_output(f"\r\n{output}\r\n")
+                if isinstance(output, bytes):
+                    await self.send_output(output)
+                elif output:
+                    await self.send_output(frame_output(output))
                     
             except Exception as e:
                 self.logger.error(f"Komut çalıştırma hatası: {e}")
-                await self.send_output(f"\r\nError: {str(e)}\r\n")
+                await self.send_output(frame_output(f"Error: {e}"))
                 
-        await self.send_output(self.get_prompt())
+        await self.send_output(self.get_prompt_bytes())
+        
+    def start_recording(self, width: int = 80, height: int = 24):
+        self.recording = session_recorder.open(self.session_id, self.client_ip, self.protocol,
+                                               self.username, width, height)
         
     def start_session(self, channel):
         self.channel = channel
         self.logger.info(f"Shell oturumu başlatıldı - IP: {self.client_ip}, Protocol: {self.protocol}")
         
+        width, height = channel.get_terminal_size()[:2]
+        self.start_recording(width or 80, height or 24)
+        
         welcome_msg = f"Last login: {time.strftime('%a %b %d %H:%M:%S %Y')}\r\n"
-        self.channel.write(welcome_msg)
-        self.channel.write(self.get_prompt())
+        self.write(welcome_msg.encode('utf-8'))
+        self.write(self.get_prompt_bytes())
         
-    async def start_telnet_session(self, reader, writer):
-        self.reader = reader
-        self.writer = writer
+    def start_telnet_session(self, transport):
+        # satırlar TelnetSession protokolü tarafından handle_input'a iletilir
+        self.channel = transport
         self.logger.info(f"Shell oturumu başlatıldı - IP: {self.client_ip}, Protocol: {self.protocol}")
         
-        await self.send_output(self.get_prompt())
-        
-        try:
-            while True:
-                try:
-                    data = await asyncio.wait_for(self.reader.readline(), timeout=300)
-                    if not data:
-                        break
-                    command_line = data.decode('utf-8').strip()
-                    await self.handle_input(command_line)
-                except asyncio.TimeoutError:
-                    self.logger.info(f"Telnet oturum zaman aşımı - IP: {self.client_ip}")
-                    break
-                except Exception as e:
-                    self.logger.error(f"Telnet input hatası: {e}")
-                    break
-        finally:
-            await self.end_session()
+        self.start_recording()
+        self.write(self.get_prompt_bytes())
             
     async def end_session(self):
+        # exit komutu ve bağlantı kapanışı aynı oturumu iki kez kapatabilir
+        if self.session_ended:
+            return
+        self.session_ended = True
+        
         session_duration = time.time() - self.session_start_time
         
-        self.logger.info(f"Shell oturumu sonlandı - IP: {self.client_ip}, Süre: {session_duration:.2f}s, Komut sayısı: {len(self.command_history)}")
+        origin_text = format_origin(enrich_ip(self.client_ip))
+        self.logger.info(f"Shell oturumu sonlandı - IP: {self.client_ip}{origin_text}, Süre: {session_duration:.2f}s, Komut sayısı: {len(self.command_history)}")
+        event_store.record_session(self.client_ip, self.protocol, self.username, self.session_id,
+                                   session_duration, len(self.command_history))
         
+        if self.recording:
+            self.recording.close()
+            
         if self.command_history:
             self.logger.info(f"Komut özeti - IP: {self.client_ip}, Komutlar: {', '.join(self.command_history[:10])}")
             
-        if self.protocol == 'SSH' and self.channel:
+        if self.channel:
             try:
                 self.channel.close()
-            except:
-                pass
-        elif self.protocol == 'Telnet' and self.writer:
-            try:
-                self.writer.close()
-                await self.writer.wait_closed()
             except:
                 pass
\ No newline at end of file
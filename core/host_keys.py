@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import asyncssh
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+# RSA anahtarı eski kurulumlarla aynı dosyada kalır; parmak izi değişmez
+KEY_FILE_NAMES = {
+    'ssh-ed25519': 'ssh_host_ed25519_key',
+    'ecdsa-sha2-nistp256': 'ssh_host_ecdsa_key',
+    'ssh-rsa': None,
+}
+
+logger = setup_logger('host_keys')
+
+
+def host_key_path(algorithm: str) -> Path:
+    base_path = HONEYPOT_CONFIG['ssh']['host_key']
+    file_name = KEY_FILE_NAMES[algorithm]
+    return base_path if file_name is None else base_path.parent / file_name
+
+
+def generate_host_key(algorithm: str, path: Path):
+    logger.info(f"SSH host key oluşturuluyor - Tür: {algorithm}")
+    
+    if algorithm == 'ssh-rsa':
+        key = asyncssh.generate_private_key(algorithm, key_size=HONEYPOT_CONFIG['ssh']['rsa_key_size'])
+    else:
+        key = asyncssh.generate_private_key(algorithm)
+        
+    # worker'lar yarım yazılmış dosyayı okumasın diye önce geçici dosyaya yazılır
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    key.write_private_key(str(temp_path))
+    os.chmod(temp_path, 0o600)
+    temp_path.replace(path)
+    
+    logger.info(f"SSH host key oluşturuldu: {path}")
+    
+    
+def missing_host_keys(algorithms: Optional[List[str]] = None) -> List[str]:
+    algorithms = algorithms or HONEYPOT_CONFIG['ssh']['host_key_types']
+    return [algorithm for algorithm in algorithms if not host_key_path(algorithm).exists()]
+    
+    
+def ensure_host_keys(algorithms: Optional[List[str]] = None, force: bool = False) -> List[Path]:
+    # sunulan her tür için anahtar yolu döner; algoritmayı istemci seçer. Eksik olanlar üretilir
+    algorithms = algorithms or HONEYPOT_CONFIG['ssh']['host_key_types']
+    
+    for algorithm in algorithms:
+        path = host_key_path(algorithm)
+        if force or not path.exists():
+            generate_host_key(algorithm, path)
+            
+    return [host_key_path(algorithm) for algorithm in algorithms]
+    
+    
+async def ensure_host_keys_async(algorithms: Optional[List[str]] = None) -> List[Path]:
+    # RSA üretimi saniyeler sürebilir; event loop'u bloklamamak için thread'de yapılır
+    if missing_host_keys(algorithms):
+        return await asyncio.to_thread(ensure_host_keys, algorithms)
+    return ensure_host_keys(algorithms)
+    
+    
+def main():
+    parser = argparse.ArgumentParser(description="SSH host key'lerini önceden üretir (ör. imaj oluştururken)")
+    parser.add_argument('--types', nargs='+', choices=list(KEY_FILE_NAMES),
+                        default=HONEYPOT_CONFIG['ssh']['host_key_types'])
+    parser.add_argument('--force', action='store_true', help="mevcut anahtarları yeniden üret")
+    args = parser.parse_args()
+    
+    for path in ensure_host_keys(args.types, force=args.force):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
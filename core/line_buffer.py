@@ -0,0 +1,101 @@
+import re
+from typing import List, Tuple
+
+
+CONTROL_BYTES = re.compile(rb'[\x00-\x1f\x7f]')
+
+
+class LineBuffer:
+    # karakter karakter gelen girdiyi yeniden kullanılan bir bytearray'de satırlara çevirir;
+    # yazdırılabilir parçalar toplu eklenir, yalnızca kontrol baytları tek tek işlenir
+    
+    def __init__(self, max_length: int, echo: bool = True):
+        self.max_length = max_length
+        self.echo = echo
+        self.buffer = bytearray()
+        self.truncated = 0
+        self._escape = 0
+        self._last_cr = False
+        
+    def feed(self, data: bytes) -> Tuple[List[bytes], bytes]:
+        lines: List[bytes] = []
+        echo = bytearray()
+        position = 0
+        
+        for match in CONTROL_BYTES.finditer(data):
+            self._append(data[position:match.start()], echo)
+            self._control(data[match.start()], lines, echo)
+            position = match.end()
+        self._append(data[position:], echo)
+        
+        return lines, bytes(echo) if self.echo else b''
+        
+    def _append(self, run: bytes, echo: bytearray):
+        if not run:
+            return
+        self._last_cr = False
+        
+        if self._escape:
+            # ESC [ ... final / ESC O final dizileri (ok tuşları vb.) yutulur
+            index = 0
+            while index < len(run) and self._escape:
+                byte = run[index]
+                if self._escape == 1:
+                    self._escape = 2 if byte in b'[O' else 0
+                elif 0x40 <= byte <= 0x7e:
+                    self._escape = 0
+                index += 1
+            run = run[index:]
+            if not run:
+                return
+                
+        space = self.max_length - len(self.buffer)
+        overflow = len(run) - space
+        if overflow > 0:
+            self.truncated += overflow
+            run = run[:space]
+            
+        self.buffer += run
+        echo += run
+        if overflow > 0:
+            # kabul edilen kısım yankılandıktan sonra zil çalınır
+            echo += b'\x07'
+        
+    def _control(self, byte: int, lines: List[bytes], echo: bytearray):
+        if byte in (0x0d, 0x0a, 0x00):
+            last_cr = self._last_cr
+            self._last_cr = byte == 0x0d
+            if last_cr and byte != 0x0d:
+                return
+            if byte == 0x00:
+                return
+            lines.append(bytes(self.buffer))
+            self.buffer.clear()
+            self._escape = 0
+            echo += b'\r\n'
+            return
+            
+        self._last_cr = False
+        
+        if byte in (0x7f, 0x08):
+            if self.buffer:
+                # çok baytlı UTF-8 karakter tek seferde silinir
+                removed = self.buffer.pop()
+                while removed & 0xc0 == 0x80 and self.buffer:
+                    removed = self.buffer.pop()
+                echo += b'\b \b'
+        elif byte == 0x03:
+            self.buffer.clear()
+            lines.append(b'')
+            echo += b'^C\r\n'
+        elif byte == 0x04:
+            if not self.buffer:
+                lines.append(b'exit')
+        elif byte == 0x15:
+            echo += b'\b \b' * len(self.buffer.decode('utf-8', errors='replace'))
+            self.buffer.clear()
+        elif byte == 0x09:
+            # sekme sıradan girdi gibi eklenir; komut ayrıştırma onu boşluk sayar
+            self._append(b'\t', echo)
+        elif byte == 0x1b:
+            self._escape = 1
@@ -0,0 +1,55 @@
+import string
+from typing import Dict, List, Union
+
+
+def frame_output(output: str) -> bytes:
+    # SSH kanalı ham bayt modunda açıldığı için satır sonları burada bir kez \r\n'e çevrilir;
+    # hazır \r\n içeren çıktılar iki kez dönüştürülmez
+    output = output.replace('\r\n', '\n').replace('\n', '\r\n')
+    return f"\r\n{output}\r\n".encode('utf-8')
+
+
+class ByteTemplate:
+    # format string'i bir kez sabit bayt parçalarına ve alan adlarına ayırır;
+    # render sırasında yalnızca değişen alanlar kodlanıp tek bir join ile birleştirilir
+    
+    def __init__(self, fmt: str = '', **fixed):
+        self.parts: List[Union[bytes, str]] = []
+        for literal, field, _spec, _conversion in string.Formatter().parse(fmt):
+            if literal:
+                self._append(literal.encode('utf-8'))
+            if field is not None:
+                self._append(str(fixed[field]).encode('utf-8') if field in fixed else field)
+                
+    def _append(self, part: Union[bytes, str]):
+        if isinstance(part, bytes) and self.parts and isinstance(self.parts[-1], bytes):
+            self.parts[-1] += part
+        else:
+            self.parts.append(part)
+            
+    def bind(self, **fixed) -> 'ByteTemplate':
+        template = ByteTemplate()
+        for part in self.parts:
+            if isinstance(part, str) and part in fixed:
+                template._append(str(fixed[part]).encode('utf-8'))
+            else:
+                template._append(part)
+        return template
+        
+    def render(self, **values) -> bytes:
+        if len(self.parts) == 1 and isinstance(self.parts[0], bytes):
+            return self.parts[0]
+        return b''.join(
+            part if isinstance(part, bytes) else str(values[part]).encode('utf-8')
+            for part in self.parts
+        )
+
+
+class ResponseCache:
+    # sabit komut çıktıları başlangıçta \r\n ile sarılıp UTF-8 olarak bir kez kodlanır
+    
+    def __init__(self, outputs: Dict[str, str]):
+        self.responses: Dict[str, bytes] = {key: frame_output(value) for key, value in outputs.items()}
+        
+    def get(self, key: str) -> bytes:
+        return self.responses[key]
@@ -1,25 +1,47 @@
 import asyncio
 import asyncssh
 import logging
+import time
 from pathlib import Path
 from typing import Optional
 
 from config.settings import HONEYPOT_CONFIG, FAKE_USERS
 from core.fake_shell import FakeShell
-from utils.logger import setup_logger
-from utils.session_manager import SessionManager
+from core.host_keys import ensure_host_keys_async
+from core.line_buffer import LineBuffer
+from core.tarpit import tarpit
+from utils.attack_stats import attack_stats
+from utils.event_store import event_store
+from utils.logger import setup_logger, get_session_logger
+from utils.metrics import accept_latency, auth_attempts_total, auth_latency, connections_total, drain_latency
+from utils.session_manager import ConnectionContext, SessionManager
+from utils.timer_wheel import idle_reaper
 
 
 class SSHSession(asyncssh.SSHServerSession):
     
-    def __init__(self, client_ip: str, session_manager: SessionManager):
+    def __init__(self, context: ConnectionContext, session_manager: SessionManager):
         super().__init__()
-        self.client_ip = client_ip
+        self.context = context
+        self.client_ip = context.client_ip
         self.session_manager = session_manager
         self.shell = None
-        self.logger = setup_logger(f'ssh_session_{client_ip}')
-        self.authenticated = False
-        self.username = None
+        self.session_id = context.session_id
+        self.logger = get_session_logger('ssh_session', client_ip=self.client_ip,
+                                         protocol='SSH', session_id=self.session_id)
+        self.authenticated = context.authenticated
+        self.username = context.username
+        
+        # tuş vuruşları satıra çevrilir, satırlar tek bir görevde sırayla çalıştırılır
+        self.line_buffer = LineBuffer(HONEYPOT_CONFIG['shell']['max_command_length'])
+        self.max_pending = HONEYPOT_CONFIG['shell']['max_pending_commands']
+        self.pending: asyncio.Queue = asyncio.Queue()
+        self.write_ready = asyncio.Event()
+        self.write_ready.set()
+        self.reading_paused = False
+        self.paused_at = 0.0
+        self.dropped_lines = 0
+        self.worker: Optional[asyncio.Task] = None
         
     def connection_made(self, chan):
         self.logger.info(f"SSH oturumu başlatıldı - IP: {self.client_ip}")
@@ -31,7 +53,8 @@ class SSHSession(asyncssh.SSHServerSession):
                 client_ip=self.client_ip,
                 protocol='SSH',
                 username=self.username,
-                session_manager=self.session_manager
+                session_manager=self.session_manager,
+                session_id=self.session_id
             )
             return True
         return False
@@ -39,15 +62,77 @@ class SSHSession(asyncssh.SSHServerSession):
     def session_started(self):
         if self.shell:
             self.shell.start_session(self._chan)
+            self.worker = asyncio.create_task(self.process_input())
             
     def data_received(self, data, datatype):
-        if self.shell:
-            self.shell.handle_input(data)
+        if not self.shell:
+            return
+        self.context.touch()
+            
+        lines, echo = self.line_buffer.feed(data)
+        if echo:
+            self._chan.write(echo)
+            
+        for line in lines:
+            if self.pending.qsize() >= self.max_pending:
+                self.dropped_lines += 1
+                continue
+            self.pending.put_nowait(line)
+            
+        self.update_flow()
+        
+    def update_flow(self):
+        # komut kuyruğu dolduğunda veya kanal çıktıyı alamadığında istemciden okuma durdurulur
+        backlog = self.pending.qsize() >= self.max_pending or not self.write_ready.is_set()
+        
+        if backlog and not self.reading_paused:
+            self.reading_paused = True
+            self._chan.pause_reading()
+        elif not backlog and self.reading_paused:
+            self.reading_paused = False
+            self._chan.resume_reading()
+            
+    def pause_writing(self):
+        self.paused_at = time.perf_counter()
+        self.write_ready.clear()
+        self.update_flow()
+        
+    def resume_writing(self):
+        drain_latency.observe(time.perf_counter() - self.paused_at, 'SSH')
+        self.write_ready.set()
+        self.update_flow()
+        
+    async def process_input(self):
+        try:
+            while True:
+                line = await self.pending.get()
+                if line is None:
+                    break
+                self.update_flow()
+                
+                await self.write_ready.wait()
+                await self.shell.handle_input(line.decode('utf-8', errors='replace'))
+                
+                if self.shell.session_ended:
+                    break
+        except Exception as e:
+            self.logger.error(f"SSH girdi işleme hatası: {e}")
+        finally:
+            if self.dropped_lines:
+                self.logger.warning(f"SSH komut kuyruğu taştı - IP: {self.client_ip}, Atılan satır: {self.dropped_lines}")
+            await self.shell.end_session()
+            
+    def eof_received(self):
+        return False
             
     def connection_lost(self, exc):
         self.logger.info(f"SSH oturumu sonlandı - IP: {self.client_ip}")
-        if self.shell:
-            self.shell.end_session()
+        if self.worker:
+            # kapanan kanala yazılmaması için bekleyen satırlar atılır
+            while not self.pending.empty():
+                self.pending.get_nowait()
+            self.pending.put_nowait(None)
+            self.write_ready.set()
 
 
 class SSHServer(asyncssh.SSHServer):
@@ -55,74 +140,144 @@ class SSHServer(asyncssh.SSHServer):
     def __init__(self, session_manager: SessionManager):
         self.session_manager = session_manager
         self.logger = setup_logger('ssh_server')
+        self.context: Optional[ConnectionContext] = None
+        self.conn = None
+        self.admitted = False
         
     def connection_made(self, conn):
-        client_ip = conn.get_extra_info('peername')[0]
+        self.conn = conn
+        client_ip, client_port = conn.get_extra_info('peername')[:2]
+        self.context = ConnectionContext('SSH', client_ip, client_port)
         self.logger.info(f"Yeni SSH bağlantısı - IP: {client_ip}")
         
-        if not self.session_manager.can_connect(client_ip):
-            self.logger.warning(f"Bağlantı reddedildi (rate limit) - IP: {client_ip}")
+        # IP ve rate limit kontrolleri SSHAdmissionProtocol'de soket kabulünde yapıldı
+        if not self.session_manager.add_connection(client_ip, 'ssh'):
+            self.logger.warning(f"Bağlantı reddedildi (kapasite) - IP: {client_ip}")
+            event_store.record_connection(client_ip, client_port, 'SSH', False, 'capacity')
+            connections_total.inc('SSH', 'capacity')
             conn.close()
             return
             
-        self.session_manager.add_connection(client_ip)
+        self.admitted = True
+        event_store.record_connection(client_ip, client_port, 'SSH', True)
+        connections_total.inc('SSH', 'accepted')
+        idle_reaper.add(self)
         
-    def connection_lost(self, conn):
-        client_ip = conn.get_extra_info('peername')[0]
-        self.session_manager.remove_connection(client_ip)
+    def connection_lost(self, exc):
+        if self.admitted:
+            self.admitted = False
+            idle_reaper.discard(self)
+            self.session_manager.remove_connection(self.context.client_ip, 'ssh')
+            
+    def timeout_deadline(self) -> float:
+        config = HONEYPOT_CONFIG['ssh']
+        return min(self.context.last_activity + config['connection_timeout'],
+                   self.context.opened_at + config['max_session_duration'])
+                   
+    def timeout_expired(self):
+        self.logger.info(f"SSH oturum zaman aşımı - IP: {self.context.client_ip}")
+        self.conn.close()
         
     def begin_auth(self, username):
+        self.context.auth_started_at = time.time()
         return True
         
     def password_auth_supported(self):
         return True
         
     def validate_password(self, username, password):
-        client_ip = self.session_manager.get_current_ip()
+        started = time.perf_counter()
+        client_ip = self.context.client_ip
+        self.context.touch()
         
         # bütün girişleri loglama
         self.logger.info(f"SSH giriş denemesi - IP: {client_ip}, User: {username}, Pass: {password}")
         
-        if username in FAKE_USERS and FAKE_USERS[username] == password:
+        success = username in FAKE_USERS and FAKE_USERS[username] == password
+        event_store.record_auth(client_ip, 'SSH', username, password, success)
+        attack_stats.record_auth(client_ip, username, password, success)
+        auth_attempts_total.inc('SSH', 'success' if success else 'failed')
+        auth_latency.observe(time.perf_counter() - started, 'SSH')
+        
+        if success:
+            self.context.mark_authenticated(username)
             self.logger.info(f"SSH girişi başarılı - IP: {client_ip}, User: {username}")
             return True
         else:
             self.logger.info(f"SSH girişi başarısız - IP: {client_ip}, User: {username}")
+            if self.session_manager.record_auth_failure(client_ip):
+                self.conn.close()
             return False
             
     def session_requested(self):
-        client_ip = self.session_manager.get_current_ip()
-        return SSHSession(client_ip, self.session_manager)
+        # kanal ham bayt modunda açılır; shell önceden kodlanmış yanıtları doğrudan yazar
+        channel = self.conn.create_server_channel(encoding=None)
+        return channel, SSHSession(self.context, self.session_manager)
+
+
+class SSHAdmissionProtocol(asyncio.Protocol):
+    # ham soket kabul edildiği anda çalışır; reddedilen IP'ler için SSH bağlantı
+    # nesnesi oluşturulmaz, sürüm satırı gönderilmez ve KEX başlamaz
+    
+    def __init__(self, honeypot: 'SSHHoneypot'):
+        self.honeypot = honeypot
+        
+    def connection_made(self, transport):
+        started = time.perf_counter()
+        peername = transport.get_extra_info('peername')
+        client_ip = peername[0] if peername else 'unknown'
+        client_port = peername[1] if peername else None
+        
+        reason = self.honeypot.session_manager.check_connection(client_ip, 'ssh')
+        if reason:
+            self.honeypot.stats['handshakes_avoided'] += 1
+            self.honeypot.logger.warning(f"SSH bağlantısı el sıkışmadan önce reddedildi - IP: {client_ip}, Sebep: {reason}")
+            event_store.record_connection(client_ip, client_port, 'SSH', False, reason)
+            connections_total.inc('SSH', reason)
+            # sürüm satırı hiç gönderilmez; istemci ön satırları okuyarak bekler
+            if not (tarpit.should_hold(reason) and tarpit.hold(transport, 'SSH', client_ip)):
+                transport.abort()
+            return
+            
+        conn = self.honeypot.create_connection()
+        transport.set_protocol(conn)
+        # sürüm satırı (banner) asyncssh tarafından connection_made içinde yazılır
+        conn.connection_made(transport)
+        accept_latency.observe(time.perf_counter() - started, 'SSH')
+        
+    def data_received(self, data):
+        pass
+        
+    def connection_lost(self, exc):
+        pass
 
 
 class SSHHoneypot:
     
-    def __init__(self):
+    def __init__(self, session_manager: Optional[SessionManager] = None, reuse_port: bool = False):
         self.server = None
-        self.session_manager = SessionManager()
+        self.session_manager = session_manager or SessionManager()
+        self.reuse_port = reuse_port
         self.logger = setup_logger('ssh_honeypot')
+        self.options: Optional[asyncssh.SSHServerConnectionOptions] = None
+        self.stats = {'handshakes_avoided': 0}
         
-    async def generate_host_key(self):
-        key_path = HONEYPOT_CONFIG['ssh']['host_key']
-        
-        key_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if not key_path.exists():
-            self.logger.info("SSH host key oluşturuluyor...")
-            key = asyncssh.generate_private_key('ssh-rsa', key_size=2048)
-            key.write_private_key(str(key_path))
-            self.logger.info(f"SSH host key oluşturuldu: {key_path}")
-            
     async def start(self):
         try:
-            await self.generate_host_key()
+            host_keys = await ensure_host_keys_async()
             
-            self.server = await asyncssh.create_server(
-                lambda: SSHServer(self.session_manager),
+            self.options = await asyncssh.SSHServerConnectionOptions.construct(
+                server_factory=lambda: SSHServer(self.session_manager),
+                server_host_keys=[str(path) for path in host_keys],
+                server_version=HONEYPOT_CONFIG['ssh']['banner']
+            )
+            
+            loop = asyncio.get_running_loop()
+            self.server = await loop.create_server(
+                lambda: SSHAdmissionProtocol(self),
                 host=HONEYPOT_CONFIG['ssh']['host'],
                 port=HONEYPOT_CONFIG['ssh']['port'],
-                server_host_keys=[str(HONEYPOT_CONFIG['ssh']['host_key'])],
-                server_version=HONEYPOT_CONFIG['ssh']['banner']
+                reuse_port=self.reuse_port
             )
             
             self.logger.info(f"SSH Honeypot başlatıldı - {HONEYPOT_CONFIG['ssh']['host']}:{HONEYPOT_CONFIG['ssh']['port']}")
@@ -131,8 +286,11 @@ class SSHHoneypot:
             self.logger.error(f"SSH sunucu başlatma hatası: {e}")
             raise
             
+    def create_connection(self) -> asyncssh.SSHServerConnection:
+        return asyncssh.SSHServerConnection(asyncio.get_running_loop(), self.options)
+            
     async def stop(self):
         if self.server:
             self.server.close()
             await self.server.wait_closed()
-            self.logger.info("SSH sunucu durduruldu")
\ No newline at end of file
+            self.logger.info(f"SSH sunucu durduruldu - Önlenen el sıkışma: {self.stats['handshakes_avoided']}")
\ No newline at end of file
@@ -0,0 +1,146 @@
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Optional, Tuple
+
+from config.settings import HONEYPOT_CONFIG
+from utils.ban_store import BanStore
+from utils.logger import setup_logger
+from utils.rate_limiter import SharedRateLimiter
+
+
+class WorkerSupervisor:
+    
+    def __init__(self, worker_count: int, worker_target: Callable, ban_store: Optional[BanStore] = None):
+        self.worker_count = worker_count
+        self.worker_target = worker_target
+        self.context = multiprocessing.get_context('spawn')
+        self.restart_delay = HONEYPOT_CONFIG['workers']['restart_delay']
+        self.logger = setup_logger('supervisor')
+        
+        rate_limit_config = HONEYPOT_CONFIG['security']['rate_limit']
+        self.rate_limiter = SharedRateLimiter.create(
+            max_requests=rate_limit_config['max_connections_per_ip'],
+            time_window=rate_limit_config['time_window'],
+            slots=HONEYPOT_CONFIG['workers']['rate_table_slots'],
+            context=self.context
+        )
+        
+        self.workers: Dict[int, Tuple[multiprocessing.Process, object]] = {}
+        # yeniden başlatılan worker'a mevcut yasaklar tekrar gönderilir; IP -> (sebep, bitiş zamanı)
+        self.blocked_ips: Dict[str, Tuple[str, float]] = {}
+        # worker'lar yasakları diske yazmaz, kalıcılık burada tutulur
+        self.ban_store = ban_store
+        if ban_store:
+            for ip, expires_at in ban_store.load().items():
+                self.blocked_ips[ip] = ('persisted', expires_at)
+        self.restarts = 0
+        self.running = False
+        
+    def start_worker(self, worker_id: int):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=self.worker_target,
+            args=(worker_id, self.rate_limiter, child_conn),
+            name=f'bear-worker-{worker_id}'
+        )
+        process.start()
+        child_conn.close()
+        
+        now = time.time()
+        for ip, (reason, expires_at) in list(self.blocked_ips.items()):
+            if expires_at <= now:
+                del self.blocked_ips[ip]
+                continue
+            parent_conn.send(('block', ip, reason, expires_at))
+            
+        self.workers[worker_id] = (process, parent_conn)
+        self.logger.info(f"Worker başlatıldı - ID: {worker_id}, PID: {process.pid}")
+        
+    def broadcast(self, event: tuple, source_id: int):
+        kind, ip, reason, expires_at = event
+        if kind == 'block':
+            self.blocked_ips[ip] = (reason, expires_at)
+            if self.ban_store:
+                self.ban_store.add(ip, expires_at)
+        else:
+            self.blocked_ips.pop(ip, None)
+            if self.ban_store:
+                self.ban_store.remove(ip)
+            
+        for worker_id, (process, conn) in self.workers.items():
+            if worker_id == source_id:
+                continue
+            try:
+                conn.send(event)
+            except (BrokenPipeError, OSError):
+                pass
+                
+    def handle_exit(self, worker_id: int):
+        process, conn = self.workers[worker_id]
+        process.join()
+        conn.close()
+        self.logger.warning(f"Worker sonlandı - ID: {worker_id}, Çıkış kodu: {process.exitcode}")
+        
+        if self.running:
+            time.sleep(self.restart_delay)
+            self.restarts += 1
+            self.start_worker(worker_id)
+            
+    def setup_signal_handlers(self):
+        def signal_handler(signum, frame):
+            self.logger.info(f"Sinyal alındı: {signum}")
+            self.running = False
+            
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+        
+    def run(self):
+        self.setup_signal_handlers()
+        self.running = True
+        
+        for worker_id in range(self.worker_count):
+            self.start_worker(worker_id)
+            
+        self.logger.info(f"{self.worker_count} worker aktif (SO_REUSEPORT)")
+        
+        while self.running:
+            waitables = {}
+            for worker_id, (process, conn) in self.workers.items():
+                waitables[conn] = ('event', worker_id)
+                waitables[process.sentinel] = ('exit', worker_id)
+                
+            for ready in wait(list(waitables), timeout=1):
+                kind, worker_id = waitables[ready]
+                if kind == 'exit':
+                    self.handle_exit(worker_id)
+                    continue
+                    
+                if self.workers[worker_id][1] is not ready:
+                    continue
+                try:
+                    event = ready.recv()
+                except (EOFError, OSError):
+                    continue
+                self.broadcast(event, worker_id)
+                
+        self.stop_workers()
+        
+    def stop_workers(self):
+        self.logger.info("Worker'lar durduruluyor...")
+        
+        for process, conn in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+                
+        for process, conn in self.workers.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            conn.close()
+            
+        if self.ban_store:
+            self.ban_store.close()
+        self.logger.info(f"Tüm worker'lar durduruldu - Yeniden başlatma: {self.restarts}")
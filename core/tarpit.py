@@ -0,0 +1,128 @@
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+TELNET_PAYLOAD = f"\r\n{HONEYPOT_CONFIG['telnet']['banner']}\r\nlogin: ".encode('utf-8')
+
+# bir kerede gönderilen çıktı bu sınırı aşarsa saldırgan okumuyor demektir, yazma atlanır
+WRITE_BUFFER_LIMIT = 256
+
+
+class TarpitConnection(asyncio.Protocol):
+    # tutulan her soket için yalnızca birkaç alan; okuma durdurulur, gelen veri çekirdekte bekler
+    
+    __slots__ = ('tarpit', 'transport', 'protocol', 'client_ip', 'offset', 'held_at')
+    
+    def __init__(self, tarpit: 'Tarpit', transport, protocol: str, client_ip: str):
+        self.tarpit = tarpit
+        self.transport = transport
+        self.protocol = protocol
+        self.client_ip = client_ip
+        self.offset = 0
+        self.held_at = time.monotonic()
+        
+    def next_chunk(self) -> bytes:
+        if self.protocol == 'SSH':
+            # "SSH-" ile başlamayan her satırı istemci sürüm satırını beklerken atlar
+            return b'%x\r\n' % random.getrandbits(64)
+            
+        chunk = TELNET_PAYLOAD[self.offset:self.offset + 1]
+        self.offset = (self.offset + 1) % len(TELNET_PAYLOAD)
+        return chunk
+        
+    def data_received(self, data):
+        pass
+        
+    def connection_lost(self, exc):
+        self.tarpit.release(self)
+
+
+class Tarpit:
+    
+    def __init__(self):
+        self.config = HONEYPOT_CONFIG['security']['tarpit']
+        self.logger = setup_logger('tarpit')
+        self.held: Dict[object, TarpitConnection] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {'held_total': 0, 'released': 0, 'rejected_full': 0,
+                      'bytes_sent': 0, 'attacker_seconds': 0.0}
+        
+    def should_hold(self, reason: Optional[str]) -> bool:
+        return bool(self.config['enabled'] and reason in self.config['reasons'])
+        
+    def hold(self, transport, protocol: str, client_ip: str) -> bool:
+        if len(self.held) >= self.config['max_connections']:
+            self.stats['rejected_full'] += 1
+            return False
+            
+        connection = TarpitConnection(self, transport, protocol, client_ip)
+        transport.set_protocol(connection)
+        transport.pause_reading()
+        self.held[transport] = connection
+        self.stats['held_total'] += 1
+        
+        self.logger.info(f"Bağlantı tarpit'e alındı - IP: {client_ip}, Protocol: {protocol}")
+        
+        # tüm tutulan soketler tek bir görevden beslenir
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        return True
+        
+    def release(self, connection: TarpitConnection):
+        if self.held.pop(connection.transport, None) is None:
+            return
+        held_for = time.monotonic() - connection.held_at
+        self.stats['released'] += 1
+        self.stats['attacker_seconds'] += held_for
+        self.logger.info(f"Tarpit bağlantısı bitti - IP: {connection.client_ip}, Süre: {held_for:.1f}s")
+        
+    async def run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.config['interval'])
+                self.drip()
+        except asyncio.CancelledError:
+            pass
+            
+    def drip(self):
+        now = time.monotonic()
+        
+        for transport, connection in list(self.held.items()):
+            if now - connection.held_at > self.config['max_hold'] or transport.is_closing():
+                transport.abort()
+                self.release(connection)
+                continue
+                
+            if transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                continue
+                
+            chunk = connection.next_chunk()
+            transport.write(chunk)
+            self.stats['bytes_sent'] += len(chunk)
+            
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+            
+        for transport, connection in list(self.held.items()):
+            transport.abort()
+            self.release(connection)
+            
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        live_seconds = sum(now - connection.held_at for connection in self.held.values())
+        return {
+            **self.stats,
+            'held': len(self.held),
+            'attacker_seconds': round(self.stats['attacker_seconds'] + live_seconds, 1),
+        }
+
+
+tarpit = Tarpit()
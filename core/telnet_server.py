@@ -1,145 +1,326 @@
 import asyncio
 import logging
-from typing import Optional
+import time
+from collections import deque
+from typing import Deque, Optional, Set
 
 from config.settings import HONEYPOT_CONFIG, FAKE_USERS
 from core.fake_shell import FakeShell
-from utils.logger import setup_logger
-from utils.session_manager import SessionManager
+from core.line_buffer import LineBuffer
+from core.tarpit import tarpit
+from utils.attack_stats import attack_stats
+from utils.event_store import event_store
+from utils.logger import setup_logger, get_session_logger
+from utils.metrics import accept_latency, auth_attempts_total, auth_latency, connections_total, drain_latency
+from utils.session_manager import ConnectionContext, SessionManager
+from utils.timer_wheel import idle_reaper
 
 
-class TelnetSession:
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+IAC_BYTE = bytes([IAC])
+
+# IAC ayrıştırıcı durumları
+STATE_DATA = 0
+STATE_IAC = 1
+STATE_OPTION = 2
+STATE_SB = 3
+STATE_SB_IAC = 4
+
+# hiçbir seçenek kabul edilmez; istemci satır modunda ve yerel echo ile kalır
+REFUSALS = {DO: WONT, WILL: DONT}
+
+
+class TelnetSession(asyncio.Protocol):
     
-    def __init__(self, reader, writer, client_ip: str, session_manager: SessionManager):
-        self.reader = reader
-        self.writer = writer
-        self.client_ip = client_ip
-        self.session_manager = session_manager
-        self.logger = setup_logger(f'telnet_session_{client_ip}')
+    def __init__(self, honeypot: 'TelnetHoneypot'):
+        self.honeypot = honeypot
+        self.session_manager = honeypot.session_manager
+        self.transport = None
+        self.context: Optional[ConnectionContext] = None
+        self.client_ip = 'unknown'
+        self.logger = None
+        self.admitted = False
+        
         self.authenticated = False
         self.username = None
+        self.pending_username = None
         self.shell = None
         self.login_attempts = 0
         
-    async def send_data(self, data: str):
-        try:
-            self.writer.write(data.encode('utf-8'))
-            await self.writer.drain()
-        except Exception as e:
-            self.logger.error(f"Veri gönderme hatası: {e}")
+        self.iac_state = STATE_DATA
+        self.iac_command = 0
+        self.refused: Set[int] = set()
+        self.line_buffer = LineBuffer(HONEYPOT_CONFIG['shell']['max_command_length'], echo=False)
+        
+        # shell satırları sırayla işlenir; görev yalnızca bekleyen satır varken yaşar
+        self.max_pending = HONEYPOT_CONFIG['shell']['max_pending_commands']
+        self.pending: Deque[bytes] = deque()
+        self.task: Optional[asyncio.Task] = None
+        self.writing_paused = False
+        self.paused_at = 0.0
+        self.reading_paused = False
+        self.closed = False
+        
+        self.idle_timeout = HONEYPOT_CONFIG['telnet']['login_timeout']
+        
+    def connection_made(self, transport):
+        started = time.perf_counter()
+        self.transport = transport
+        peername = transport.get_extra_info('peername')
+        self.client_ip = peername[0] if peername else 'unknown'
+        client_port = peername[1] if peername else None
+        logger = self.honeypot.logger
+        
+        logger.info(f"Yeni Telnet bağlantısı - IP: {self.client_ip}")
+        
+        reason = self.session_manager.check_connection(self.client_ip, 'telnet')
+        if not reason and not self.session_manager.add_connection(self.client_ip, 'telnet'):
+            reason = 'capacity'
             
-    async def receive_data(self) -> str:
-        try:
-            data = await self.reader.readline()
-            return data.decode('utf-8').strip()
-        except Exception as e:
-            self.logger.error(f"Veri alma hatası: {e}")
-            return ""
+        if reason:
+            logger.warning(f"Telnet bağlantısı reddedildi - IP: {self.client_ip}, Sebep: {reason}")
+            event_store.record_connection(self.client_ip, client_port, 'Telnet', False, reason)
+            connections_total.inc('Telnet', reason)
+            self.closed = True
+            if not (tarpit.should_hold(reason) and tarpit.hold(transport, 'Telnet', self.client_ip)):
+                transport.close()
+            return
             
-    async def authenticate(self):
-        await self.send_data(f"\r\n{HONEYPOT_CONFIG['telnet']['banner']}\r\n")
-        await self.send_data("login: ")
-        
-        while not self.authenticated and self.login_attempts < 3:
-            try:
-                username = await asyncio.wait_for(self.receive_data(), timeout=30)
-                if not username:
-                    break
-                    
-                await self.send_data("Password: ")
+        self.admitted = True
+        event_store.record_connection(self.client_ip, client_port, 'Telnet', True)
+        connections_total.inc('Telnet', 'accepted')
+        self.context = ConnectionContext('Telnet', self.client_ip, client_port)
+        self.session_id = self.context.session_id
+        self.logger = get_session_logger('telnet_session', client_ip=self.client_ip,
+                                         protocol='Telnet', session_id=self.session_id)
+        self.logger.info(f"Telnet oturumu başlatıldı - IP: {self.client_ip}")
+        
+        self.honeypot.sessions.add(self)
+        idle_reaper.add(self)
+        
+        transport.write(f"\r\n{HONEYPOT_CONFIG['telnet']['banner']}\r\nlogin: ".encode('utf-8'))
+        accept_latency.observe(time.perf_counter() - started, 'Telnet')
+        self.context.auth_started_at = time.time()
+        
+    def data_received(self, data: bytes):
+        if self.closed:
+            return
+        self.context.touch()
+        
+        lines, _ = self.line_buffer.feed(self.strip_iac(data))
+        for line in lines:
+            if self.closed:
+                return
+            if self.shell:
+                if len(self.pending) >= self.max_pending:
+                    continue
+                self.pending.append(line)
+            else:
+                self.handle_login_line(line.decode('utf-8', errors='replace').strip())
                 
-                password = await asyncio.wait_for(self.receive_data(), timeout=30)
-                if not password:
+        if self.pending and self.task is None:
+            self.task = asyncio.create_task(self.process_lines())
+        self.update_flow()
+        
+    def strip_iac(self, data: bytes) -> bytes:
+        # tek geçişte IAC komutlarını ayıklar; IAC içermeyen parçalar kopyalanmadan döner
+        if self.iac_state == STATE_DATA and IAC_BYTE not in data:
+            return data
+            
+        out = bytearray()
+        index = 0
+        length = len(data)
+        
+        while index < length:
+            state = self.iac_state
+            
+            if state == STATE_DATA or state == STATE_SB:
+                found = data.find(IAC_BYTE, index)
+                end = length if found < 0 else found
+                if state == STATE_DATA:
+                    out += data[index:end]
+                if found < 0:
                     break
-                    
-                self.logger.info(f"Telnet giriş denemesi - IP: {self.client_ip}, User: {username}, Pass: {password}")
+                self.iac_state = STATE_IAC if state == STATE_DATA else STATE_SB_IAC
+                index = found + 1
+                continue
                 
-                if username in FAKE_USERS and FAKE_USERS[username] == password:
-                    self.authenticated = True
-                    self.username = username
-                    self.logger.info(f"Telnet girişi başarılı - IP: {self.client_ip}, User: {username}")
-                    await self.send_data(f"\r\nWelcome to {HONEYPOT_CONFIG['shell']['hostname']}!\r\n")
+            byte = data[index]
+            index += 1
+            
+            if state == STATE_IAC:
+                if byte == IAC:
+                    out.append(IAC)
+                    self.iac_state = STATE_DATA
+                elif byte in (WILL, WONT, DO, DONT):
+                    self.iac_command = byte
+                    self.iac_state = STATE_OPTION
+                elif byte == SB:
+                    self.iac_state = STATE_SB
                 else:
-                    self.login_attempts += 1
-                    self.logger.info(f"Telnet girişi başarısız - IP: {self.client_ip}, User: {username}")
-                    await self.send_data("\r\nLogin incorrect\r\n")
-                    if self.login_attempts < 3:
-                        await self.send_data("login: ")
-                        
-            except asyncio.TimeoutError:
-                self.logger.warning(f"Telnet kimlik doğrulama zaman aşımı - IP: {self.client_ip}")
-                break
-            except Exception as e:
-                self.logger.error(f"Telnet kimlik doğrulama hatası: {e}")
-                break
+                    self.iac_state = STATE_DATA
+            elif state == STATE_OPTION:
+                self.negotiate(self.iac_command, byte)
+                self.iac_state = STATE_DATA
+            elif state == STATE_SB_IAC:
+                self.iac_state = STATE_DATA if byte == SE else STATE_SB
                 
-        if not self.authenticated:
-            await self.send_data("\r\nToo many login attempts. Connection closed.\r\n")
-            
-    async def start_shell(self):
-        if self.authenticated:
-            self.shell = FakeShell(
-                client_ip=self.client_ip,
-                protocol='Telnet',
-                username=self.username,
-                session_manager=self.session_manager
-            )
+        return bytes(out)
+        
+    def negotiate(self, command: int, option: int):
+        reply = REFUSALS.get(command)
+        # her seçenek bir kez reddedilir; müzakere döngüsüne girilmez
+        if reply is not None and option not in self.refused:
+            self.refused.add(option)
+            self.transport.write(bytes([IAC, reply, option]))
             
-            await self.shell.start_telnet_session(self.reader, self.writer)
+    def handle_login_line(self, line: str):
+        if self.pending_username is None:
+            if not line:
+                self.transport.write(b"login: ")
+                return
+            self.pending_username = line
+            self.transport.write(b"Password: ")
+            return
             
-    async def handle_session(self):
-        try:
-            self.logger.info(f"Telnet oturumu başlatıldı - IP: {self.client_ip}")
+        started = time.perf_counter()
+        username, password = self.pending_username, line
+        self.pending_username = None
+        
+        self.logger.info(f"Telnet giriş denemesi - IP: {self.client_ip}, User: {username}, Pass: {password}")
+        
+        success = username in FAKE_USERS and FAKE_USERS[username] == password
+        event_store.record_auth(self.client_ip, 'Telnet', username, password, success)
+        attack_stats.record_auth(self.client_ip, username, password, success)
+        auth_attempts_total.inc('Telnet', 'success' if success else 'failed')
+        auth_latency.observe(time.perf_counter() - started, 'Telnet')
+        
+        if success:
+            self.authenticated = True
+            self.username = username
+            self.context.mark_authenticated(username)
+            self.logger.info(f"Telnet girişi başarılı - IP: {self.client_ip}, User: {username}")
+            self.transport.write(f"\r\nWelcome to {HONEYPOT_CONFIG['shell']['hostname']}!\r\n".encode('utf-8'))
+            self.start_shell()
+            return
             
-            await self.authenticate()
+        self.login_attempts += 1
+        self.logger.info(f"Telnet girişi başarısız - IP: {self.client_ip}, User: {username}")
+        self.transport.write(b"\r\nLogin incorrect\r\n")
+        banned = self.session_manager.record_auth_failure(self.client_ip)
+        
+        if not banned and self.login_attempts < HONEYPOT_CONFIG['security']['max_login_attempts']:
+            self.transport.write(b"login: ")
+        else:
+            self.transport.write(b"\r\nToo many login attempts. Connection closed.\r\n")
+            self.close()
             
-            if self.authenticated:
-                await self.start_shell()
+    def start_shell(self):
+        self.shell = FakeShell(
+            client_ip=self.client_ip,
+            protocol='Telnet',
+            username=self.username,
+            session_manager=self.session_manager,
+            session_id=self.session_id
+        )
+        self.idle_timeout = HONEYPOT_CONFIG['telnet']['connection_timeout']
+        self.shell.start_telnet_session(self.transport)
+        
+    async def process_lines(self):
+        try:
+            while self.pending and not self.closed:
+                line = self.pending.popleft()
+                self.update_flow()
+                await self.shell.handle_input(line.decode('utf-8', errors='replace').strip())
                 
+                if self.shell.session_ended:
+                    self.close()
         except Exception as e:
-            self.logger.error(f"Telnet oturum hatası: {e}")
+            self.logger.error(f"Telnet input hatası: {e}")
+            self.close()
         finally:
-            try:
-                self.writer.close()
-                await self.writer.wait_closed()
-            except:
-                pass
-            self.logger.info(f"Telnet oturumu sonlandı - IP: {self.client_ip}")
+            self.task = None
+            if self.closed:
+                await self.shell.end_session()
+                
+    def update_flow(self):
+        # bekleyen satırlar birikirse veya çıktı tamponu dolarsa istemciden okuma durur
+        backlog = len(self.pending) >= self.max_pending or self.writing_paused
+        
+        if backlog and not self.reading_paused and not self.closed:
+            self.reading_paused = True
+            self.transport.pause_reading()
+        elif not backlog and self.reading_paused and not self.closed:
+            self.reading_paused = False
+            self.transport.resume_reading()
+            
+    def pause_writing(self):
+        self.paused_at = time.perf_counter()
+        self.writing_paused = True
+        self.update_flow()
+        
+    def resume_writing(self):
+        drain_latency.observe(time.perf_counter() - self.paused_at, 'Telnet')
+        self.writing_paused = False
+        self.update_flow()
+        
+    def timeout_deadline(self) -> float:
+        return min(self.context.last_activity + self.idle_timeout,
+                   self.context.opened_at + HONEYPOT_CONFIG['telnet']['max_session_duration'])
+                   
+    def timeout_expired(self):
+        if self.shell:
+            self.logger.info(f"Telnet oturum zaman aşımı - IP: {self.client_ip}")
+        else:
+            self.logger.warning(f"Telnet kimlik doğrulama zaman aşımı - IP: {self.client_ip}")
+        self.close()
+        
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.pending.clear()
+            self.transport.close()
+            
+    def connection_lost(self, exc):
+        self.closed = True
+        self.pending.clear()
+        
+        if not self.admitted:
+            return
+        self.admitted = False
+        self.honeypot.sessions.discard(self)
+        idle_reaper.discard(self)
+        self.session_manager.remove_connection(self.client_ip, 'telnet')
+        
+        # çalışan bir görev varsa oturumu o kapatır
+        if self.shell and self.task is None:
+            asyncio.create_task(self.shell.end_session())
+        self.logger.info(f"Telnet oturumu sonlandı - IP: {self.client_ip}")
 
 
 class TelnetHoneypot:
     
-    def __init__(self):
+    def __init__(self, session_manager: Optional[SessionManager] = None, reuse_port: bool = False):
         self.server = None
-        self.session_manager = SessionManager()
+        self.session_manager = session_manager or SessionManager()
+        self.reuse_port = reuse_port
         self.logger = setup_logger('telnet_honeypot')
-        
-    async def handle_client(self, reader, writer):
-        client_address = writer.get_extra_info('peername')
-        client_ip = client_address[0] if client_address else 'unknown'
-        
-        self.logger.info(f"Yeni Telnet bağlantısı - IP: {client_ip}")
-        
-        if not self.session_manager.can_connect(client_ip):
-            self.logger.warning(f"Telnet bağlantısı reddedildi (rate limit) - IP: {client_ip}")
-            writer.close()
-            await writer.wait_closed()
-            return
-            
-        self.session_manager.add_connection(client_ip)
-        session = TelnetSession(reader, writer, client_ip, self.session_manager)
-        
-        try:
-            await session.handle_session()
-        finally:
-            self.session_manager.remove_connection(client_ip)
+        self.sessions: Set[TelnetSession] = set()
             
     async def start(self):
         try:
-            self.server = await asyncio.start_server(
-                self.handle_client,
+            loop = asyncio.get_running_loop()
+            self.server = await loop.create_server(
+                lambda: TelnetSession(self),
                 host=HONEYPOT_CONFIG['telnet']['host'],
-                port=HONEYPOT_CONFIG['telnet']['port']
+                port=HONEYPOT_CONFIG['telnet']['port'],
+                reuse_port=self.reuse_port
             )
             
             self.logger.info(f"Telnet Honeypot başlatıldı - {HONEYPOT_CONFIG['telnet']['host']}:{HONEYPOT_CONFIG['telnet']['port']}")
@@ -151,5 +332,7 @@ class TelnetHoneypot:
     async def stop(self):
         if self.server:
             self.server.close()
+            for session in list(self.sessions):
+                session.close()
             await self.server.wait_closed()
-            self.logger.info("Telnet sunucu durduruldu")
\ No newline at end of file
+            self.logger.info("Telnet sunucu durduruldu")
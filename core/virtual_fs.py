@@ -0,0 +1,250 @@
+import json
+import posixpath
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from config.settings import HONEYPOT_CONFIG, FAKE_FILESYSTEM, FAKE_FILE_CONTENTS
+from core.response_cache import frame_output
+
+
+BOOT_TIME = time.time() - 86400 * 30
+
+
+class Inode:
+    
+    __slots__ = ('name', 'is_dir', 'children', 'content', 'mode', 'owner', 'mtime', '_response')
+    
+    def __init__(self, name: str, is_dir: bool, content: str = '', owner: str = 'root',
+                 mtime: Optional[float] = None):
+        self.name = name
+        self.is_dir = is_dir
+        self.children: Optional[Dict[str, 'Inode']] = {} if is_dir else None
+        self.content = content
+        self.mode = 'drwxr-xr-x' if is_dir else '-rw-r--r--'
+        self.owner = owner
+        self.mtime = mtime if mtime is not None else BOOT_TIME
+        self._response: Optional[bytes] = None
+        
+    @property
+    def size(self) -> int:
+        return 4096 if self.is_dir else len(self.content.encode('utf-8'))
+        
+    @property
+    def response(self) -> bytes:
+        # düğümler değiştirilmez (yazma yeni düğüm oluşturur), çıktı ilk okumada bir kez kodlanır
+        if self._response is None:
+            self._response = frame_output(self.content.rstrip('\n'))
+        return self._response
+
+
+class VirtualFilesystem:
+    # tüm oturumların paylaştığı salt okunur ağaç; başlangıçta bir kez yüklenir
+    
+    def __init__(self):
+        self.root = Inode('/', True)
+        self.file_count = 0
+        
+    def _ensure_dir(self, path: str) -> Inode:
+        node = self.root
+        for part in path.strip('/').split('/'):
+            if not part:
+                continue
+            child = node.children.get(part)
+            if child is None or not child.is_dir:
+                child = Inode(part, True)
+                node.children[part] = child
+            node = child
+        return node
+        
+    def add_directory_listing(self, path: str, names: List[str]):
+        directory = self._ensure_dir(path)
+        for name in names:
+            if name.endswith('/'):
+                self._ensure_dir(posixpath.join(path, name))
+            elif name not in directory.children:
+                directory.children[name] = Inode(name, False)
+                self.file_count += 1
+                
+    def add_file(self, path: str, content: str):
+        parent, name = posixpath.split(path)
+        directory = self._ensure_dir(parent)
+        if name not in directory.children:
+            self.file_count += 1
+        directory.children[name] = Inode(name, False, content)
+        
+    def load(self, directories: Dict[str, List[str]], files: Dict[str, str]):
+        for path, names in directories.items():
+            self.add_directory_listing(path, names)
+        for path, content in files.items():
+            self.add_file(path, content)
+            
+    @classmethod
+    def from_config(cls) -> 'VirtualFilesystem':
+        filesystem = cls()
+        filesystem.load(FAKE_FILESYSTEM, FAKE_FILE_CONTENTS)
+        
+        image_path = HONEYPOT_CONFIG['shell']['filesystem_image']
+        if image_path:
+            with open(Path(image_path), encoding='utf-8') as image_file:
+                image = json.load(image_file)
+            filesystem.load(image.get('directories', {}), image.get('files', {}))
+            
+        return filesystem
+
+
+class SessionFilesystem:
+    # oturuma özel copy-on-write katman: yalnızca eklenen düğümler ve silinen isimler
+    # dizin yoluna göre tutulur, taban ağaç hiçbir zaman kopyalanmaz
+    
+    def __init__(self, base: VirtualFilesystem, username: str):
+        self.base = base
+        self.username = username
+        self.added: Dict[str, Dict[str, Inode]] = {}
+        self.removed: Dict[str, Set[str]] = {}
+        
+    @staticmethod
+    def normalize(path: str) -> str:
+        path = posixpath.normpath(path)
+        return '/' + path.lstrip('/') if path.startswith('/') else path
+        
+    def lookup(self, path: str) -> Optional[Inode]:
+        path = self.normalize(path)
+        if path == '/':
+            return self.base.root
+            
+        parent_path, name = posixpath.split(path)
+        parent = self.lookup(parent_path)
+        if parent is None or not parent.is_dir:
+            return None
+            
+        added = self.added.get(parent_path)
+        if added and name in added:
+            return added[name]
+        removed = self.removed.get(parent_path)
+        if removed and name in removed:
+            return None
+        return parent.children.get(name)
+        
+    def exists(self, path: str) -> bool:
+        return self.lookup(path) is not None
+        
+    def is_dir(self, path: str) -> bool:
+        node = self.lookup(path)
+        return node is not None and node.is_dir
+        
+    def listdir(self, path: str) -> Optional[List[Inode]]:
+        path = self.normalize(path)
+        node = self.lookup(path)
+        if node is None or not node.is_dir:
+            return None
+            
+        removed = self.removed.get(path, ())
+        added = self.added.get(path, {})
+        entries = [child for name, child in node.children.items()
+                   if name not in removed and name not in added]
+        entries.extend(added.values())
+        return entries
+        
+    def is_writable(self, path: str) -> bool:
+        if self.username == 'root':
+            return True
+        path = self.normalize(path)
+        return any(path == prefix or path.startswith(prefix + '/')
+                   for prefix in ('/home', '/tmp', '/var/tmp'))
+        
+    def _put(self, path: str, node: Inode):
+        parent_path, name = posixpath.split(path)
+        self.added.setdefault(parent_path, {})[name] = node
+        removed = self.removed.get(parent_path)
+        if removed and name in removed:
+            removed.discard(name)
+            if not removed:
+                del self.removed[parent_path]
+            
+    def mkdir(self, path: str, parents: bool = False) -> Optional[str]:
+        path = self.normalize(path)
+        if parents:
+            # mkdir -p: var olan dizin hata değildir, eksik üst dizinler kökten başlayarak oluşturulur
+            node = self.lookup(path)
+            if node is not None:
+                return None if node.is_dir else 'File exists'
+                
+            missing = []
+            parent = posixpath.dirname(path)
+            while self.lookup(parent) is None:
+                missing.append(parent)
+                parent = posixpath.dirname(parent)
+            if not self.is_dir(parent):
+                return 'Not a directory'
+            for directory in reversed(missing):
+                error = self.mkdir(directory)
+                if error:
+                    return error
+                    
+        if self.exists(path):
+            return 'File exists'
+        if not self.is_dir(posixpath.dirname(path)):
+            return 'No such file or directory'
+        if not self.is_writable(path):
+            return 'Permission denied'
+        self._put(path, Inode(posixpath.basename(path), True, owner=self.username, mtime=time.time()))
+        return None
+        
+    def write_file(self, path: str, content: str, append: bool = False) -> Optional[str]:
+        path = self.normalize(path)
+        node = self.lookup(path)
+        if node is not None and node.is_dir:
+            return 'Is a directory'
+        if not self.is_dir(posixpath.dirname(path)):
+            return 'No such file or directory'
+        if not self.is_writable(path):
+            return 'Permission denied'
+            
+        if append and node is not None:
+            content = node.content + content
+        self._put(path, Inode(posixpath.basename(path), False, content, owner=self.username, mtime=time.time()))
+        return None
+        
+    def touch(self, path: str) -> Optional[str]:
+        node = self.lookup(path)
+        if node is not None:
+            return None
+        return self.write_file(path, '')
+        
+    def remove(self, path: str, recursive: bool = False, directory: bool = False) -> Optional[str]:
+        path = self.normalize(path)
+        node = self.lookup(path)
+        if node is None:
+            return 'No such file or directory'
+        if path == '/':
+            return 'Operation not permitted'
+        if directory:
+            if not node.is_dir:
+                return 'Not a directory'
+            if self.listdir(path):
+                return 'Directory not empty'
+        elif node.is_dir and not recursive:
+            return 'Is a directory'
+        if not self.is_writable(path):
+            return 'Permission denied'
+            
+        parent_path, name = posixpath.split(path)
+        added = self.added.get(parent_path)
+        if added and name in added:
+            del added[name]
+            if not added:
+                del self.added[parent_path]
+        # yalnızca alttaki dizinde de bulunan isimler için silme işareti gerekir
+        if name in self.lookup(parent_path).children:
+            self.removed.setdefault(parent_path, set()).add(name)
+        
+        # silinen dizinin altındaki katman kayıtları da bırakılır
+        prefix = path + '/'
+        for overlay in (self.added, self.removed):
+            for key in [key for key in overlay if key == path or key.startswith(prefix)]:
+                del overlay[key]
+        return None
+
+
+base_filesystem = VirtualFilesystem.from_config()
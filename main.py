@@ -1,37 +1,73 @@
+import argparse
 import asyncio
 import logging
 import signal
 import sys
 from pathlib import Path
+from typing import Optional
 
 from config.settings import HONEYPOT_CONFIG
+from core.host_keys import ensure_host_keys
 from core.ssh_server import SSHHoneypot
+from core.supervisor import WorkerSupervisor
+from core.tarpit import tarpit
 from core.telnet_server import TelnetHoneypot
-from utils.logger import setup_logger
+from utils.attack_stats import attack_stats
+from utils.ban_store import open_ban_store
+from utils.event_store import event_store
+from utils.log_archive import log_archiver
+from utils.session_recorder import session_recorder
+from utils.logger import get_log_queue_stats, setup_logger, set_log_file_suffix
+from utils.metrics import MetricsServer, registry
+from utils.session_manager import SessionManager
+from utils.timer_wheel import idle_reaper
 
 
 class HoneypotManager:
     
-    def __init__(self):
+    def __init__(self, session_manager: SessionManager = None, reuse_port: bool = False,
+                 metrics_port: Optional[int] = None):
         self.ssh_server = None
         self.telnet_server = None
+        self.metrics_server = None
+        self.metrics_port = metrics_port or HONEYPOT_CONFIG['metrics']['port']
         self.running = False
+        self.reuse_port = reuse_port
         self.logger = setup_logger('honeypot_manager')
+        # SSH ve Telnet aynı rate limit, yasak listesi ve bağlantı sınırlarını paylaşır
+        self.session_manager = session_manager or SessionManager(ban_store=open_ban_store())
         
     async def start_services(self):
         try:
             self.logger.info("Honeypot servisleri başlatılıyor...")
             
+            event_store.start()
+            session_recorder.start()
+            log_archiver.start()
+            self.session_manager.start_sync()
+            idle_reaper.start()
+            attack_stats.start()
+            
             if HONEYPOT_CONFIG['ssh']['enabled']:
-                self.ssh_server = SSHHoneypot()
+                self.ssh_server = SSHHoneypot(self.session_manager, reuse_port=self.reuse_port)
                 await self.ssh_server.start()
                 self.logger.info(f"SSH Honeypot başlatıldı - Port: {HONEYPOT_CONFIG['ssh']['port']}")
             
             if HONEYPOT_CONFIG['telnet']['enabled']:
-                self.telnet_server = TelnetHoneypot()
+                self.telnet_server = TelnetHoneypot(self.session_manager, reuse_port=self.reuse_port)
                 await self.telnet_server.start()
                 self.logger.info(f"Telnet Honeypot başlatıldı - Port: {HONEYPOT_CONFIG['telnet']['port']}")
             
+            if HONEYPOT_CONFIG['metrics']['enabled']:
+                self.register_metrics()
+                self.metrics_server = MetricsServer(HONEYPOT_CONFIG['metrics']['host'], self.metrics_port)
+                try:
+                    await self.metrics_server.start()
+                except OSError as e:
+                    # metrik portu kullanımdaysa honeypot metriksiz çalışmaya devam eder
+                    self.logger.error(f"Metrik sunucusu başlatılamadı: {e}")
+                    self.metrics_server = None
+            
             self.running = True
             self.logger.info("Tüm honeypot servisleri aktif")
             
@@ -42,6 +78,14 @@ class HoneypotManager:
     async def stop_services(self):
         self.logger.info("Honeypot servisleri durduruluyor...")
         self.running = False
+        self.session_manager.stop_sync()
+        
+        if self.metrics_server:
+            await self.metrics_server.stop()
+            
+        # tutulan soketler kapanmadan sunucuların wait_closed() çağrısı bitmeyebilir
+        await tarpit.stop()
+        self.logger.info(f"Tarpit istatistikleri: {tarpit.get_stats()}")
         
         if self.ssh_server:
             await self.ssh_server.stop()
@@ -51,6 +95,39 @@ class HoneypotManager:
             await self.telnet_server.stop()
             self.logger.info("Telnet Honeypot durduruldu")
             
+        idle_reaper.stop()
+        await attack_stats.stop()
+        event_store.stop()
+        session_recorder.stop()
+        log_archiver.stop()
+        if self.session_manager.ban_store:
+            self.session_manager.ban_store.close()
+            
+    def register_metrics(self):
+        # servislerin mevcut istatistikleri kazıma anında okunur
+        def connection_stats():
+            return self.session_manager.get_connection_stats()
+            
+        registry.callback('bear_active_connections', 'gauge', "Açık bağlantılar",
+                          lambda: connection_stats()['connections_per_protocol'], label='protocol')
+        registry.callback('bear_active_ips', 'gauge', "Açık bağlantısı olan IP sayısı",
+                          lambda: connection_stats()['unique_ips'])
+        registry.callback('bear_blocked_ips', 'gauge', "Yasaklı IP sayısı",
+                          lambda: connection_stats()['blocked_ips_count'])
+        registry.callback('bear_log_records_total', 'counter', "Log kuyruğu kayıtları",
+                          lambda: {state: value for state, value in get_log_queue_stats().items()
+                                   if state != 'queue_size'}, label='state')
+        registry.callback('bear_log_queue_size', 'gauge', "Log kuyruğunda bekleyen kayıt",
+                          lambda: get_log_queue_stats()['queue_size'])
+        registry.callback('bear_event_store_dropped_total', 'counter', "Veritabanı kuyruğundan düşen olaylar",
+                          lambda: event_store.stats['dropped'])
+        registry.callback('bear_recording_chunks_dropped_total', 'counter', "Kuyruk dolduğu için düşen kayıt parçaları",
+                          lambda: session_recorder.stats['dropped'])
+        registry.callback('bear_tarpit_held', 'gauge', "Tarpit'te tutulan soketler",
+                          lambda: tarpit.get_stats()['held'])
+        registry.callback('bear_idle_tracked', 'gauge', "Zaman aşımı çarkında izlenen bağlantılar",
+                          lambda: idle_reaper.get_stats()['tracked'])
+        
     def setup_signal_handlers(self):
         def signal_handler(signum, frame):
             self.logger.info(f"Sinyal alındı: {signum}")
@@ -79,9 +156,37 @@ async def main():
     await manager.run()
 
 
+def run_worker(worker_id: int, rate_limiter, sync_channel):
+    set_log_file_suffix(f"worker{worker_id}")
+    attack_stats.set_instance(f"worker{worker_id}")
+    
+    session_manager = SessionManager(rate_limiter=rate_limiter, sync_channel=sync_channel)
+    manager = HoneypotManager(session_manager=session_manager, reuse_port=True,
+                              metrics_port=HONEYPOT_CONFIG['metrics']['port'] + worker_id)
+    
+    try:
+        asyncio.run(manager.run())
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bear SSH/Telnet honeypot")
+    parser.add_argument('--workers', type=int, default=HONEYPOT_CONFIG['workers']['count'],
+                        help="SO_REUSEPORT ile aynı portları dinleyen worker süreç sayısı")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        if args.workers > 1:
+            Path(HONEYPOT_CONFIG['logging']['log_dir']).mkdir(parents=True, exist_ok=True)
+            # worker'lar aynı anahtar dosyalarını paralel üretmeye çalışmasın
+            ensure_host_keys()
+            WorkerSupervisor(args.workers, run_worker, ban_store=open_ban_store()).run()
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\nHoneypot durduruldu.")
         sys.exit(0)
@@ -0,0 +1,21 @@
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import HONEYPOT_CONFIG
+
+
+# modüller içe aktarılırken logger ve servisler ayarlardaki yolları kullanır;
+# testler depo içine logs/, data/ veya recordings/ yazmasın
+_runtime_dir = Path(tempfile.mkdtemp(prefix='bear-tests-'))
+HONEYPOT_CONFIG['logging']['log_dir'] = _runtime_dir / 'logs'
+HONEYPOT_CONFIG['logging']['enrichment']['database'] = None
+HONEYPOT_CONFIG['security']['ip_list_cache_dir'] = _runtime_dir / 'data'
+HONEYPOT_CONFIG['security']['auto_ban']['persist_path'] = None
+HONEYPOT_CONFIG['recording']['directory'] = _runtime_dir / 'recordings'
+HONEYPOT_CONFIG['stats']['snapshot_path'] = _runtime_dir / 'data' / 'attack_stats.json'
+HONEYPOT_CONFIG['ssh']['host_key'] = _runtime_dir / 'keys' / 'ssh_host_key'
+HONEYPOT_CONFIG['database']['path'] = _runtime_dir / 'data' / 'honeypot.db'
+HONEYPOT_CONFIG['shell']['command_delay'] = 0
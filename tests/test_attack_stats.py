@@ -0,0 +1,90 @@
+import random
+from collections import Counter
+
+from utils.attack_stats import AttackStats, CountMinSketch, HyperLogLog, SpaceSaving, StreamCounter, hash_key
+
+
+def zipf_stream(count: int, keys: int, seed: int = 7):
+    generator = random.Random(seed)
+    weights = [1 / rank for rank in range(1, keys + 1)]
+    return [f"key{index}" for index in generator.choices(range(keys), weights, k=count)]
+
+
+def test_space_saving_keeps_heavy_hitters_with_bounded_error():
+    stream = zipf_stream(20000, 2000)
+    exact = Counter(stream)
+    heavy = SpaceSaving(50)
+    for key in stream:
+        heavy.add(key)
+    
+    assert len(heavy.counters) == 50
+    top = heavy.top(5)
+    assert [key for key, _, _ in top] == [key for key, _ in exact.most_common(5)]
+    for key, count, error in heavy.top(50):
+        assert count - error <= exact[key] <= count
+
+
+def test_space_saving_restore_rebuilds_heap():
+    heavy = SpaceSaving(2)
+    heavy.restore([['a', 5, 0], ['b', 1, 0], ['c', 9, 0]])
+    assert sorted(heavy.counters) == ['a', 'b']
+    heavy.add('d')
+    assert heavy.top(2) == [('a', 5, 0), ('d', 2, 1)]
+
+
+def test_count_min_never_underestimates():
+    stream = zipf_stream(20000, 2000)
+    exact = Counter(stream)
+    sketch = CountMinSketch(width=512, depth=4)
+    for key in stream:
+        sketch.add(hash_key(key))
+    
+    errors = [sketch.estimate(hash_key(key)) - count for key, count in exact.items()]
+    assert min(errors) >= 0
+    # e/width * N ~ %0.5 * 20000 sınırı
+    assert sum(error <= 110 for error in errors) / len(errors) > 0.95
+
+
+def test_hyperloglog_cardinality():
+    for true_count in (10, 1000, 50000):
+        hll = HyperLogLog(precision=12)
+        for index in range(true_count):
+            hll.add(hash_key(f"10.{index}"))
+        assert abs(hll.count() - true_count) <= max(2, true_count * 0.05)
+    
+    restored = HyperLogLog(precision=12)
+    restored.restore(hll.state())
+    assert restored.count() == hll.count()
+    restored.restore('AAAA')
+    assert restored.count() == hll.count()
+
+
+def test_stream_counter_state_round_trip():
+    counter = StreamCounter(capacity=10, width=64, depth=3, precision=8)
+    for key in zipf_stream(500, 40):
+        counter.add(key)
+    copy = StreamCounter(capacity=10, width=64, depth=3, precision=8)
+    copy.restore(counter.state())
+    
+    assert copy.total == 500
+    assert copy.top(5) == counter.top(5)
+    assert copy.distinct.count() == counter.distinct.count()
+    assert all(entry['count'] >= entry['error'] for entry in copy.top(10))
+
+
+def test_snapshot_is_reloaded(tmp_path):
+    stats = AttackStats()
+    stats.path = tmp_path / 'attack_stats.json'
+    stats.record_auth('192.0.2.1', 'root', '123456', success=False)
+    stats.record_auth('192.0.2.1', 'root', 'admin', success=True)
+    stats.record_command('192.0.2.1', 'uname -a')
+    stats.write_snapshot(stats.snapshot())
+    
+    reloaded = AttackStats()
+    reloaded.path = stats.path
+    reloaded.load()
+    summary = reloaded.summary(3)
+    assert reloaded.logins == {'success': 1, 'failed': 1}
+    assert summary['ips']['top'] == [{'value': '192.0.2.1', 'count': 2, 'error': 0}]
+    assert summary['credentials']['distinct'] == 2
+    assert summary['commands']['total'] == 1
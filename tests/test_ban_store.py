@@ -0,0 +1,119 @@
+import math
+import time
+from pathlib import Path
+
+from core.supervisor import WorkerSupervisor
+from utils.ban_store import OP_BAN, OP_UNBAN, RECORD, BanStore, pack_ip, unpack_ip
+from utils.session_manager import SessionManager
+
+
+def test_record_round_trip():
+    assert RECORD.size == 25
+    for ip in ('203.0.113.5', '2001:db8::1'):
+        data = RECORD.pack(OP_BAN, pack_ip(ip), 1234.5)
+        assert len(data) == 25
+        op, packed, expires_at = RECORD.unpack(data)
+        assert (op, unpack_ip(packed), expires_at) == (OP_BAN, ip, 1234.5)
+        
+    # IPv4 adresleri IPv6'ya eşlenmiş olarak tutulur
+    assert pack_ip('203.0.113.5') == bytes(10) + b'\xff\xff' + bytes([203, 0, 113, 5])
+
+
+def test_load_replays_bans_and_unbans_in_order(tmp_path):
+    store = BanStore(tmp_path / 'bans.bin')
+    later = time.time() + 3600
+    store.add('203.0.113.5', later)
+    store.add('203.0.113.6')
+    store.remove('203.0.113.5')
+    store.add('2001:db8::1', later)
+    store.remove('203.0.113.6')
+    store.add('203.0.113.6', later)
+    store.close()
+    assert (tmp_path / 'bans.bin').stat().st_size == 6 * RECORD.size
+    
+    bans = BanStore(tmp_path / 'bans.bin').load()
+    assert bans == {'2001:db8::1': later, '203.0.113.6': later}
+
+
+def test_load_drops_expired_bans_and_compacts(tmp_path):
+    store = BanStore(tmp_path / 'bans.bin')
+    store.add('203.0.113.5', time.time() - 1)
+    store.add('203.0.113.6')
+    store.add('203.0.113.7', time.time() + 3600)
+    store.remove('203.0.113.7')
+    store.close()
+    
+    assert BanStore(tmp_path / 'bans.bin').load() == {'203.0.113.6': math.inf}
+    # sıkıştırma sonrası yalnızca aktif yasak kalır
+    assert (tmp_path / 'bans.bin').stat().st_size == RECORD.size
+    assert not (tmp_path / 'bans.tmp').exists()
+
+
+def test_truncated_tail_record_is_ignored(tmp_path):
+    path = tmp_path / 'bans.bin'
+    record = RECORD.pack(OP_BAN, pack_ip('203.0.113.5'), math.inf)
+    partial = RECORD.pack(OP_UNBAN, pack_ip('203.0.113.5'), 0.0)[:10]
+    path.write_bytes(record + partial)
+    
+    assert BanStore(path).load() == {'203.0.113.5': math.inf}
+    assert path.read_bytes() == record
+
+
+def test_appends_after_load(tmp_path):
+    store = BanStore(tmp_path / 'data' / 'bans.bin')
+    assert store.load() == {}
+    store.add('203.0.113.5')
+    store.close()
+    assert BanStore(tmp_path / 'data' / 'bans.bin').load() == {'203.0.113.5': math.inf}
+
+
+def capture_errors(store: BanStore, monkeypatch) -> list:
+    errors = []
+    monkeypatch.setattr(store.logger, 'error', errors.append)
+    return errors
+
+
+def test_unreadable_file_gives_no_persisted_bans(tmp_path, monkeypatch):
+    path = tmp_path / 'bans.bin'
+    path.mkdir()
+    store = BanStore(path)
+    errors = capture_errors(store, monkeypatch)
+    
+    assert store.load() == {}
+    assert path.is_dir()
+    assert not (tmp_path / 'bans.tmp').exists()
+    assert len(errors) == 1
+    
+    # sonraki yazma hataları da loglanır, yasak yine bellekte uygulanır
+    manager = SessionManager(ban_store=store)
+    manager.block_ip('203.0.113.5')
+    assert manager.check_connection('203.0.113.5') == 'blocked'
+    assert len(errors) == 3
+
+
+def test_failed_compaction_keeps_loaded_bans(tmp_path, monkeypatch):
+    path = tmp_path / 'bans.bin'
+    store = BanStore(path)
+    store.add('203.0.113.5')
+    store.close()
+    
+    def fail_replace(self, target):
+        raise OSError(28, 'No space left on device')
+        
+    monkeypatch.setattr(Path, 'replace', fail_replace)
+    store = BanStore(path)
+    errors = capture_errors(store, monkeypatch)
+    assert store.load() == {'203.0.113.5': math.inf}
+    assert len(errors) == 1
+    assert not (tmp_path / 'bans.tmp').exists()
+    assert path.stat().st_size == RECORD.size
+
+
+def test_unwritable_directory_does_not_stop_supervisor(tmp_path, monkeypatch):
+    (tmp_path / 'file').write_text('x')
+    store = BanStore(tmp_path / 'file' / 'bans.bin')
+    errors = capture_errors(store, monkeypatch)
+    
+    supervisor = WorkerSupervisor(1, worker_target=None, ban_store=store)
+    assert supervisor.blocked_ips == {}
+    assert len(errors) == 1
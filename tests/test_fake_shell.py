@@ -0,0 +1,104 @@
+import asyncio
+import re
+
+import pytest
+
+from config.settings import FAKE_COMMAND_OUTPUTS
+from core.fake_shell import FakeShell, format_origin
+from core.response_cache import ByteTemplate, ResponseCache, frame_output
+
+
+BARE_LF = re.compile(rb'(?<!\r)\n')
+
+
+class CaptureChannel:
+    
+    def __init__(self):
+        self.data = bytearray()
+        
+    def write(self, data: bytes):
+        self.data += data
+        
+    def close(self):
+        pass
+
+
+def run_commands(*lines: str) -> bytes:
+    shell = FakeShell(client_ip='192.0.2.10', protocol='SSH', username='root', session_manager=None)
+    shell.channel = CaptureChannel()
+    
+    async def run():
+        for line in lines:
+            await shell.handle_input(line)
+            
+    asyncio.run(run())
+    return bytes(shell.channel.data)
+
+
+def test_byte_template_binds_fixed_fields_once():
+    template = ByteTemplate('{user}@{hostname}:{path}$ ', hostname='srv')
+    bound = template.bind(user='root')
+    assert bound.parts == [b'root@srv:', 'path', b'$ ']
+    assert bound.render(path='~') == b'root@srv:~$ '
+    assert ByteTemplate('# ').render() == b'# '
+
+
+def test_response_cache_frames_outputs():
+    cache = ResponseCache({'id': 'uid=0(root)', 'uname': 'Linux ü'})
+    assert cache.get('id') == b'\r\nuid=0(root)\r\n'
+    assert cache.get('uname') == frame_output('Linux ü') == '\r\nLinux ü\r\n'.encode('utf-8')
+
+
+def test_prompt_matches_string_format():
+    shell = FakeShell(client_ip='192.0.2.10', protocol='SSH', username='root', session_manager=None)
+    assert shell.get_prompt_bytes() == shell.get_prompt().encode('utf-8')
+    first = shell.get_prompt_bytes()
+    assert shell.get_prompt_bytes() is first
+    
+    shell.current_path = '/tmp'
+    assert shell.get_prompt_bytes() == shell.get_prompt().encode('utf-8')
+    assert b'/tmp' in shell.get_prompt_bytes()
+
+
+def test_static_output_and_prompt_written_as_bytes():
+    output = run_commands('id', 'echo hi')
+    prompt = FakeShell(client_ip='192.0.2.10', protocol='SSH', username='root',
+                       session_manager=None).get_prompt_bytes()
+    assert output.startswith(frame_output(FAKE_COMMAND_OUTPUTS['id']) + prompt)
+    assert output.endswith(b'\r\nhi\r\n' + prompt)
+
+
+@pytest.mark.parametrize('command', [
+    'ls -la',
+    'cat /etc/passwd',
+    'ps aux',
+    'cat /etc/hostname /nonexistent /also-missing',
+    'cat ~/.bashrc',
+    'uname -a',
+])
+def test_output_has_no_bare_line_feeds(command):
+    output = run_commands(command)
+    assert output
+    assert not BARE_LF.search(output), output[:200]
+
+
+def test_history_output_uses_crlf():
+    output = run_commands('whoami', 'pwd', 'history')
+    assert b'whoami\r\n' in output
+    assert not BARE_LF.search(output)
+
+
+def test_output_is_not_double_converted():
+    output = run_commands('ls -la', 'cat /etc/passwd')
+    assert b'\r\r\n' not in output
+
+
+@pytest.mark.parametrize('origin, expected', [
+    ({'asn': 64500, 'as_org': 'Example Net', 'country': 'TR'}, ", ASN: AS64500 Example Net, Ülke: TR"),
+    ({'asn': None, 'as_org': '', 'country': 'DE'}, ", Ülke: DE"),
+    ({'asn': 64500, 'as_org': '', 'country': ''}, ", ASN: AS64500"),
+    ({'asn': None, 'as_org': '', 'country': ''}, ""),
+    (None, ""),
+])
+def test_format_origin_skips_missing_fields(origin, expected):
+    assert format_origin(origin) == expected
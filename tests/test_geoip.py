@@ -0,0 +1,88 @@
+import json
+import logging
+
+import pytest
+
+from config.settings import HONEYPOT_CONFIG
+from utils import geoip
+from utils.geoip import IPEnricher, RangeDatabase, compile_ranges
+from utils.logger import HoneypotFormatter, setup_logger
+
+
+SOURCE = (
+    "1.0.0.0\t1.0.0.255\t13335\tUS\tCLOUDFLARENET\n"
+    "1.0.4.0\t1.0.7.255\t38803\tAU\tGTELECOM\n"
+    "1.0.8.0\t1.0.8.255\t0\tNone\tNot routed\n"
+    "203.0.113.0\t203.0.113.255\t64500\tTR\tÖrnek Ağ\n"
+    "2001:db8::\t2001:db8:ffff:ffff:ffff:ffff:ffff:ffff\t64501\tDE\tEXAMPLE-V6\n"
+)
+
+
+@pytest.fixture
+def database(tmp_path):
+    source = tmp_path / 'ip2asn.tsv'
+    source.write_text(SOURCE, encoding='utf-8')
+    assert compile_ranges(source, tmp_path / 'ipasn.bin') == (3, 1)
+    return RangeDatabase(tmp_path / 'ipasn.bin')
+
+
+@pytest.fixture
+def reset_enricher(monkeypatch):
+    monkeypatch.setattr(geoip, '_enricher', None)
+    monkeypatch.setattr(geoip, '_enricher_loaded', False)
+
+
+def test_ipv4_lookup(database):
+    assert database.lookup('1.0.0.1') == {'asn': 13335, 'as_org': 'CLOUDFLARENET', 'country': 'US'}
+    assert database.lookup('1.0.7.255') == {'asn': 38803, 'as_org': 'GTELECOM', 'country': 'AU'}
+    assert database.lookup('203.0.113.9') == {'asn': 64500, 'as_org': 'Örnek Ağ', 'country': 'TR'}
+
+
+def test_ipv6_lookup(database):
+    assert database.lookup('2001:db8::1') == {'asn': 64501, 'as_org': 'EXAMPLE-V6', 'country': 'DE'}
+
+
+@pytest.mark.parametrize('ip', ['1.0.1.0', '1.0.8.1', '9.9.9.9', '2001:db9::1', 'not-an-ip'])
+def test_misses_return_none(database, ip):
+    assert database.lookup(ip) is None
+
+
+def test_invalid_file_is_rejected(tmp_path):
+    path = tmp_path / 'bad.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        RangeDatabase(path)
+
+
+def test_enricher_caches_lookups(database):
+    enricher = IPEnricher(database, cache_size=16)
+    enricher.lookup('1.0.0.1')
+    enricher.lookup('1.0.0.1')
+    assert enricher.cache_info().hits == 1
+
+
+def test_missing_database_disables_enrichment(tmp_path, monkeypatch, reset_enricher):
+    monkeypatch.setitem(HONEYPOT_CONFIG['logging']['enrichment'], 'database', tmp_path / 'missing.bin')
+    assert geoip.get_enricher() is None
+    assert geoip.enrich_ip('1.0.0.1') is None
+
+
+def test_unreadable_database_is_logged(tmp_path, monkeypatch, reset_enricher):
+    path = tmp_path / 'bad.bin'
+    path.write_bytes(b'\0' * 64)
+    monkeypatch.setitem(HONEYPOT_CONFIG['logging']['enrichment'], 'database', path)
+    errors = []
+    monkeypatch.setattr(setup_logger('geoip'), 'error', errors.append)
+    
+    assert geoip.get_enricher() is None
+    assert len(errors) == 1 and str(path) in errors[0]
+
+
+def test_formatter_adds_origin_fields(database, monkeypatch, reset_enricher):
+    monkeypatch.setattr(geoip, '_enricher', IPEnricher(database, cache_size=16))
+    monkeypatch.setattr(geoip, '_enricher_loaded', True)
+    
+    record = logging.LogRecord('commands', logging.INFO, __file__, 1, 'Cmd: id', None, None)
+    record.client_ip = '203.0.113.9'
+    entry = json.loads(HoneypotFormatter().format(record))
+    assert (entry['asn'], entry['as_org'], entry['country']) == (64500, 'Örnek Ağ', 'TR')
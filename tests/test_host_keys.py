@@ -0,0 +1,80 @@
+import asyncio
+import stat
+import sys
+from pathlib import Path
+
+import asyncssh
+import pytest
+
+from config.settings import HONEYPOT_CONFIG
+from core import host_keys
+from core.host_keys import ensure_host_keys, ensure_host_keys_async, host_key_path, missing_host_keys
+
+
+@pytest.fixture
+def key_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(HONEYPOT_CONFIG['ssh'], 'host_key', tmp_path / 'keys' / 'ssh_host_key')
+    monkeypatch.setitem(HONEYPOT_CONFIG['ssh'], 'rsa_key_size', 1024)
+    return tmp_path / 'keys'
+
+
+def test_generates_each_offered_type(key_dir):
+    paths = ensure_host_keys(['ssh-ed25519', 'ecdsa-sha2-nistp256', 'ssh-rsa'])
+    assert paths == [key_dir / 'ssh_host_ed25519_key', key_dir / 'ssh_host_ecdsa_key', key_dir / 'ssh_host_key']
+    
+    algorithms = [asyncssh.read_private_key(str(path)).get_algorithm() for path in paths]
+    assert algorithms == ['ssh-ed25519', 'ecdsa-sha2-nistp256', 'ssh-rsa']
+    for path in paths:
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert sorted(p.name for p in key_dir.iterdir()) == sorted(p.name for p in paths)
+
+
+def test_rsa_key_keeps_configured_path(key_dir):
+    assert host_key_path('ssh-rsa') == HONEYPOT_CONFIG['ssh']['host_key']
+    assert host_key_path('ssh-ed25519') == key_dir / 'ssh_host_ed25519_key'
+
+
+def test_key_is_written_to_temp_file_then_renamed(key_dir, monkeypatch):
+    renames = []
+    replace = Path.replace
+    
+    def record_replace(self, target):
+        renames.append((self.name, Path(target).name, stat.S_IMODE(self.stat().st_mode)))
+        return replace(self, target)
+        
+    monkeypatch.setattr(Path, 'replace', record_replace)
+    ensure_host_keys(['ssh-ed25519'])
+    assert renames == [('ssh_host_ed25519_key.tmp', 'ssh_host_ed25519_key', 0o600)]
+
+
+def test_existing_keys_are_kept_unless_forced(key_dir):
+    path = ensure_host_keys(['ssh-ed25519'])[0]
+    original = path.read_bytes()
+    assert missing_host_keys(['ssh-ed25519', 'ssh-rsa']) == ['ssh-rsa']
+    
+    ensure_host_keys(['ssh-ed25519'])
+    assert path.read_bytes() == original
+    ensure_host_keys(['ssh-ed25519'], force=True)
+    assert path.read_bytes() != original
+
+
+def test_async_generation_runs_in_thread(key_dir, monkeypatch):
+    calls = []
+    to_thread = asyncio.to_thread
+    
+    async def record_to_thread(func, *args):
+        calls.append(func)
+        return await to_thread(func, *args)
+        
+    monkeypatch.setattr(asyncio, 'to_thread', record_to_thread)
+    assert asyncio.run(ensure_host_keys_async(['ssh-ed25519']))[0].exists()
+    assert asyncio.run(ensure_host_keys_async(['ssh-ed25519']))[0].exists()
+    assert calls == [ensure_host_keys]
+
+
+def test_cli_prints_key_paths(key_dir, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['host_keys', '--types', 'ssh-ed25519', 'ecdsa-sha2-nistp256'])
+    host_keys.main()
+    assert capsys.readouterr().out.splitlines() == [
+        str(key_dir / 'ssh_host_ed25519_key'), str(key_dir / 'ssh_host_ecdsa_key')
+    ]
@@ -0,0 +1,81 @@
+import pytest
+
+from utils.ip_ranges import IPRangeSet, parse_network
+
+
+def make_set(*entries) -> IPRangeSet:
+    ranges = IPRangeSet()
+    for entry in entries:
+        ranges.add(entry)
+    ranges.build()
+    return ranges
+
+
+@pytest.mark.parametrize('entry, expected', [
+    ('10.1.2.3/8', (4, 0x0a000000, 0x0affffff)),
+    ('192.0.2.7', (4, 0xc0000207, 0xc0000207)),
+    ('::ffff:10.0.0.0/104', (4, 0x0a000000, 0x0affffff)),
+    ('2001:db8::/32', (6, 0x20010db8 << 96, (0x20010db8 << 96) | ((1 << 96) - 1))),
+    ('10.0.0.0/33', None),
+    ('not-an-ip', None),
+])
+def test_parse_network(entry, expected):
+    assert parse_network(entry) == expected
+
+
+def test_contains_ipv4_ipv6_and_mapped_addresses():
+    ranges = make_set('10.0.0.0/8', '192.0.2.7', '2001:db8::/32', 'bogus')
+    assert '10.255.255.255' in ranges
+    assert '11.0.0.0' not in ranges
+    assert '192.0.2.7' in ranges and '192.0.2.8' not in ranges
+    assert '::ffff:10.1.1.1' in ranges
+    assert '2001:db8:ffff::1' in ranges
+    assert '2001:db9::1' not in ranges
+    assert 'garbage' not in ranges
+    assert ranges.invalid == 1
+
+
+def test_overlapping_and_adjacent_ranges_are_merged():
+    ranges = make_set('10.0.0.0/24', '10.0.1.0/24', '10.0.0.128/25', '10.0.3.0/24')
+    assert list(ranges.starts[4]) == [0x0a000000, 0x0a000300]
+    assert list(ranges.ends[4]) == [0x0a0001ff, 0x0a0003ff]
+    assert '10.0.2.0' not in ranges
+
+
+def test_build_merges_with_existing_ranges():
+    ranges = make_set('10.0.0.0/24')
+    ranges.add('10.0.1.0/24')
+    ranges.build()
+    assert len(ranges) == 1 and '10.0.1.5' in ranges
+
+
+def test_load_file_formats(tmp_path):
+    feed = tmp_path / 'drop.txt'
+    feed.write_text("# Spamhaus DROP\n1.10.16.0/20 ; SBL256894\n  203.0.113.9\n2001:db8::/48\n"
+                    "::ffff:198.51.100.0/120\n300.1.1.1/8\n1.2.3.4/40\n")
+    ranges = IPRangeSet()
+    assert ranges.load_file(feed) == 3
+    ranges.build()
+    assert ranges.invalid == 2
+    for ip in ('1.10.31.255', '203.0.113.9', '2001:db8::5', '198.51.100.77'):
+        assert ip in ranges
+
+
+def test_cache_round_trip_and_invalidation(tmp_path):
+    feed = tmp_path / 'feed.txt'
+    feed.write_text("10.0.0.0/8\n2001:db8::/32\n")
+    cache = tmp_path / 'cache' / 'ranges.bin'
+    
+    ranges = IPRangeSet.from_sources(['192.0.2.0/24'], [feed], cache_path=cache)
+    assert cache.exists()
+    cached = IPRangeSet.load_cache(cache, b"\0" * 8)
+    assert cached is None
+    
+    again = IPRangeSet.from_sources(['192.0.2.0/24'], [feed], cache_path=cache)
+    assert list(again.starts[4]) == list(ranges.starts[4])
+    assert again.starts[6] == ranges.starts[6]
+    assert '2001:db8::1' in again and '192.0.2.200' in again
+    
+    # kaynak değişince önbellek yeniden derlenir
+    changed = IPRangeSet.from_sources(['198.51.100.0/24'], [feed], cache_path=cache)
+    assert '198.51.100.1' in changed and '192.0.2.200' not in changed
@@ -0,0 +1,72 @@
+import pytest
+
+from core.line_buffer import LineBuffer
+
+
+@pytest.mark.parametrize('data', [b'ls\r', b'ls\n', b'ls\r\n', b'ls\r\x00'])
+def test_line_endings_produce_one_line(data):
+    buffer = LineBuffer(100)
+    lines, echo = buffer.feed(data + b'pwd\r')
+    assert lines == [b'ls', b'pwd']
+    assert echo == b'ls\r\npwd\r\n'
+
+
+def test_crlf_split_across_feeds():
+    buffer = LineBuffer(100)
+    assert buffer.feed(b'id\r')[0] == [b'id']
+    assert buffer.feed(b'\nwhoami\r')[0] == [b'whoami']
+
+
+def test_backspace_removes_whole_utf8_character():
+    buffer = LineBuffer(100)
+    lines, echo = buffer.feed('cağ'.encode() + b'\x7ft\r')
+    assert lines == ['cat'.encode()]
+    assert echo == 'cağ'.encode() + b'\b \bt\r\n'
+
+
+def test_ctrl_keys():
+    buffer = LineBuffer(100)
+    lines, echo = buffer.feed(b'rm -rf\x03')
+    assert lines == [b''] and echo == b'rm -rf^C\r\n'
+    
+    lines, echo = buffer.feed(b'abc\x15ls\r')
+    assert lines == [b'ls']
+    assert echo == b'abc' + b'\b \b' * 3 + b'ls\r\n'
+    
+    assert buffer.feed(b'x\x04')[0] == []
+    assert buffer.feed(b'\x15\x04')[0] == [b'exit']
+
+
+def test_tab_is_kept_as_a_separator():
+    buffer = LineBuffer(100)
+    lines, echo = buffer.feed(b'echo\thi\r')
+    assert lines == [b'echo\thi']
+    assert echo == b'echo\thi\r\n'
+    assert b'echo\thi'.split() == [b'echo', b'hi']
+
+
+def test_escape_sequences_are_swallowed():
+    buffer = LineBuffer(100)
+    lines, echo = buffer.feed(b'l\x1b[As\x1bOD\r')
+    assert lines == [b'ls']
+    assert echo == b'ls\r\n'
+
+
+def test_escape_sequence_split_across_feeds():
+    buffer = LineBuffer(100)
+    buffer.feed(b'\x1b')
+    buffer.feed(b'[1;')
+    assert buffer.feed(b'5Cid\r')[0] == [b'id']
+
+
+def test_overflow_echoes_accepted_run_before_bell():
+    buffer = LineBuffer(10)
+    lines, echo = buffer.feed(b'0123456789abc\r')
+    assert lines == [b'0123456789']
+    assert echo == b'0123456789\x07\r\n'
+    assert buffer.truncated == 3
+
+
+def test_echo_disabled():
+    buffer = LineBuffer(100, echo=False)
+    assert buffer.feed(b'secret\r') == ([b'secret'], b'')
@@ -0,0 +1,118 @@
+import gzip
+import json
+
+import pytest
+
+from utils.log_archive import (
+    LogArchiver, SEGMENT_PATTERN, get_codec, index_path, load_index, read_records
+)
+
+
+def write_segment(directory, name, count, start_ts=1000.0):
+    lines = []
+    for i in range(count):
+        entry = {'timestamp': start_ts + i, 'level': 'INFO', 'logger': 'ssh_session',
+                 'message': f'Cmd: echo "{i}"', 'client_ip': f"10.0.0.{i % 4}"}
+        lines.append(json.dumps(entry) + '\n')
+    path = directory / name
+    path.write_text(''.join(lines))
+    return path, [line.encode() for line in lines]
+
+
+def make_archiver(log_dir, codec='gzip', retention=10) -> LogArchiver:
+    archiver = LogArchiver()
+    archiver.log_dir = log_dir
+    archiver.codec = get_codec(codec)
+    archiver.block_size = 512
+    archiver.retention_segments = retention
+    return archiver
+
+
+def test_archive_writes_blocks_and_index(tmp_path):
+    segment, lines = write_segment(tmp_path, 'ssh_session.20240101T000000-000000.json', 100)
+    make_archiver(tmp_path).archive(segment)
+    
+    target = tmp_path / 'ssh_session.20240101T000000-000000.json.gz'
+    assert not segment.exists()
+    # bağımsız gzip üyeleri tek dosya gibi açılır (zcat uyumu)
+    assert gzip.decompress(target.read_bytes()) == b''.join(lines)
+    
+    index = load_index(target)
+    assert index['segment'] == target.name
+    assert index['records'] == 100
+    assert (index['start_ts'], index['end_ts']) == (1000.0, 1099.0)
+    assert len(index['blocks']) > 5
+    assert sorted(index['ips']) == ['10.0.0.0', '10.0.0.1', '10.0.0.2', '10.0.0.3']
+    assert list(read_records(target)) == lines
+
+
+def test_read_records_by_ip_opens_only_matching_blocks(tmp_path):
+    segment, lines = write_segment(tmp_path, 'commands.20240101T000000-000000.json', 200)
+    make_archiver(tmp_path).archive(segment)
+    target = tmp_path / 'commands.20240101T000000-000000.json.gz'
+    index = load_index(target)
+    
+    candidates = list(read_records(target, index, client_ip='10.0.0.2'))
+    expected = [line for line in lines if b'"client_ip": "10.0.0.2"' in line]
+    assert [line for line in candidates if line in expected] == expected
+    assert len(candidates) < len(lines)
+    assert list(read_records(target, index, client_ip='192.0.2.1')) == []
+
+
+def test_read_records_skips_blocks_outside_time_range(tmp_path):
+    segment, lines = write_segment(tmp_path, 'commands.20240101T000000-000000.json', 200)
+    make_archiver(tmp_path).archive(segment)
+    target = tmp_path / 'commands.20240101T000000-000000.json.gz'
+    
+    selected = list(read_records(target, since=1150, until=1160))
+    timestamps = [json.loads(line)['timestamp'] for line in selected]
+    assert set(range(1150, 1161)) <= set(timestamps)
+    assert len(selected) < 50
+
+
+def test_read_records_without_index(tmp_path):
+    segment, lines = write_segment(tmp_path, 'commands.20240101T000000-000000.json', 30)
+    assert list(read_records(segment)) == lines
+    
+    make_archiver(tmp_path).archive(segment)
+    target = tmp_path / 'commands.20240101T000000-000000.json.gz'
+    index_path(target).unlink()
+    assert load_index(target) is None
+    assert list(read_records(target, client_ip='10.0.0.1')) == lines
+
+
+def test_zstd_archive_round_trip(tmp_path):
+    pytest.importorskip('zstandard')
+    segment, lines = write_segment(tmp_path, 'commands.20240101T000000-000000.json', 100)
+    make_archiver(tmp_path, codec='zstd').archive(segment)
+    target = tmp_path / 'commands.20240101T000000-000000.json.zst'
+    assert list(read_records(target)) == lines
+    assert list(read_records(target, index=None)) == lines
+
+
+def test_retention_keeps_newest_segments(tmp_path):
+    archiver = make_archiver(tmp_path, retention=2)
+    for second in range(4):
+        segment, _ = write_segment(tmp_path, f"commands.20240101T00000{second}-000000.json", 5)
+        archiver.archive(segment)
+    write_segment(tmp_path, 'ssh_session.20240101T000000-000000.json', 5)
+    
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == [
+        'commands.20240101T000002-000000.json.gz', 'commands.20240101T000002-000000.json.gz.idx',
+        'commands.20240101T000003-000000.json.gz', 'commands.20240101T000003-000000.json.gz.idx',
+        'ssh_session.20240101T000000-000000.json',
+    ]
+    assert archiver.stats['removed'] == 2
+
+
+def test_pending_segments_respect_worker_suffix(tmp_path):
+    for name in ('commands.20240101T000000-000000.json', 'commands.w1.20240101T000000-000000.json',
+                 'commands.json', 'commands.20240101T000001-000000.json.gz'):
+        (tmp_path / name).write_text('')
+    archiver = make_archiver(tmp_path)
+    assert [path.name for path in archiver.pending_segments()] == ['commands.20240101T000000-000000.json']
+    
+    archiver.suffix = '.w1'
+    assert [path.name for path in archiver.pending_segments()] == ['commands.w1.20240101T000000-000000.json']
+    assert SEGMENT_PATTERN.match('commands.w1.20240101T000000-000000.json').group('stem') == 'commands.w1'
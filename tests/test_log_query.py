@@ -0,0 +1,96 @@
+import argparse
+import json
+import time
+
+import pytest
+
+from utils.log_archive import GzipCodec, build_archive, index_path
+from utils.log_query import LogQuery, add_query_arguments, find_segments, parse_time, main, run_query, run_scan
+
+
+def record(ts: float, ip: str, message: str, **fields) -> dict:
+    return {'timestamp': ts, 'datetime': '', 'level': 'INFO', 'logger': 'commands',
+            'message': message, 'client_ip': ip, **fields}
+
+
+def write_log(path, entries):
+    path.write_text(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries), encoding='utf-8')
+    return path
+
+
+def archive(path, block_size: int = 256):
+    # LogArchiver.archive ile aynı dosya düzeni; dizin yan dosyada tutulur
+    compressed, index = build_archive(path, GzipCodec(), block_size)
+    target = path.with_name(path.name + '.gz')
+    index['segment'] = target.name
+    target.write_bytes(compressed)
+    index_path(target).write_text(json.dumps(index), encoding='utf-8')
+    path.unlink()
+    return target
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    old = [record(1000 + i, f"10.0.0.{i % 3}", f"Cmd: ls /tmp/{i}", protocol='SSH') for i in range(30)]
+    new = [record(5000 + i, '10.0.0.9', f"Login - User: root, Pass: pw{i}", protocol='Telnet') for i in range(5)]
+    archive(write_log(tmp_path / 'commands.20240101T000000-000000.json', old))
+    write_log(tmp_path / 'commands.json', new)
+    (tmp_path / 'unrelated.txt').write_text('x')
+    return tmp_path
+
+
+def test_parse_time_formats():
+    assert parse_time('1700000000') == 1700000000.0
+    assert parse_time('2024-01-02 03:04') == time.mktime((2024, 1, 2, 3, 4, 0, 0, 0, -1))
+    assert abs(parse_time('2h') - (time.time() - 7200)) < 5
+
+
+def test_matches_reads_fields_from_message():
+    entry = record(10, '1.2.3.4', 'Login - User: admin, Pass: secret', protocol='SSH')
+    assert LogQuery(username='admin', protocol='ssh').matches(entry)
+    assert not LogQuery(username='root').matches(entry)
+    assert not LogQuery(since=11).matches(entry)
+    assert LogQuery(command='wget').matches(record(10, '1.2.3.4', 'Cmd: wget http://x/a.sh'))
+
+
+def test_find_segments_orders_archived_before_live(log_dir):
+    names = [path.name for path in find_segments(log_dir)]
+    assert names == ['commands.20240101T000000-000000.json.gz', 'commands.json']
+    assert find_segments(log_dir, ['ssh_session']) == []
+
+
+def test_indexed_segment_is_skipped_by_time_and_ip(log_dir):
+    segment = find_segments(log_dir)[0]
+    results = list(run_scan([segment], LogQuery(since=4000), jobs=1))
+    assert results[0].skipped
+    results = list(run_scan([segment], LogQuery(client_ip='10.0.0.9'), jobs=1))
+    assert results[0].skipped
+
+
+def test_scan_filters_archived_records_by_ip(log_dir):
+    results = list(run_scan(find_segments(log_dir), LogQuery(client_ip='10.0.0.1'), jobs=1))
+    lines = [json.loads(line) for result in results for line in result.lines]
+    assert [entry['timestamp'] for entry in lines] == [1000 + i for i in range(1, 30, 3)]
+
+
+def test_parallel_scan_matches_serial(log_dir):
+    query = LogQuery(top=['ip', 'username'])
+    serial = list(run_scan(find_segments(log_dir), query, jobs=1))
+    parallel = list(run_scan(find_segments(log_dir), query, jobs=2))
+    assert [r.counters for r in serial] == [r.counters for r in parallel]
+    assert parallel[1].counters['username'] == {'root': 5}
+
+
+def test_run_query_count(log_dir, capsys):
+    parser = argparse.ArgumentParser()
+    add_query_arguments(parser)
+    args = parser.parse_args(['--log-dir', str(log_dir), '--protocol', 'ssh', '--count', '-j', '1'])
+    assert run_query(args) == 0
+    assert capsys.readouterr().out.strip() == '30'
+
+
+def test_main_count(log_dir, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--log-dir', str(log_dir), '--protocol', 'ssh', '--count', '-j', '1'])
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.strip() == '30'
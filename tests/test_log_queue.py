@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import time
+
+from config.settings import HONEYPOT_CONFIG
+from utils import logger as logger_module
+from utils.logger import BatchedRotatingFileHandler, QueueLogWriter, setup_logger
+
+
+class Capture(logging.Handler):
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.flushes = 0
+        
+    def emit(self, record):
+        self.records.append(record)
+        
+    def flush(self):
+        self.flushes += 1
+
+
+def make_record(message: str, level: int = logging.INFO, name: str = 'test_queue') -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, message, None, None)
+
+
+def make_writer(policy: str, max_size: int) -> QueueLogWriter:
+    # iş parçacığı başlatılmaz; kuyruğa alınan kayıtlar doğrudan incelenir
+    writer = QueueLogWriter()
+    writer.queue = queue.Queue(maxsize=max_size)
+    writer.overflow_policy = policy
+    writer.high_watermark = int(max_size * 0.8)
+    writer._running = True
+    return writer
+
+
+def queued_messages(writer: QueueLogWriter):
+    return [writer.queue.get_nowait().msg for _ in range(writer.queue.qsize())]
+
+
+def test_drop_oldest_keeps_newest_records():
+    writer = make_writer('drop_oldest', 3)
+    for i in range(5):
+        writer.enqueue(make_record(str(i)))
+    assert queued_messages(writer) == ['2', '3', '4']
+    assert writer.stats['dropped'] == 2
+
+
+def test_sample_thins_info_records_but_keeps_warnings():
+    writer = make_writer('sample', 100)
+    writer.high_watermark = 2
+    writer.sample_every = 3
+    for i in range(8):
+        writer.enqueue(make_record(f"info{i}"))
+    writer.enqueue(make_record('warning', logging.WARNING))
+    
+    # eşik üstünde her üç INFO kaydından biri tutulur
+    assert queued_messages(writer) == ['info0', 'info1', 'info4', 'info7', 'warning']
+    assert writer.stats['sampled_out'] == 4
+
+
+def test_writer_thread_drains_in_batches_and_flushes_once_per_batch():
+    writer = QueueLogWriter()
+    writer.batch_size = 100
+    capture = Capture()
+    writer.register('test_queue', [capture])
+    
+    for i in range(50):
+        writer.queue.put(make_record(str(i)))
+    writer.start()
+    writer.stop()
+    
+    assert [record.msg for record in capture.records] == [str(i) for i in range(50)]
+    assert capture.flushes == 1
+    assert writer.stats['written'] == 50
+
+
+def test_stopped_writer_dispatches_directly():
+    writer = QueueLogWriter()
+    capture = Capture()
+    writer.register('test_queue', [capture])
+    writer.enqueue(make_record('direct'))
+    assert [record.msg for record in capture.records] == ['direct']
+    assert writer.queue.empty()
+
+
+def test_batched_handler_rolls_over_by_tracked_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger_module.log_archiver, 'enabled', False)
+    handler = BatchedRotatingFileHandler(tmp_path / 'test.json', maxBytes=100, backupCount=2, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for i in range(10):
+        handler.emit(make_record(f"{i:02d}" + 'x' * 28))
+    handler.close()
+    
+    files = sorted(path.name for path in tmp_path.iterdir())
+    assert files == ['test.json', 'test.json.1', 'test.json.2']
+    assert all((tmp_path / name).stat().st_size <= 100 for name in files)
+    assert (tmp_path / 'test.json').read_text().splitlines()[-1].startswith('09')
+
+
+def test_rollover_hands_segment_to_archiver(tmp_path, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(logger_module.log_archiver, 'enabled', True)
+    monkeypatch.setattr(logger_module.log_archiver, 'submit', submitted.append)
+    
+    handler = BatchedRotatingFileHandler(tmp_path / 'test.json', maxBytes=100, backupCount=2, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for i in range(10):
+        handler.emit(make_record(f"{i:02d}" + 'x' * 28))
+    handler.close()
+    
+    # .1/.2 zinciri yerine zaman damgalı parçalar oluşur ve hiçbiri silinmez
+    assert len(submitted) == 3
+    assert all(segment.exists() and segment.name.startswith('test.') for segment in submitted)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([s.name for s in submitted] + ['test.json'])
+
+
+def test_queued_logger_writes_json_lines():
+    logger = setup_logger('test_queue_json')
+    logger.warning("Komut %s", 'id', extra={'client_ip': '192.0.2.4'})
+    
+    path = HONEYPOT_CONFIG['logging']['log_dir'] / 'test_queue_json.json'
+    deadline = time.time() + 5
+    while time.time() < deadline and not (path.exists() and path.read_text()):
+        time.sleep(0.05)
+    entry = json.loads(path.read_text().splitlines()[0])
+    assert entry['message'] == "Komut id"
+    assert entry['client_ip'] == '192.0.2.4'
+    assert entry['level'] == 'WARNING'
@@ -0,0 +1,79 @@
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils.logger import HoneypotFormatter, get_session_logger, setup_logger
+
+
+class Capture(logging.Handler):
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def capture():
+    logger = setup_logger('test_session')
+    handler = Capture()
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def test_sessions_share_one_logger():
+    handlers = len(setup_logger('test_session').handlers)
+    adapters = [get_session_logger('test_session', client_ip=f"192.0.2.{i}", protocol='SSH', session_id=str(i))
+                for i in range(50)]
+    assert {id(adapter.logger) for adapter in adapters} == {id(logging.getLogger('test_session'))}
+    assert len(setup_logger('test_session').handlers) == handlers
+
+
+def test_session_fields_are_attached_to_records(capture):
+    logger = get_session_logger('test_session', client_ip='192.0.2.1', protocol='SSH', session_id='abc123')
+    logger.info("Oturum başladı")
+    logger.info("Komut", extra={'command': 'uname -a', 'username': 'root'})
+    
+    first, second = capture.records
+    assert (first.client_ip, first.protocol, first.session_id) == ('192.0.2.1', 'SSH', 'abc123')
+    assert not hasattr(first, 'command')
+    assert (second.client_ip, second.command, second.username) == ('192.0.2.1', 'uname -a', 'root')
+
+
+def test_formatter_emits_session_fields(capture):
+    get_session_logger('test_session', client_ip='192.0.2.9', protocol='Telnet',
+                       username='admin', session_id='s1').warning("Giriş")
+    entry = json.loads(HoneypotFormatter().format(capture.records[0]))
+    assert entry['logger'] == 'test_session'
+    assert entry['message'] == "Giriş"
+    assert {key: entry[key] for key in ('client_ip', 'protocol', 'username', 'session_id')} == {
+        'client_ip': '192.0.2.9', 'protocol': 'Telnet', 'username': 'admin', 'session_id': 's1'}
+
+
+WORKER_SCRIPT = """
+import sys
+from config.settings import HONEYPOT_CONFIG
+HONEYPOT_CONFIG['logging']['log_dir'] = sys.argv[1]
+
+import main
+from utils.logger import get_queue_writer, security_logger, set_log_file_suffix, setup_logger
+
+set_log_file_suffix('worker1')
+security_logger.log_ip_blocked('203.0.113.5', 'test')
+setup_logger('late_logger', use_queue=False).info('test')
+get_queue_writer().stop()
+"""
+
+
+def test_worker_suffix_applies_to_loggers_created_at_import(tmp_path):
+    # worker süreci gibi: sunucu modülleri içe aktarıldıktan sonra son ek ayarlanır
+    subprocess.run([sys.executable, '-c', WORKER_SCRIPT, str(tmp_path)], check=True, capture_output=True,
+                   cwd=Path(__file__).resolve().parent.parent, timeout=60)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['late_logger.worker1.json', 'security.worker1.json']
@@ -0,0 +1,103 @@
+import asyncio
+
+from core.fake_shell import FakeShell
+from utils.metrics import MetricsRegistry, MetricsServer, command_latency, commands_total, escape_label
+
+
+def test_counter_samples_are_sorted_by_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter('bear_test_total', "Test", ('protocol', 'result'))
+    counter.inc('ssh', 'rejected')
+    counter.inc('ssh', 'accepted', amount=2)
+    counter.inc('ssh', 'accepted')
+    
+    assert registry.render().splitlines() == [
+        '# HELP bear_test_total Test',
+        '# TYPE bear_test_total counter',
+        'bear_test_total{protocol="ssh",result="accepted"} 3',
+        'bear_test_total{protocol="ssh",result="rejected"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('bear_test_seconds', "Test", ('protocol',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'telnet')
+        
+    assert registry.render().splitlines()[2:] == [
+        'bear_test_seconds_bucket{protocol="telnet",le="0.1"} 2',
+        'bear_test_seconds_bucket{protocol="telnet",le="1"} 3',
+        'bear_test_seconds_bucket{protocol="telnet",le="+Inf"} 4',
+        'bear_test_seconds_sum{protocol="telnet"} 3.65',
+        'bear_test_seconds_count{protocol="telnet"} 4',
+    ]
+
+
+def test_unlabelled_histogram_and_callback_metric():
+    registry = MetricsRegistry()
+    registry.histogram('bear_plain_seconds', "Test", buckets=(1.0,)).observe(2.0)
+    registry.callback('bear_queue_size', 'gauge', "Test", lambda: {'b': 2, 'a': 1.5}, label='queue')
+    registry.callback('bear_broken', 'gauge', "Test", lambda: 1 / 0)
+    
+    lines = registry.render().splitlines()
+    assert lines[2:5] == ['bear_plain_seconds_bucket{le="1"} 0', 'bear_plain_seconds_bucket{le="+Inf"} 1',
+                          'bear_plain_seconds_sum 2']
+    assert lines[-2:] == ['bear_queue_size{queue="a"} 1.5', 'bear_queue_size{queue="b"} 2']
+    # hata veren metrik atlanır, çıktının geri kalanı bozulmaz
+    assert not any('bear_broken' in line for line in lines)
+
+
+def test_label_values_are_escaped():
+    assert escape_label('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+    registry = MetricsRegistry()
+    registry.counter('bear_commands_total', "Test", ('command',)).inc('echo "x"\n')
+    assert 'bear_commands_total{command="echo \\"x\\"\\n"} 1' in registry.render()
+
+
+def test_shell_commands_are_counted_with_bounded_labels():
+    shell = FakeShell(client_ip='192.0.2.10', protocol='SSH', username='root', session_manager=None)
+    before = commands_total.values.get(('SSH',), 0)
+    
+    async def run():
+        await shell.execute_command('whoami', [])
+        await shell.execute_command('x' * 40, [])
+        
+    asyncio.run(run())
+    assert commands_total.values[('SSH',)] == before + 2
+    assert ('whoami',) in command_latency.series
+    # tanımsız komut adları tek bir seride toplanır
+    assert ('x' * 40,) not in command_latency.series
+    assert ('other',) in command_latency.series
+
+
+async def fetch(port: int, request: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(request)
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_server_answers_only_metrics_path():
+    registry = MetricsRegistry()
+    registry.counter('bear_test_total', "Test").inc()
+    
+    async def run():
+        server = MetricsServer('127.0.0.1', 0, registry)
+        await server.start()
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            return (await fetch(port, b'GET /metrics?x=1 HTTP/1.1\r\nHost: x\r\n\r\n'),
+                    await fetch(port, b'GET / HTTP/1.1\r\n\r\n'),
+                    await fetch(port, b'POST /metrics HTTP/1.1\r\n\r\n'))
+        finally:
+            await server.stop()
+            
+    ok, root, post = asyncio.run(run())
+    head, body = ok.split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200 OK')
+    assert b'Content-Type: text/plain; version=0.0.4' in head
+    assert body == b'# HELP bear_test_total Test\n# TYPE bear_test_total counter\nbear_test_total 1\n'
+    assert root.startswith(b'HTTP/1.1 404 Not Found') and root.endswith(b'not found\n')
+    assert post.startswith(b'HTTP/1.1 404 Not Found')
@@ -0,0 +1,77 @@
+import multiprocessing
+
+from utils.rate_limiter import RateLimiter, SharedRateLimiter
+
+
+def test_burst_then_steady_rate():
+    limiter = RateLimiter(max_requests=5, time_window=10, max_tracked_ips=100)
+    assert [limiter.allow('10.0.0.1', now=0) for _ in range(6)] == [True] * 5 + [False]
+    # her emission_interval (2s) bir istek hakkı geri gelir
+    assert not limiter.allow('10.0.0.1', now=1.9)
+    assert limiter.allow('10.0.0.1', now=2.0)
+    assert not limiter.allow('10.0.0.1', now=2.0)
+    assert limiter.allow('10.0.0.2', now=2.0)
+    assert limiter.stats['rejected'] == 3
+
+
+def test_full_bucket_entries_expire():
+    limiter = RateLimiter(max_requests=5, time_window=10, max_tracked_ips=100)
+    limiter.allow('10.0.0.1', now=0)
+    limiter.allow('10.0.0.2', now=1)
+    assert limiter.purge(now=2.0) == 1
+    assert list(limiter.tats) == ['10.0.0.2']
+    
+    # yeni istekler de sıradaki süresi dolmuş kayıtları temizler
+    limiter.allow('10.0.0.3', now=10)
+    assert list(limiter.tats) == ['10.0.0.3']
+    assert limiter.stats['expired'] == 2
+
+
+def test_least_recently_used_ip_is_evicted_at_capacity():
+    limiter = RateLimiter(max_requests=5, time_window=10, max_tracked_ips=2)
+    limiter.allow('a', now=0)
+    limiter.allow('b', now=0)
+    limiter.allow('a', now=0.5)
+    limiter.allow('c', now=1)
+    assert list(limiter.tats) == ['a', 'c']
+    assert limiter.stats['evicted'] == 1
+
+
+def test_stats_report_table_size():
+    limiter = RateLimiter(max_requests=5, time_window=10, max_tracked_ips=100)
+    for i in range(10):
+        limiter.allow(f"198.51.100.{i}", now=0)
+    stats = limiter.get_stats()
+    assert stats['tracked_ips'] == 10
+    assert stats['allowed'] == 10
+    assert stats['memory_bytes'] > 0
+
+
+def test_shared_limiter_matches_local_limiter():
+    local = RateLimiter(max_requests=3, time_window=3, max_tracked_ips=100)
+    shared = SharedRateLimiter.create(max_requests=3, time_window=3, slots=1024, lock_stripes=4)
+    times = [0, 0, 0, 0, 0.5, 1.0, 1.0, 5.0, 5.0]
+    assert [shared.allow('192.0.2.7', now=t) for t in times] == [local.allow('192.0.2.7', now=t) for t in times]
+    assert shared.get_stats()['memory_bytes'] == 1024 * 8
+
+
+def consume(limiter: SharedRateLimiter, ip: str, attempts: int, now: float, results):
+    results.put(sum(limiter.allow(ip, now=now) for _ in range(attempts)))
+
+
+def test_shared_limiter_budget_is_shared_between_processes():
+    context = multiprocessing.get_context('spawn')
+    shared = SharedRateLimiter.create(max_requests=5, time_window=60, slots=64, context=context)
+    results = context.Queue()
+    workers = [context.Process(target=consume, args=(shared, '203.0.113.9', 4, 100.0, results))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+    
+    # üç süreç toplam 12 deneme yaptı; bütçe süreç başına değil IP başına
+    assert allowed == 5
+    assert not shared.allow('203.0.113.9', now=100.0)
+    assert shared.allow('203.0.113.10', now=100.0)
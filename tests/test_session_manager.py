@@ -0,0 +1,208 @@
+import math
+import time
+
+import pytest
+
+from config.settings import HONEYPOT_CONFIG
+from core.ssh_server import SSHHoneypot
+from core.telnet_server import TelnetHoneypot
+from utils.ban_store import BanStore
+from utils.session_manager import ConnectionSlots, SessionManager
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setitem(HONEYPOT_CONFIG['ssh'], 'max_connections', 2)
+    monkeypatch.setitem(HONEYPOT_CONFIG['telnet'], 'max_connections', 1)
+    monkeypatch.setitem(HONEYPOT_CONFIG['security'], 'max_total_connections', 3)
+    monkeypatch.setitem(HONEYPOT_CONFIG['security'], 'max_concurrent_per_ip', 2)
+    monkeypatch.setitem(HONEYPOT_CONFIG['security']['rate_limit'], 'max_connections_per_ip', 5)
+
+
+@pytest.fixture
+def manager(limits):
+    return SessionManager()
+
+
+def test_connection_slots():
+    slots = ConnectionSlots(2)
+    assert slots.try_acquire() and slots.try_acquire()
+    assert not slots.try_acquire()
+    slots.release()
+    slots.release()
+    slots.release()
+    assert slots.in_use == 0 and slots.available == 2
+
+
+def test_each_protocol_has_its_own_limit(manager):
+    assert manager.add_connection('192.0.2.1', 'telnet')
+    assert not manager.add_connection('192.0.2.2', 'telnet')
+    assert manager.add_connection('192.0.2.2', 'ssh')
+    assert manager.add_connection('192.0.2.3', 'SSH')
+    assert not manager.add_connection('192.0.2.4', 'ssh')
+    
+    stats = manager.get_connection_stats()
+    assert stats['total_connections'] == 3
+    assert stats['connections_per_protocol'] == {'ssh': 2, 'telnet': 1}
+    assert stats['unique_ips'] == 3
+
+
+def test_remove_releases_the_slot(manager):
+    manager.add_connection('192.0.2.1', 'telnet')
+    manager.remove_connection('192.0.2.9', 'telnet')
+    assert manager.protocol_slots['telnet'].in_use == 1
+    
+    manager.remove_connection('192.0.2.1', 'telnet')
+    assert manager.total_connections == 0
+    assert manager.active_connections == {}
+    assert manager.add_connection('192.0.2.2', 'telnet')
+
+
+def test_full_server_does_not_charge_the_rate_limit(manager):
+    manager.add_connection('192.0.2.1', 'telnet')
+    for _ in range(10):
+        assert not manager.can_connect('192.0.2.7', 'telnet')
+    assert '192.0.2.7' not in manager.rate_limiter.tats
+    
+    # SSH tarafı boş; hız sınırı yalnızca kabul edilebilecek denemelerde harcanır
+    assert [manager.can_connect('192.0.2.7', 'ssh') for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_global_limit_spans_protocols(limits, monkeypatch):
+    monkeypatch.setitem(HONEYPOT_CONFIG['security'], 'max_total_connections', 2)
+    manager = SessionManager()
+    assert manager.add_connection('192.0.2.1', 'ssh')
+    assert manager.add_connection('192.0.2.2', 'telnet')
+    assert not manager.can_connect('192.0.2.3', 'ssh')
+    assert not manager.add_connection('192.0.2.3', 'ssh')
+    # protokol sınırında reddedilen bağlantı genel yuvayı geri bırakır
+    manager.remove_connection('192.0.2.1', 'ssh')
+    assert not manager.add_connection('192.0.2.3', 'telnet')
+    assert manager.global_slots.in_use == 1
+    assert manager.add_connection('192.0.2.3', 'ssh')
+
+
+def test_concurrent_connections_per_ip(manager):
+    assert manager.add_connection('192.0.2.1', 'ssh')
+    assert manager.add_connection('192.0.2.1', 'telnet')
+    assert not manager.can_connect('192.0.2.1', 'ssh')
+    assert not manager.add_connection('192.0.2.1', 'ssh')
+    assert manager.can_connect('192.0.2.2', 'ssh')
+
+
+def test_listeners_share_one_manager(manager):
+    ssh = SSHHoneypot(manager)
+    telnet = TelnetHoneypot(manager)
+    assert ssh.session_manager is telnet.session_manager is manager
+    
+    manager.add_connection('192.0.2.1', 'ssh')
+    manager.add_connection('192.0.2.1', 'telnet')
+    assert not telnet.session_manager.can_connect('192.0.2.1', 'telnet')
+
+
+def test_check_connection_reasons(limits, monkeypatch):
+    monkeypatch.setitem(HONEYPOT_CONFIG['security'], 'allowed_ips', ['192.0.2.1', '192.0.2.2', '203.0.113.9'])
+    monkeypatch.setitem(HONEYPOT_CONFIG['security']['rate_limit'], 'max_connections_per_ip', 2)
+    manager = SessionManager()
+    
+    assert manager.check_connection('198.51.100.1', 'ssh') == 'not_allowed'
+    manager.block_ip('203.0.113.9')
+    assert manager.check_connection('203.0.113.9', 'ssh') == 'blocked'
+    
+    assert manager.add_connection('192.0.2.1', 'telnet')
+    assert manager.check_connection('192.0.2.2', 'telnet') == 'capacity'
+    assert manager.add_connection('192.0.2.1', 'ssh')
+    assert manager.check_connection('192.0.2.1', 'ssh') == 'per_ip'
+    
+    manager.remove_connection('192.0.2.1', 'ssh')
+    manager.remove_connection('192.0.2.1', 'telnet')
+    assert manager.check_connection('192.0.2.1', 'ssh') is None
+    assert manager.check_connection('192.0.2.1', 'ssh') is None
+    assert manager.check_connection('192.0.2.1', 'ssh') == 'rate_limit'
+    assert manager.check_connection('192.0.2.2', 'ssh') is None
+
+
+@pytest.fixture
+def auto_ban(monkeypatch):
+    config = HONEYPOT_CONFIG['security']['auto_ban']
+    monkeypatch.setitem(config, 'enabled', True)
+    monkeypatch.setitem(config, 'ban_duration', 60)
+    monkeypatch.setitem(HONEYPOT_CONFIG['security'], 'max_login_attempts', 3)
+    return config
+
+
+def test_failed_logins_ban_ip_for_ban_duration(auto_ban):
+    manager = SessionManager()
+    assert not manager.record_auth_failure('203.0.113.5')
+    assert not manager.record_auth_failure('203.0.113.5')
+    assert not manager.record_auth_failure('203.0.113.6')
+    assert manager.record_auth_failure('203.0.113.5')
+    
+    assert manager.check_connection('203.0.113.5') == 'blocked'
+    assert manager.check_connection('203.0.113.6') is None
+    assert manager.blocked_ips['203.0.113.5'] == pytest.approx(time.time() + 60, abs=5)
+    # sayaç yasakla sıfırlanır
+    assert '203.0.113.5' not in manager.failures
+
+
+def test_failures_outside_window_start_over(auto_ban, monkeypatch):
+    monkeypatch.setitem(auto_ban, 'failure_window', 10)
+    manager = SessionManager()
+    manager.record_auth_failure('203.0.113.5')
+    manager.record_auth_failure('203.0.113.5')
+    manager.failures['203.0.113.5'][0] -= 11
+    assert not manager.record_auth_failure('203.0.113.5')
+    assert manager.failures['203.0.113.5'][1] == 1
+
+
+def test_timed_bans_expire_permanent_bans_stay(auto_ban):
+    manager = SessionManager()
+    manager.block_ip('203.0.113.5', duration=60)
+    manager.block_ip('203.0.113.6')
+    
+    manager.expire_bans(time.time() + 30)
+    assert set(manager.blocked_ips) == {'203.0.113.5', '203.0.113.6'}
+    manager.expire_bans(time.time() + 61)
+    assert manager.blocked_ips == {'203.0.113.6': math.inf}
+
+
+def test_max_bans_evicts_soonest_expiring(auto_ban, monkeypatch):
+    monkeypatch.setitem(auto_ban, 'max_bans', 2)
+    manager = SessionManager()
+    manager.block_ip('203.0.113.1')
+    manager.block_ip('203.0.113.2', duration=10)
+    manager.block_ip('203.0.113.3', duration=100)
+    assert set(manager.blocked_ips) == {'203.0.113.1', '203.0.113.3'}
+
+
+def test_bans_survive_restart_through_ban_store(auto_ban, tmp_path):
+    manager = SessionManager(ban_store=BanStore(tmp_path / 'bans.bin'))
+    manager.block_ip('203.0.113.5', duration=60)
+    manager.block_ip('203.0.113.6')
+    manager.unblock_ip('203.0.113.6')
+    manager.ban_store.close()
+    
+    restarted = SessionManager(ban_store=BanStore(tmp_path / 'bans.bin'))
+    assert restarted.check_connection('203.0.113.5') == 'blocked'
+    assert restarted.check_connection('203.0.113.6') is None
+    assert restarted.ban_heap[0] == (manager.blocked_ips['203.0.113.5'], '203.0.113.5')
+
+
+def test_config_prefixes_and_feed_files(monkeypatch, tmp_path):
+    feed = tmp_path / 'drop.txt'
+    feed.write_text("# feed\n198.51.100.0/24 ; SBL1\n2001:db8:bad::/48\n")
+    security = HONEYPOT_CONFIG['security']
+    monkeypatch.setitem(security, 'blocked_ips', ['203.0.113.0/25'])
+    monkeypatch.setitem(security, 'blocklist_files', [feed])
+    monkeypatch.setitem(security, 'allowed_ips', ['0.0.0.0/1', '192.0.2.0/24', '2001:db8::/32'])
+    monkeypatch.setitem(security, 'ip_list_cache_dir', tmp_path / 'cache')
+    manager = SessionManager()
+    
+    assert manager.check_connection('203.0.113.100') == 'blocked'
+    assert manager.check_connection('198.51.100.7') == 'blocked'
+    assert manager.check_connection('2001:db8:bad::1') == 'blocked'
+    assert manager.check_connection('203.0.113.200') == 'not_allowed'
+    assert manager.check_connection('192.0.2.1') is None
+    assert manager.check_connection('2001:db8::1') is None
+    assert manager.blocked_ips == {}
+    assert (tmp_path / 'cache' / 'blocklist.cache').exists()
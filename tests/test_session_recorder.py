@@ -0,0 +1,102 @@
+import json
+import queue
+
+from utils.session_recorder import (
+    INPUT, MAGIC, OUTPUT, SessionRecorder, SessionRecording, export_asciicast, read_recording
+)
+
+
+def make_recorder(tmp_path, queue_size: int = 100) -> SessionRecorder:
+    recorder = SessionRecorder()
+    recorder.directory = tmp_path / 'recordings'
+    recorder.chunk_size = 64
+    recorder.queue = queue.Queue(maxsize=queue_size)
+    return recorder
+
+
+def drain(recorder: SessionRecorder):
+    # kayıt thread'i yerine kuyruktaki parçalar sırayla yazılır
+    while not recorder.queue.empty():
+        recorder._write(*recorder.queue.get_nowait())
+
+
+def read_all(path):
+    with open(path, 'rb') as f:
+        meta, events = read_recording(f)
+        return meta, [(kind, data) for _, kind, data in events]
+
+
+def test_round_trip_across_several_chunks(tmp_path):
+    recorder = make_recorder(tmp_path)
+    recorder._running = True
+    recording = recorder.open('abc123', '192.0.2.1', 'SSH', 'root', 100, 30)
+    
+    expected = []
+    for i in range(20):
+        recording.input(f"echo {i}")
+        recording.output(f"\r\n{i}\r\nroot@server01:~$ ".encode())
+        expected += [(INPUT, f"echo {i}".encode()), (OUTPUT, f"\r\n{i}\r\nroot@server01:~$ ".encode())]
+    recording.close()
+    drain(recorder)
+    
+    meta, events = read_all(recording.path)
+    assert meta['session_id'] == 'abc123'
+    assert (meta['width'], meta['height']) == (100, 30)
+    assert events == expected
+    assert recorder.stats['chunks'] > 1
+
+
+def test_dropped_first_chunk_keeps_header(tmp_path):
+    recorder = make_recorder(tmp_path, queue_size=1)
+    path = tmp_path / 'recordings' / 'day' / 'dropped.bearrec'
+    recording = SessionRecording(recorder, path, {'session_id': 'dropped'})
+    
+    recorder.queue.put_nowait('filler')
+    recording.output(b'lost')
+    recording.flush()
+    assert recorder.stats['dropped'] == 1
+    
+    recorder.queue.get_nowait()
+    recording.output(b'kept')
+    recording.close()
+    drain(recorder)
+    
+    assert path.read_bytes().startswith(MAGIC)
+    meta, events = read_all(path)
+    assert meta['session_id'] == 'dropped'
+    assert events == [(OUTPUT, b'kept')]
+
+
+def test_truncated_trailing_chunk_is_ignored(tmp_path):
+    recorder = make_recorder(tmp_path)
+    path = tmp_path / 'recordings' / 'cut.bearrec'
+    recording = SessionRecording(recorder, path, {'session_id': 'cut'})
+    recording.output(b'first')
+    recording.flush()
+    recording.output(b'second')
+    recording.close()
+    drain(recorder)
+    
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    _, events = read_all(path)
+    assert events == [(OUTPUT, b'first')]
+
+
+def test_export_asciicast(tmp_path):
+    recorder = make_recorder(tmp_path)
+    path = tmp_path / 'recordings' / 'cast.bearrec'
+    meta = {'session_id': 'cast', 'client_ip': '192.0.2.1', 'protocol': 'Telnet',
+            'username': 'root', 'started_at': 1700000000.5, 'width': 80, 'height': 24}
+    recording = SessionRecording(recorder, path, meta)
+    recording.input('ls')
+    recording.output(b'\r\nfile\r\n')
+    recording.close()
+    drain(recorder)
+    
+    output = tmp_path / 'session.cast'
+    export_asciicast(path, output, input_events=True)
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert lines[0]['version'] == 2
+    assert lines[0]['timestamp'] == 1700000000
+    assert [line[1:] for line in lines[1:]] == [['i', 'ls'], ['o', '\r\nfile\r\n']]
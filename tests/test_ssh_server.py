@@ -0,0 +1,119 @@
+import pytest
+
+from core.ssh_server import SSHAdmissionProtocol, SSHHoneypot, SSHServer
+from utils.session_manager import ConnectionContext, SessionManager
+
+
+class FakeConnection:
+    
+    def __init__(self, client_ip: str, client_port: int):
+        self.peername = (client_ip, client_port)
+        self.closed = False
+        
+    def get_extra_info(self, name, default=None):
+        return self.peername if name == 'peername' else default
+        
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    
+    def __init__(self, client_ip: str, client_port: int = 40000):
+        self.peername = (client_ip, client_port)
+        self.protocol = None
+        self.aborted = False
+        
+    def get_extra_info(self, name, default=None):
+        return self.peername if name == 'peername' else default
+        
+    def set_protocol(self, protocol):
+        self.protocol = protocol
+        
+    def abort(self):
+        self.aborted = True
+
+
+class FakeSSHConnection:
+    
+    def __init__(self):
+        self.transport = None
+        
+    def connection_made(self, transport):
+        self.transport = transport
+
+
+@pytest.fixture
+def manager():
+    return SessionManager()
+
+
+def connect(manager: SessionManager, client_ip: str, client_port: int = 40000) -> SSHServer:
+    server = SSHServer(manager)
+    server.connection_made(FakeConnection(client_ip, client_port))
+    return server
+
+
+def test_connection_contexts_are_unique():
+    first = ConnectionContext('SSH', '192.0.2.1', 1)
+    second = ConnectionContext('SSH', '192.0.2.1', 1)
+    assert first.connection_id != second.connection_id
+    assert first.session_id != second.session_id
+    
+    first.mark_authenticated('root')
+    assert first.authenticated and first.username == 'root'
+    assert first.authenticated_at >= first.connected_at
+    assert not second.authenticated
+
+
+def test_interleaved_handshakes_keep_their_own_client(manager):
+    first = connect(manager, '192.0.2.1', 40001)
+    second = connect(manager, '198.51.100.2', 40002)
+    
+    first.begin_auth('root')
+    second.begin_auth('admin')
+    # ikinci istemci daha sonra bağlandı; ilk istemcinin girişi yine kendi IP'sine yazılır
+    assert not first.validate_password('root', 'wrong')
+    assert second.validate_password('admin', 'admin')
+    assert first.validate_password('root', 'toor')
+    
+    assert (first.context.client_ip, first.context.username) == ('192.0.2.1', 'root')
+    assert (second.context.client_ip, second.context.username) == ('198.51.100.2', 'admin')
+    assert first.context.session_id != second.context.session_id
+    assert first.context.auth_started_at is not None
+
+
+def test_slot_is_released_only_for_admitted_connections(manager):
+    server = connect(manager, '192.0.2.1')
+    assert server.admitted
+    assert manager.total_connections == 1
+    
+    server.connection_lost(None)
+    server.connection_lost(None)
+    assert manager.total_connections == 0
+    assert manager.protocol_slots['ssh'].in_use == 0
+
+
+def test_rejected_socket_never_reaches_asyncssh(manager):
+    honeypot = SSHHoneypot(manager)
+    honeypot.create_connection = lambda: pytest.fail("SSH bağlantısı oluşturulmamalı")
+    manager.block_ip('203.0.113.5')
+    
+    transport = FakeTransport('203.0.113.5')
+    SSHAdmissionProtocol(honeypot).connection_made(transport)
+    assert transport.aborted
+    assert transport.protocol is None
+    assert honeypot.stats['handshakes_avoided'] == 1
+
+
+def test_admitted_socket_is_handed_to_the_ssh_connection(manager):
+    honeypot = SSHHoneypot(manager)
+    conn = FakeSSHConnection()
+    honeypot.create_connection = lambda: conn
+    
+    transport = FakeTransport('192.0.2.1')
+    SSHAdmissionProtocol(honeypot).connection_made(transport)
+    assert not transport.aborted
+    assert transport.protocol is conn
+    assert conn.transport is transport
+    assert honeypot.stats['handshakes_avoided'] == 0
@@ -0,0 +1,118 @@
+import math
+import multiprocessing
+import time
+
+import pytest
+
+from core.supervisor import WorkerSupervisor
+from utils.ban_store import BanStore
+from utils.session_manager import SessionManager
+
+
+class FakeConnection:
+    
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        
+    def send(self, event):
+        self.sent.append(event)
+        
+    def close(self):
+        self.closed = True
+
+
+class FakeProcess:
+    
+    def __init__(self, target, args, name):
+        self.args = args
+        self.name = name
+        self.pid = 4242
+        
+    def start(self):
+        pass
+
+
+class FakeContext:
+    # süreç başlatmadan supervisor'ın kanal trafiği incelenir
+    
+    def Pipe(self):
+        return FakeConnection(), FakeConnection()
+        
+    def Process(self, target, args, name):
+        return FakeProcess(target, args, name)
+
+
+def start(ban_store=None) -> WorkerSupervisor:
+    supervisor = WorkerSupervisor(3, worker_target=None, ban_store=ban_store)
+    supervisor.context = FakeContext()
+    for worker_id in range(3):
+        supervisor.start_worker(worker_id)
+    return supervisor
+
+
+@pytest.fixture
+def supervisor():
+    return start()
+
+
+def sent(supervisor: WorkerSupervisor, worker_id: int):
+    return supervisor.workers[worker_id][1].sent
+
+
+def test_block_is_forwarded_to_every_other_worker(supervisor):
+    block = ('block', '203.0.113.5', 'brute force', math.inf)
+    supervisor.broadcast(block, source_id=1)
+    assert sent(supervisor, 0) == [block]
+    assert sent(supervisor, 1) == []
+    assert sent(supervisor, 2) == [block]
+    
+    supervisor.broadcast(('unblock', '203.0.113.5', '', 0.0), source_id=2)
+    assert sent(supervisor, 0)[-1] == ('unblock', '203.0.113.5', '', 0.0)
+    assert supervisor.blocked_ips == {}
+
+
+def test_restarted_worker_receives_current_blocks(supervisor):
+    expires_at = time.time() + 3600
+    supervisor.broadcast(('block', '203.0.113.5', 'a', math.inf), source_id=0)
+    supervisor.broadcast(('block', '203.0.113.6', 'b', expires_at), source_id=0)
+    supervisor.broadcast(('block', '203.0.113.7', 'c', time.time() - 1), source_id=0)
+    supervisor.broadcast(('unblock', '203.0.113.5', '', 0.0), source_id=0)
+    
+    supervisor.start_worker(0)
+    # süresi dolan yasak yeniden gönderilmez ve listeden düşer
+    assert sent(supervisor, 0) == [('block', '203.0.113.6', 'b', expires_at)]
+    assert set(supervisor.blocked_ips) == {'203.0.113.6'}
+    process = supervisor.workers[0][0]
+    assert process.args[1] is supervisor.rate_limiter
+    assert process.name == 'bear-worker-0'
+
+
+def test_supervisor_persists_bans_for_workers(tmp_path):
+    expires_at = time.time() + 3600
+    supervisor = start(BanStore(tmp_path / 'bans.bin'))
+    supervisor.broadcast(('block', '203.0.113.5', 'a', expires_at), source_id=0)
+    supervisor.broadcast(('block', '203.0.113.6', 'b', math.inf), source_id=1)
+    supervisor.broadcast(('unblock', '203.0.113.6', '', 0.0), source_id=2)
+    supervisor.ban_store.close()
+    
+    restarted = start(BanStore(tmp_path / 'bans.bin'))
+    assert restarted.blocked_ips == {'203.0.113.5': ('persisted', expires_at)}
+    assert sent(restarted, 1) == [('block', '203.0.113.5', 'persisted', expires_at)]
+
+
+def test_worker_managers_exchange_blocks_over_the_pipe():
+    left, right = multiprocessing.Pipe()
+    source = SessionManager(sync_channel=left)
+    replica = SessionManager(sync_channel=right)
+    
+    source.block_ip('203.0.113.7', 'test', duration=60)
+    replica._receive_sync_events()
+    assert not replica.is_ip_allowed('203.0.113.7')
+    assert replica.blocked_ips['203.0.113.7'] == source.blocked_ips['203.0.113.7']
+    # alınan olay geri yayınlanmaz
+    assert not left.poll()
+    
+    source.unblock_ip('203.0.113.7')
+    replica._receive_sync_events()
+    assert replica.is_ip_allowed('203.0.113.7')
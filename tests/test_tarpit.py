@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+import pytest
+
+from config.settings import HONEYPOT_CONFIG
+from core.ssh_server import SSHAdmissionProtocol, SSHHoneypot
+from core.tarpit import TELNET_PAYLOAD, Tarpit, TarpitConnection
+from utils.session_manager import SessionManager
+
+
+class FakeTransport:
+    
+    def __init__(self, client_ip: str = '203.0.113.5'):
+        self.peername = (client_ip, 40000)
+        self.protocol = None
+        self.data = bytearray()
+        self.reading = True
+        self.aborted = False
+        self.buffered = 0
+        
+    def get_extra_info(self, name, default=None):
+        return self.peername if name == 'peername' else default
+        
+    def set_protocol(self, protocol):
+        self.protocol = protocol
+        
+    def pause_reading(self):
+        self.reading = False
+        
+    def write(self, data: bytes):
+        self.data += data
+        
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+        
+    def is_closing(self) -> bool:
+        return self.aborted
+        
+    def abort(self):
+        self.aborted = True
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = HONEYPOT_CONFIG['security']['tarpit']
+    monkeypatch.setitem(config, 'enabled', True)
+    monkeypatch.setitem(config, 'max_connections', 2)
+    monkeypatch.setitem(config, 'interval', 3600)
+    return config
+
+
+def in_loop(func):
+    async def run():
+        return func()
+    return asyncio.run(run())
+
+
+def test_should_hold_follows_config(config, monkeypatch):
+    tarpit = Tarpit()
+    assert tarpit.should_hold('blocked') and tarpit.should_hold('rate_limit')
+    assert not tarpit.should_hold('capacity')
+    assert not tarpit.should_hold(None)
+    
+    monkeypatch.setitem(config, 'enabled', False)
+    assert not tarpit.should_hold('blocked')
+
+
+def test_hold_takes_over_transport_until_full(config):
+    tarpit = Tarpit()
+    transports = [FakeTransport(f"203.0.113.{i}") for i in range(3)]
+    
+    def hold_all():
+        results = [tarpit.hold(transport, 'Telnet', transport.peername[0]) for transport in transports]
+        tarpit.task.cancel()
+        return results
+        
+    assert in_loop(hold_all) == [True, True, False]
+    assert isinstance(transports[0].protocol, TarpitConnection)
+    assert not transports[0].reading
+    assert transports[2].protocol is None
+    assert tarpit.get_stats()['held'] == 2
+    assert tarpit.stats['held_total'] == 2 and tarpit.stats['rejected_full'] == 1
+
+
+def test_drip_sends_payload_a_byte_at_a_time(config):
+    tarpit = Tarpit()
+    telnet, ssh = FakeTransport(), FakeTransport()
+    tarpit.held[telnet] = TarpitConnection(tarpit, telnet, 'Telnet', '203.0.113.5')
+    tarpit.held[ssh] = TarpitConnection(tarpit, ssh, 'SSH', '203.0.113.6')
+    
+    for _ in range(3):
+        tarpit.drip()
+    assert bytes(telnet.data) == TELNET_PAYLOAD[:3]
+    # SSH ön satırları "SSH-" ile başlamaz, istemci sürüm satırını beklemeye devam eder
+    lines = bytes(ssh.data).split(b'\r\n')
+    assert len(lines) == 4 and lines[-1] == b''
+    assert not any(line.startswith(b'SSH-') for line in lines)
+    
+    # okunmayan çıktı birikirse yazma atlanır
+    telnet.buffered = 1000
+    tarpit.drip()
+    assert len(telnet.data) == 3
+    assert tarpit.stats['bytes_sent'] == 3 + len(ssh.data)
+
+
+def test_max_hold_releases_connection(config):
+    tarpit = Tarpit()
+    transport = FakeTransport()
+    connection = TarpitConnection(tarpit, transport, 'Telnet', '203.0.113.5')
+    tarpit.held[transport] = connection
+    connection.held_at = time.monotonic() - config['max_hold'] - 1
+    
+    tarpit.drip()
+    assert transport.aborted
+    assert transport.data == b''
+    assert tarpit.held == {}
+    assert tarpit.stats['released'] == 1
+    assert tarpit.stats['attacker_seconds'] >= config['max_hold']
+    
+    # bağlantı kapanınca tekrar sayılmaz
+    connection.connection_lost(None)
+    assert tarpit.stats['released'] == 1
+
+
+def test_rejected_ssh_socket_is_held(config, monkeypatch):
+    tarpit = Tarpit()
+    monkeypatch.setattr('core.ssh_server.tarpit', tarpit)
+    manager = SessionManager()
+    manager.block_ip('203.0.113.5')
+    honeypot = SSHHoneypot(manager)
+    transport = FakeTransport()
+    
+    def admit():
+        SSHAdmissionProtocol(honeypot).connection_made(transport)
+        tarpit.task.cancel()
+        
+    in_loop(admit)
+    assert not transport.aborted
+    assert isinstance(transport.protocol, TarpitConnection)
+    assert honeypot.stats['handshakes_avoided'] == 1
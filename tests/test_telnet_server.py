@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from core.telnet_server import DO, DONT, IAC, SB, SE, WILL, WONT, TelnetHoneypot, TelnetSession
+from utils.session_manager import SessionManager
+
+
+ECHO = 1
+NAWS = 31
+
+
+class FakeTransport:
+    
+    def __init__(self, peername=('192.0.2.20', 40000)):
+        self.peername = peername
+        self.data = bytearray()
+        self.closed = False
+        
+    def get_extra_info(self, name):
+        return self.peername if name == 'peername' else None
+        
+    def write(self, data: bytes):
+        self.data += data
+        
+    def close(self):
+        self.closed = True
+        
+    def pause_reading(self):
+        pass
+        
+    def resume_reading(self):
+        pass
+
+
+@pytest.fixture
+def session():
+    honeypot = TelnetHoneypot(SessionManager())
+    session = TelnetSession(honeypot)
+    session.transport = FakeTransport()
+    return session
+
+
+def test_iac_split_across_chunks(session):
+    assert session.strip_iac(b'ab' + bytes([IAC])) == b'ab'
+    assert session.strip_iac(bytes([DO])) == b''
+    assert session.strip_iac(bytes([ECHO]) + b'cd') == b'cd'
+    assert bytes(session.transport.data) == bytes([IAC, WONT, ECHO])
+
+
+def test_escaped_iac_is_data(session):
+    assert session.strip_iac(b'a' + bytes([IAC, IAC]) + b'b') == b'a\xffb'
+    assert session.strip_iac(bytes([IAC])) == b''
+    assert session.strip_iac(bytes([IAC]) + b'c') == b'\xffc'
+
+
+def test_subnegotiation_is_swallowed(session):
+    data = b'x' + bytes([IAC, SB, NAWS, 0, 80, IAC, IAC, 0, 24, IAC, SE]) + b'y'
+    assert session.strip_iac(data) == b'xy'
+    
+    # SB gövdesi parçalar arasında bölünse de veri olarak sızmaz
+    assert session.strip_iac(bytes([IAC, SB, NAWS, 0])) == b''
+    assert session.strip_iac(bytes([80, IAC])) == b''
+    assert session.strip_iac(bytes([SE]) + b'z') == b'z'
+    assert session.transport.data == b''
+
+
+def test_each_option_is_refused_once(session):
+    session.strip_iac(bytes([IAC, DO, ECHO, IAC, WILL, NAWS, IAC, DO, ECHO, IAC, WILL, NAWS]))
+    assert bytes(session.transport.data) == bytes([IAC, WONT, ECHO, IAC, DONT, NAWS])
+    
+    # DONT/WONT yanıtsız kalır
+    session.strip_iac(bytes([IAC, DONT, 3, IAC, WONT, 3]))
+    assert bytes(session.transport.data) == bytes([IAC, WONT, ECHO, IAC, DONT, NAWS])
+
+
+def test_plain_data_is_returned_without_copy(session):
+    data = b'ls -la\r\n'
+    assert session.strip_iac(data) is data
+
+
+def test_login_flow_strips_negotiation():
+    async def run():
+        honeypot = TelnetHoneypot(SessionManager())
+        honeypot.loop = asyncio.get_running_loop()
+        session = TelnetSession(honeypot)
+        transport = FakeTransport()
+        session.connection_made(transport)
+        
+        session.data_received(bytes([IAC, DO, ECHO]) + b'root\r\n')
+        session.data_received(b'wrong\r\n')
+        return session, bytes(transport.data)
+        
+    session, output = asyncio.run(run())
+    assert output.endswith(b'login: ' + bytes([IAC, WONT, ECHO]) + b'Password: \r\nLogin incorrect\r\nlogin: ')
+    assert session.login_attempts == 1
+    assert not session.authenticated
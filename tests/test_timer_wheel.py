@@ -0,0 +1,135 @@
+import types
+
+import pytest
+
+from utils import timer_wheel
+from utils.timer_wheel import TimerWheel
+
+
+class Clock:
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+
+class ManualLoop:
+    # call_later yalnızca kaydedilir; tick'ler test içinden çağrılır
+    
+    def __init__(self):
+        self.delays = []
+    
+    def call_later(self, delay, callback):
+        self.delays.append(delay)
+        return types.SimpleNamespace(cancel=lambda: None)
+
+
+class Connection:
+    
+    def __init__(self, clock: Clock, timeout: float):
+        self.clock = clock
+        self.timeout = timeout
+        self.last_activity = clock.now
+        self.closed_at = None
+    
+    def timeout_deadline(self) -> float:
+        return self.last_activity + self.timeout
+    
+    def timeout_expired(self):
+        self.closed_at = self.clock.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(timer_wheel, 'time', clock)
+    return clock
+
+
+def make_wheel(slots: int = 8) -> TimerWheel:
+    wheel = TimerWheel(tick=1.0, slots=slots)
+    wheel.loop = ManualLoop()
+    return wheel
+
+
+def advance(wheel: TimerWheel, clock: Clock, seconds: int):
+    for _ in range(seconds):
+        clock.now += 1
+        wheel._tick()
+
+
+def test_idle_connection_expires_at_deadline(clock):
+    wheel = make_wheel()
+    connection = Connection(clock, timeout=3)
+    wheel.add(connection)
+    
+    advance(wheel, clock, 2)
+    assert connection.closed_at is None
+    advance(wheel, clock, 1)
+    assert connection.closed_at == 1003
+    assert wheel.get_stats() == {'expired': 1, 'rescheduled': 0, 'tracked': 0}
+
+
+def test_activity_reschedules_instead_of_expiring(clock):
+    wheel = make_wheel()
+    connection = Connection(clock, timeout=3)
+    wheel.add(connection)
+    
+    advance(wheel, clock, 2)
+    connection.last_activity = clock.now
+    advance(wheel, clock, 2)
+    assert connection.closed_at is None
+    assert wheel.stats['rescheduled'] == 1
+    advance(wheel, clock, 1)
+    assert connection.closed_at == 1005
+
+
+def test_deadline_beyond_one_turn_is_parked(clock):
+    wheel = make_wheel(slots=8)
+    connection = Connection(clock, timeout=20)
+    wheel.add(connection)
+    
+    advance(wheel, clock, 19)
+    assert connection.closed_at is None
+    assert wheel.stats['rescheduled'] == 2
+    advance(wheel, clock, 1)
+    assert connection.closed_at == 1020
+
+
+def test_discard_prevents_expiry(clock):
+    wheel = make_wheel()
+    connection = Connection(clock, timeout=2)
+    wheel.add(connection)
+    wheel.discard(connection)
+    advance(wheel, clock, 5)
+    assert connection.closed_at is None
+    assert wheel.entries == {}
+
+
+def test_missed_ticks_are_caught_up(clock):
+    wheel = make_wheel()
+    connections = [Connection(clock, timeout=t) for t in (2, 4, 30)]
+    for connection in connections:
+        wheel.add(connection)
+    
+    # event loop 5 saniye gecikti
+    clock.now += 5
+    wheel._tick()
+    assert [c.closed_at for c in connections] == [1005, 1005, None]
+    assert wheel.current_time == clock.now
+    assert wheel.loop.delays[-1] == 1.0
+
+
+def test_failing_close_does_not_stop_other_entries(clock):
+    wheel = make_wheel()
+    broken = Connection(clock, timeout=1)
+    broken.timeout_expired = lambda: 1 / 0
+    healthy = Connection(clock, timeout=1)
+    wheel.add(broken)
+    wheel.add(healthy)
+    
+    advance(wheel, clock, 1)
+    assert healthy.closed_at == 1001
+    assert wheel.stats['expired'] == 2
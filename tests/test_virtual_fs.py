@@ -0,0 +1,89 @@
+import pytest
+
+from core.virtual_fs import SessionFilesystem, VirtualFilesystem
+
+
+@pytest.fixture
+def base():
+    filesystem = VirtualFilesystem()
+    filesystem.load({'/': ['etc/', 'home/', 'tmp/'], '/home': ['user/']},
+                    {'/etc/passwd': "root:x:0:0:root:/root:/bin/bash\n", '/etc/hostname': "server01\n"})
+    return filesystem
+
+
+def test_writes_stay_in_the_session_overlay(base):
+    first = SessionFilesystem(base, 'root')
+    second = SessionFilesystem(base, 'root')
+    
+    assert first.write_file('/etc/passwd', "hacked\n") is None
+    assert first.lookup('/etc/passwd').content == "hacked\n"
+    assert second.lookup('/etc/passwd').content.startswith('root:')
+    assert base.root.children['etc'].children['passwd'].content.startswith('root:')
+
+
+def test_append_and_listdir(base):
+    fs = SessionFilesystem(base, 'root')
+    fs.write_file('/tmp/a.sh', "echo 1\n")
+    fs.write_file('/tmp/a.sh', "echo 2\n", append=True)
+    assert fs.lookup('/tmp/a.sh').content == "echo 1\necho 2\n"
+    assert [node.name for node in fs.listdir('/tmp')] == ['a.sh']
+    assert fs.write_file('/missing/a', 'x') == 'No such file or directory'
+    assert fs.write_file('/tmp', 'x') == 'Is a directory'
+
+
+def test_remove_hides_base_entry_until_recreated(base):
+    fs = SessionFilesystem(base, 'root')
+    assert fs.remove('/etc/hostname') is None
+    assert not fs.exists('/etc/hostname')
+    assert sorted(node.name for node in fs.listdir('/etc')) == ['passwd']
+    
+    fs.write_file('/etc/hostname', "new\n")
+    assert fs.lookup('/etc/hostname').content == "new\n"
+    assert fs.removed == {}
+
+
+def test_recursive_remove_drops_nested_overlay(base):
+    fs = SessionFilesystem(base, 'root')
+    fs.mkdir('/tmp/x')
+    fs.mkdir('/tmp/x/y')
+    fs.write_file('/tmp/x/y/z', 'data')
+    
+    assert fs.remove('/tmp/x') == 'Is a directory'
+    assert fs.remove('/tmp/x', directory=True) == 'Directory not empty'
+    assert fs.remove('/tmp/x', recursive=True) is None
+    assert not fs.exists('/tmp/x/y/z')
+    assert fs.added == {}
+
+
+def test_mkdir_parents_creates_missing_and_skips_existing(base):
+    fs = SessionFilesystem(base, 'root')
+    assert fs.mkdir('/tmp/a/b/c') == 'No such file or directory'
+    assert fs.mkdir('/tmp/a/b/c', parents=True) is None
+    assert fs.is_dir('/tmp/a') and fs.is_dir('/tmp/a/b/c')
+    assert fs.mkdir('/tmp/a/b', parents=True) is None
+    assert fs.mkdir('/etc', parents=True) is None
+    assert fs.mkdir('/etc/passwd', parents=True) == 'File exists'
+    assert fs.mkdir('/etc/passwd/x', parents=True) == 'Not a directory'
+    assert not SessionFilesystem(base, 'root').exists('/tmp/a')
+
+
+def test_permission_errors_for_non_root(base):
+    fs = SessionFilesystem(base, 'user')
+    assert fs.write_file('/etc/passwd', 'x') == 'Permission denied'
+    assert fs.mkdir('/etc/cron.d') == 'Permission denied'
+    assert fs.mkdir('/etc/cron.d/x', parents=True) == 'Permission denied'
+    assert fs.remove('/etc/passwd') == 'Permission denied'
+    assert fs.remove('/') == 'Operation not permitted'
+    assert fs.write_file('/home/user/notes', 'x') is None
+    assert fs.lookup('/home/user/notes').owner == 'user'
+
+
+def test_remove_root_is_not_permitted_even_for_root(base):
+    fs = SessionFilesystem(base, 'root')
+    assert fs.remove('/', recursive=True) == 'Operation not permitted'
+    assert fs.mkdir('/etc') == 'File exists'
+
+
+def test_inode_response_uses_crlf(base):
+    response = base.root.children['etc'].children['passwd'].response
+    assert response == b"\r\nroot:x:0:0:root:/root:/bin/bash\r\n"
@@ -0,0 +1,307 @@
+import asyncio
+import base64
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+SNAPSHOT_VERSION = 1
+MASK32 = 0xFFFFFFFF
+
+
+def hash_key(key: str) -> int:
+    # süreçler arası sabit 64 bit özet; Count-Min satırları ve HyperLogLog aynı değeri kullanır
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8', errors='replace'), digest_size=8).digest(), 'little')
+
+
+class SpaceSaving:
+    # en fazla capacity anahtar izlenir; dolduğunda en küçük sayaç yeni anahtara devredilir.
+    # sayaç gerçek değeri en fazla error kadar aşar. En küçük sayaç tembel bir heap'ten bulunur:
+    # artışlarda heap güncellenmez, eski girdiler çıkarılırken düzeltilir
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = {}
+        self.heap: List[Tuple[int, str]] = []
+    
+    def add(self, key: str, count: int = 1):
+        entry = self.counters.get(key)
+        if entry is not None:
+            entry[0] += count
+            return
+        
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [count, 0]
+            heapq.heappush(self.heap, (count, key))
+            return
+        
+        while True:
+            minimum, victim = heapq.heappop(self.heap)
+            current = self.counters[victim][0]
+            if current == minimum:
+                break
+            heapq.heappush(self.heap, (current, victim))
+        
+        del self.counters[victim]
+        self.counters[key] = [minimum + count, minimum]
+        heapq.heappush(self.heap, (minimum + count, key))
+    
+    def top(self, n: int) -> List[Tuple[str, int, int]]:
+        items = heapq.nlargest(n, self.counters.items(), key=lambda item: item[1][0])
+        return [(key, count, error) for key, (count, error) in items]
+    
+    def state(self) -> list:
+        return [[key, count, error] for key, (count, error) in self.counters.items()]
+    
+    def restore(self, state: list):
+        self.counters = {key: [count, error] for key, count, error in state[:self.capacity]}
+        self.heap = [(count, key) for key, (count, _) in self.counters.items()]
+        heapq.heapify(self.heap)
+
+
+class CountMinSketch:
+    # sabit boyutlu frekans tahmini; tahmin gerçek değerden küçük olmaz
+    
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+    
+    def _columns(self, digest: int):
+        # Kirsch-Mitzenmacher: iki 32 bitlik yarıdan depth adet sütun türetilir
+        low, high = digest & MASK32, digest >> 32
+        width = self.width
+        return [(low + i * high) % width for i in range(self.depth)]
+    
+    def add(self, digest: int, count: int = 1):
+        for row, column in zip(self.rows, self._columns(digest)):
+            value = row[column] + count
+            row[column] = value if value <= MASK32 else MASK32
+    
+    def estimate(self, digest: int) -> int:
+        return min(row[column] for row, column in zip(self.rows, self._columns(digest)))
+    
+    def state(self) -> List[str]:
+        return [base64.b64encode(row.tobytes()).decode('ascii') for row in self.rows]
+    
+    def restore(self, state: List[str]):
+        rows = []
+        for encoded in state:
+            row = array('I')
+            row.frombytes(base64.b64decode(encoded))
+            rows.append(row)
+        if len(rows) == self.depth and all(len(row) == self.width for row in rows):
+            self.rows = rows
+
+
+class HyperLogLog:
+    # 2^precision kayıtçı; precision=14 için 16 KB bellek ve ~%0.8 standart hata
+    
+    def __init__(self, precision: int):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self.alpha = 0.7213 / (1 + 1.079 / self.size)
+    
+    def add(self, digest: int):
+        index = digest & (self.size - 1)
+        rest = digest >> self.precision
+        bits = 64 - self.precision
+        rank = bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def count(self) -> int:
+        registers = self.registers
+        estimate = self.alpha * self.size * self.size / sum(2.0 ** -r for r in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # küçük kümelerde doğrusal sayım daha doğrudur
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+    
+    def state(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+    
+    def restore(self, state: str):
+        registers = base64.b64decode(state)
+        if len(registers) == self.size:
+            self.registers = bytearray(registers)
+
+
+class StreamCounter:
+    # bir alan için toplam, en sık değerler ve farklı değer sayısı
+    
+    def __init__(self, capacity: int, width: int, depth: int, precision: int):
+        self.total = 0
+        self.heavy = SpaceSaving(capacity)
+        self.sketch = CountMinSketch(width, depth)
+        self.distinct = HyperLogLog(precision)
+    
+    def add(self, key: str):
+        digest = hash_key(key)
+        self.total += 1
+        self.heavy.add(key)
+        self.sketch.add(digest)
+        self.distinct.add(digest)
+    
+    def estimate(self, key: str) -> int:
+        return self.sketch.estimate(hash_key(key))
+    
+    def top(self, n: int) -> List[Dict]:
+        # Space-Saving üst sınırı Count-Min tahminiyle daraltılır; ikisi de gerçek değerden küçük olmaz
+        result = []
+        for key, count, error in self.heavy.top(n):
+            estimate = min(count, self.sketch.estimate(hash_key(key)))
+            result.append({'value': key, 'count': estimate, 'error': min(error, estimate)})
+        return result
+    
+    def state(self) -> dict:
+        return {
+            'total': self.total,
+            'heavy': self.heavy.state(),
+            'sketch': self.sketch.state(),
+            'distinct': self.distinct.state(),
+        }
+    
+    def restore(self, state: dict):
+        self.total = state['total']
+        self.heavy.restore(state['heavy'])
+        self.sketch.restore(state['sketch'])
+        self.distinct.restore(state['distinct'])
+
+
+class AttackStats:
+    # olaylar event loop'ta doğrudan işlenir; bellek izlenen değer sayısından bağımsız sabittir.
+    # anlık görüntü dosyası hem panolar için özet hem de yeniden başlatmada yüklenen durumu içerir
+    
+    FIELDS = ('ips', 'usernames', 'passwords', 'credentials', 'commands')
+    
+    def __init__(self):
+        config = HONEYPOT_CONFIG['stats']
+        
+        self.enabled = config['enabled']
+        self.path = Path(config['snapshot_path'])
+        self.snapshot_interval = config['snapshot_interval']
+        self.top_n = config['top_n']
+        self.counters = {
+            field: StreamCounter(config['capacity'], config['sketch_width'],
+                                 config['sketch_depth'], config['hll_precision'])
+            for field in self.FIELDS
+        }
+        self.logins = {'success': 0, 'failed': 0}
+        self.started_at = time.time()
+        
+        self.logger = setup_logger('attack_stats')
+        self._task: Optional[asyncio.Task] = None
+    
+    def set_instance(self, name: str):
+        # çok süreçli modda her worker kendi anlık görüntüsünü yazar
+        self.path = self.path.with_name(f"{self.path.stem}.{name}{self.path.suffix}")
+    
+    def record_auth(self, client_ip: str, username: str, password: str, success: bool):
+        if not self.enabled:
+            return
+        self.logins['success' if success else 'failed'] += 1
+        counters = self.counters
+        counters['ips'].add(client_ip)
+        counters['usernames'].add(username)
+        counters['passwords'].add(password)
+        counters['credentials'].add(f"{username}:{password}")
+    
+    def record_command(self, client_ip: str, command: str):
+        if not self.enabled:
+            return
+        self.counters['commands'].add(command)
+    
+    def summary(self, n: Optional[int] = None) -> dict:
+        n = n or self.top_n
+        return {
+            field: {
+                'total': counter.total,
+                'distinct': counter.distinct.count(),
+                'top': counter.top(n),
+            }
+            for field, counter in self.counters.items()
+        }
+    
+    def snapshot(self) -> dict:
+        return {
+            'version': SNAPSHOT_VERSION,
+            'timestamp': time.time(),
+            'started_at': self.started_at,
+            'logins': dict(self.logins),
+            'summary': self.summary(),
+            'state': {field: counter.state() for field, counter in self.counters.items()},
+        }
+    
+    def write_snapshot(self, snapshot: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(temp, self.path)
+    
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"İstatistik anlık görüntüsü okunamadı: {e}")
+            return
+        
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return
+        for field, state in snapshot.get('state', {}).items():
+            if field in self.counters:
+                self.counters[field].restore(state)
+        self.logins.update(snapshot.get('logins', {}))
+        self.started_at = snapshot.get('started_at', self.started_at)
+        self.logger.info(f"İstatistikler yüklendi - Giriş denemesi: {self.counters['credentials'].total}, "
+                         f"Komut: {self.counters['commands'].total}")
+    
+    def start(self):
+        if not self.enabled or self._task:
+            return
+        self.load()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.write_snapshot(self.snapshot())
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                # durum event loop'ta kopyalanır, JSON yazımı thread'de yapılır
+                await asyncio.to_thread(self.write_snapshot, self.snapshot())
+            except Exception as e:
+                self.logger.error(f"İstatistik anlık görüntüsü yazılamadı: {e}")
+    
+    def get_stats(self) -> dict:
+        return {
+            'logins': dict(self.logins),
+            **{f"{field}_distinct": counter.distinct.count() for field, counter in self.counters.items()},
+        }
+
+
+attack_stats = AttackStats()
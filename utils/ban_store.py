@@ -0,0 +1,107 @@
+import ipaddress
+import math
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+# kayıt başına 25 bayt: işlem, IPv6 biçiminde adres (IPv4 eşlenmiş), bitiş zamanı (inf = kalıcı)
+RECORD = struct.Struct('<B16sd')
+OP_UNBAN = 0
+OP_BAN = 1
+
+
+def pack_ip(ip: str) -> bytes:
+    address = ipaddress.ip_address(ip)
+    if address.version == 4:
+        address = ipaddress.IPv6Address(f"::ffff:{address}")
+    return address.packed
+
+
+def unpack_ip(packed: bytes) -> str:
+    address = ipaddress.IPv6Address(packed)
+    return str(address.ipv4_mapped or address)
+
+
+class BanStore:
+    # yasaklar yalnızca sona eklenen sabit boyutlu kayıtlarla yazılır; açılışta dosya
+    # yeniden oynatılır, süresi dolanlar atılır ve dosya sıkıştırılarak yeniden yazılır
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.logger = setup_logger('ban_store')
+        self.handle = None
+        
+    def load(self) -> Dict[str, float]:
+        bans: Dict[str, float] = {}
+        now = time.time()
+        
+        try:
+            data = self.path.read_bytes() if self.path.exists() else b''
+        except OSError as e:
+            # okunamayan dosya sıkıştırılıp üzerine yazılmaz; yasaklar bu oturumda yalnızca bellekte tutulur
+            self.logger.error(f"Kalıcı yasaklar okunamadı - Dosya: {self.path}, Hata: {e}")
+            return bans
+            
+        if data:
+            usable = len(data) - len(data) % RECORD.size
+            for op, packed, expires_at in RECORD.iter_unpack(data[:usable]):
+                ip = unpack_ip(packed)
+                if op == OP_BAN:
+                    bans[ip] = expires_at
+                else:
+                    bans.pop(ip, None)
+                    
+        bans = {ip: expires_at for ip, expires_at in bans.items() if expires_at > now}
+        self.compact(bans)
+        self.logger.info(f"Kalıcı yasaklar yüklendi - Aktif: {len(bans)}")
+        return bans
+        
+    def compact(self, bans: Dict[str, float]):
+        self.close()
+        temp_path = self.path.with_suffix('.tmp')
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(b''.join(RECORD.pack(OP_BAN, pack_ip(ip), expires_at)
+                                 for ip, expires_at in bans.items()))
+            temp_path.replace(self.path)
+        except OSError as e:
+            # eski dosya yerinde kalır; yeni kayıtlar yine sona eklenmeye çalışılır
+            self.logger.error(f"Yasak dosyası sıkıştırılamadı - Dosya: {self.path}, Hata: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+        
+    def _write(self, op: int, ip: str, expires_at: float):
+        try:
+            if self.handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.handle = open(self.path, 'ab', buffering=0)
+            self.handle.write(RECORD.pack(op, pack_ip(ip), expires_at))
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Yasak kaydı yazılamadı - IP: {ip}, Hata: {e}")
+            
+    def add(self, ip: str, expires_at: float = math.inf):
+        self._write(OP_BAN, ip, expires_at)
+        
+    def remove(self, ip: str):
+        self._write(OP_UNBAN, ip, 0.0)
+        
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+def open_ban_store() -> Optional[BanStore]:
+    config = HONEYPOT_CONFIG['security']['auto_ban']
+    if not config['persist_path']:
+        return None
+    return BanStore(config['persist_path'])
@@ -0,0 +1,195 @@
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS connections (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    client_ip TEXT NOT NULL,
+    client_port INTEGER,
+    protocol TEXT NOT NULL,
+    accepted INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS auth_attempts (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    client_ip TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    username TEXT,
+    password TEXT,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    client_ip TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    username TEXT,
+    session_id TEXT,
+    command TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    client_ip TEXT NOT NULL,
+    protocol TEXT NOT NULL,
+    username TEXT,
+    session_id TEXT,
+    duration REAL,
+    command_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_connections_ip ON connections (client_ip);
+CREATE INDEX IF NOT EXISTS idx_connections_ts ON connections (timestamp);
+CREATE INDEX IF NOT EXISTS idx_auth_ip ON auth_attempts (client_ip);
+CREATE INDEX IF NOT EXISTS idx_auth_username ON auth_attempts (username);
+CREATE INDEX IF NOT EXISTS idx_auth_ts ON auth_attempts (timestamp);
+CREATE INDEX IF NOT EXISTS idx_commands_ip ON commands (client_ip);
+CREATE INDEX IF NOT EXISTS idx_commands_username ON commands (username);
+CREATE INDEX IF NOT EXISTS idx_commands_ts ON commands (timestamp);
+CREATE INDEX IF NOT EXISTS idx_sessions_ip ON sessions (client_ip);
+CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions (username);
+CREATE INDEX IF NOT EXISTS idx_sessions_ts ON sessions (timestamp);
+"""
+
+INSERT_STATEMENTS = {
+    'connections': "INSERT INTO connections (timestamp, client_ip, client_port, protocol, accepted, reason) "
+                   "VALUES (?, ?, ?, ?, ?, ?)",
+    'auth_attempts': "INSERT INTO auth_attempts (timestamp, client_ip, protocol, username, password, success) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+    'commands': "INSERT INTO commands (timestamp, client_ip, protocol, username, session_id, command) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+    'sessions': "INSERT INTO sessions (timestamp, client_ip, protocol, username, session_id, duration, command_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+}
+
+
+class EventStore:
+    
+    _STOP = object()
+    
+    def __init__(self):
+        config = HONEYPOT_CONFIG['database']
+        
+        self.enabled = config['enabled'] and config['type'] == 'sqlite'
+        self.path = Path(config['path'])
+        self.batch_size = config['batch_size']
+        self.flush_interval = config['flush_interval']
+        
+        self.queue: queue.Queue = queue.Queue(maxsize=config['queue_size'])
+        self.stats = {'written': 0, 'dropped': 0, 'batches': 0}
+        
+        self.logger = setup_logger('event_store')
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        
+    def start(self):
+        if not self.enabled or self._running:
+            return
+            
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='event-store', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Olay veritabanı başlatıldı: {self.path}")
+        
+    def stop(self):
+        if not self._running:
+            return
+            
+        self._running = False
+        self.queue.put(self._STOP)
+        self._thread.join(timeout=10)
+        self.logger.info(f"Olay veritabanı durduruldu - Yazılan: {self.stats['written']}, "
+                         f"Düşürülen: {self.stats['dropped']}")
+        
+    def _put(self, table: str, row: tuple):
+        if not self._running:
+            return
+            
+        try:
+            self.queue.put_nowait((table, row))
+        except queue.Full:
+            self.stats['dropped'] += 1
+            
+    def record_connection(self, client_ip: str, client_port: Optional[int], protocol: str,
+                          accepted: bool, reason: str = ""):
+        self._put('connections', (time.time(), client_ip, client_port, protocol, int(accepted), reason))
+        
+    def record_auth(self, client_ip: str, protocol: str, username: str, password: str, success: bool):
+        self._put('auth_attempts', (time.time(), client_ip, protocol, username, password, int(success)))
+        
+    def record_command(self, client_ip: str, protocol: str, username: str, session_id: str, command: str):
+        self._put('commands', (time.time(), client_ip, protocol, username, session_id, command))
+        
+    def record_session(self, client_ip: str, protocol: str, username: str, session_id: str,
+                       duration: float, command_count: int):
+        self._put('sessions', (time.time(), client_ip, protocol, username, session_id, duration, command_count))
+        
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(str(self.path), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+        
+    def _write_batch(self, db: sqlite3.Connection, batch: List[tuple]):
+        rows: Dict[str, List[tuple]] = defaultdict(list)
+        for table, row in batch:
+            rows[table].append(row)
+            
+        with db:
+            for table, table_rows in rows.items():
+                db.executemany(INSERT_STATEMENTS[table], table_rows)
+                
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+        
+    def _run(self):
+        try:
+            db = self._connect()
+        except sqlite3.Error as e:
+            self.logger.error(f"Veritabanı açma hatası: {e}")
+            self._running = False
+            return
+            
+        stopping = False
+        while not (stopping and self.queue.empty()):
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+                
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            if self._STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not self._STOP]
+                
+            if not batch:
+                continue
+                
+            try:
+                self._write_batch(db, batch)
+            except sqlite3.Error as e:
+                self.stats['dropped'] += len(batch)
+                self.logger.error(f"Veritabanı yazma hatası: {e}")
+                
+        db.close()
+
+
+event_store = EventStore()
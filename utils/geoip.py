@@ -0,0 +1,209 @@
+import argparse
+import csv
+import ipaddress
+import mmap
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import HONEYPOT_CONFIG
+from utils.ip_ranges import parse_address
+
+
+# derlenmiş aralık dosyası: başlık, sıralı IPv4 kayıtları, sıralı IPv6 kayıtları, AS adı tablosu.
+# Kayıtlar sabit boyutlu olduğu için dosya mmap ile açılıp doğrudan ikili arama yapılır.
+HEADER = struct.Struct('<8sII')
+MAGIC = b'BEARASN1'
+# başlangıç, bitiş, ASN, AS adı ofseti, ülke kodu
+RECORD_V4 = struct.Struct('>IIII2s2x')
+RECORD_V6 = struct.Struct('>16s16sII2s2x')
+
+
+class RangeDatabase:
+    
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+        magic, self.count4, self.count6 = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError(f"Geçersiz aralık dosyası: {path}")
+        self.offset4 = HEADER.size
+        self.offset6 = self.offset4 + self.count4 * RECORD_V4.size
+        self.names_offset = self.offset6 + self.count6 * RECORD_V6.size
+        
+    def _search(self, key, record: struct.Struct, offset: int, count: int):
+        low, high = 0, count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            start, end, asn, name_offset, country = record.unpack_from(self.mm, offset + middle * record.size)
+            if key < start:
+                high = middle - 1
+            elif key > end:
+                low = middle + 1
+            else:
+                return asn, name_offset, country
+        return None
+        
+    def lookup(self, ip: str) -> Optional[Dict]:
+        parsed = parse_address(ip)
+        if parsed is None:
+            return None
+        family, value = parsed
+            
+        if family == 4:
+            found = self._search(value, RECORD_V4, self.offset4, self.count4)
+        else:
+            found = self._search(value.to_bytes(16, 'big'), RECORD_V6, self.offset6, self.count6)
+        if found is None:
+            return None
+            
+        asn, name_offset, country = found
+        name_start = self.names_offset + name_offset
+        name = self.mm[name_start:self.mm.find(b'\0', name_start)].decode('utf-8', errors='replace')
+        return {'asn': asn, 'as_org': name, 'country': country.decode('ascii').strip('\0')}
+
+
+class MMDBDatabase:
+    # isteğe bağlı: maxminddb paketi kuruluysa GeoLite2/ipinfo MMDB dosyaları mmap modunda okunur
+    
+    def __init__(self, path: Path):
+        import maxminddb
+        self.reader = maxminddb.open_database(str(path), maxminddb.MODE_MMAP)
+        
+    def lookup(self, ip: str) -> Optional[Dict]:
+        try:
+            data = self.reader.get(ip)
+        except ValueError:
+            return None
+        if not data:
+            return None
+            
+        country = data.get('country', {})
+        return {
+            'asn': data.get('autonomous_system_number') or data.get('asn'),
+            'as_org': data.get('autonomous_system_organization') or data.get('as_name') or '',
+            'country': (country.get('iso_code') if isinstance(country, dict) else country)
+                       or data.get('country_code') or '',
+        }
+
+
+class IPEnricher:
+    # sık görülen IP'ler sınırlı LRU önbellekten döner; lru_cache C tarafında kilitli olduğu için
+    # log yazıcı thread'i ve event loop aynı örneği güvenle paylaşır
+    
+    def __init__(self, database, cache_size: int):
+        self.database = database
+        self.lookup = lru_cache(maxsize=cache_size)(database.lookup)
+        
+    def cache_info(self):
+        return self.lookup.cache_info()
+
+
+_enricher: Optional[IPEnricher] = None
+_enricher_loaded = False
+
+
+def open_database(path: Path):
+    if path.suffix == '.mmdb':
+        return MMDBDatabase(path)
+    return RangeDatabase(path)
+
+
+def get_enricher() -> Optional[IPEnricher]:
+    global _enricher, _enricher_loaded
+    
+    if not _enricher_loaded:
+        _enricher_loaded = True
+        config = HONEYPOT_CONFIG['logging']['enrichment']
+        path = Path(config['database']) if config['database'] else None
+        if config['enabled'] and path and path.exists():
+            try:
+                _enricher = IPEnricher(open_database(path), config['cache_size'])
+            except (ImportError, OSError, ValueError) as e:
+                # utils.logger bu modülü içe aktardığı için logger burada alınır
+                from utils.logger import setup_logger
+                setup_logger('geoip').error(f"IP zenginleştirme veritabanı açılamadı: {e}")
+    return _enricher
+
+
+def enrich_ip(ip: str) -> Optional[Dict]:
+    enricher = get_enricher()
+    if enricher is None or not ip:
+        return None
+    return enricher.lookup(ip)
+
+
+def read_source(path: Path) -> Iterator[Tuple[str, str, int, str, str]]:
+    # ip2asn TSV (başlangıç, bitiş, ASN, ülke, AS adı) veya aynı sütun sırasındaki CSV
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        sample = f.readline()
+        f.seek(0)
+        reader = csv.reader(f, delimiter='\t' if '\t' in sample else ',')
+        for row in reader:
+            if len(row) < 4 or row[0].startswith('#'):
+                continue
+            try:
+                asn = int(row[2].upper().replace('AS', '') or 0)
+            except ValueError:
+                continue
+            if asn == 0:
+                continue
+            yield row[0], row[1], asn, row[3], row[4] if len(row) > 4 else ''
+
+
+def compile_ranges(source: Path, output: Path) -> Tuple[int, int]:
+    v4: List[Tuple[int, int, int, str, str]] = []
+    v6: List[Tuple[bytes, bytes, int, str, str]] = []
+    
+    for start, end, asn, country, name in read_source(source):
+        try:
+            first, last = ipaddress.ip_address(start), ipaddress.ip_address(end)
+        except ValueError:
+            continue
+        if first.version == 4:
+            v4.append((int(first), int(last), asn, country, name))
+        else:
+            v6.append((first.packed, last.packed, asn, country, name))
+            
+    v4.sort()
+    v6.sort()
+    
+    names: Dict[str, int] = {}
+    name_table = bytearray()
+    
+    def name_offset(name: str) -> int:
+        if name not in names:
+            names[name] = len(name_table)
+            name_table.extend(name.encode('utf-8') + b'\0')
+        return names[name]
+        
+    def country_code(country: str) -> bytes:
+        return country.encode('ascii', errors='replace')[:2].ljust(2, b'\0')
+        
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(v4), len(v6)))
+        for start, end, asn, country, name in v4:
+            f.write(RECORD_V4.pack(start, end, asn, name_offset(name), country_code(country)))
+        for start, end, asn, country, name in v6:
+            f.write(RECORD_V6.pack(start, end, asn, name_offset(name), country_code(country)))
+        f.write(name_table)
+        
+    return len(v4), len(v6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASN/ülke aralık dosyasını mmap için derler")
+    parser.add_argument('source', type=Path, help="ip2asn TSV veya CSV dosyası")
+    parser.add_argument('output', type=Path, nargs='?',
+                        default=HONEYPOT_CONFIG['logging']['enrichment']['database'])
+    args = parser.parse_args()
+    
+    count4, count6 = compile_ranges(args.source, args.output)
+    print(f"{args.output} oluşturuldu - IPv4 aralık: {count4}, IPv6 aralık: {count6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import hashlib
+import re
+import socket
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+FAMILY_BITS = {4: 32, 6: 128}
+
+# besleme dosyalarında satır başındaki önek; "önek ; açıklama" ve "# yorum" satırları da desteklenir
+PREFIX_PATTERN = re.compile(r'^[ \t]*([0-9A-Fa-f:.]+(?:/\d{1,3})?)', re.MULTILINE)
+
+# derlenmiş önbellek başlığı: sihirli değer, kaynak imzası, IPv4 ve IPv6 aralık sayıları
+CACHE_HEADER = struct.Struct('<8s8sII')
+CACHE_MAGIC = b'BEARIPR1'
+
+
+def parse_address(ip: str) -> Optional[Tuple[int, int]]:
+    # (aile, tamsayı adres); IPv4 eşlenmiş IPv6 istemci adresleri IPv4 olarak ele alınır
+    try:
+        if ':' in ip:
+            if ip.startswith('::ffff:') and '.' in ip:
+                return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip[7:]), 'big')
+            return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, ip.split('%', 1)[0]), 'big')
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+    except (OSError, ValueError):
+        return None
+
+
+def parse_network(entry: str) -> Optional[Tuple[int, int, int]]:
+    # "10.0.0.0/8", "2001:db8::/32" veya tek adres -> (aile, başlangıç, bitiş)
+    address, _, prefix = entry.partition('/')
+    parsed = parse_address(address)
+    if parsed is None:
+        return None
+    family, value = parsed
+    bits = FAMILY_BITS[family]
+    
+    try:
+        prefix_length = int(prefix) if prefix else bits
+    except ValueError:
+        return None
+    if ':' in address and family == 4 and prefix:
+        prefix_length -= 96
+    if not 0 <= prefix_length <= bits:
+        return None
+        
+    host_bits = bits - prefix_length
+    start = value >> host_bits << host_bits
+    return family, start, start | ((1 << host_bits) - 1)
+
+
+class IPRangeSet:
+    # CIDR blokları aile başına sıralı ve birleştirilmiş [başlangıç, bitiş] aralıklarına çevrilir;
+    # arama tek bisect ile yapılır (yüz binlerce önek için ~20 karşılaştırma).
+    # IPv4 sınırları array('I') içinde aralık başına 8 bayt tutulur.
+    
+    def __init__(self):
+        self.starts: Dict[int, object] = {4: array('I'), 6: []}
+        self.ends: Dict[int, object] = {4: array('I'), 6: []}
+        # derlemeden önce aralıklar sıralanabilir tek tamsayı olarak tutulur: başlangıç << bits | bitiş
+        self.pending: Dict[int, List[int]] = {4: [], 6: []}
+        self.invalid = 0
+        
+    def add(self, entry: str) -> bool:
+        network = parse_network(entry.strip())
+        if network is None:
+            self.invalid += 1
+            return False
+        family, start, end = network
+        self.pending[family].append((start << FAMILY_BITS[family]) | end)
+        return True
+        
+    def load_file(self, path) -> int:
+        inet_pton = socket.inet_pton
+        from_bytes = int.from_bytes
+        pending4 = self.pending[4]
+        pending6 = self.pending[6]
+        added = 0
+        
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            prefixes = PREFIX_PATTERN.findall(f.read())
+            
+        # sıcak döngü: her satır için yalnızca C seviyesinde ayrıştırma çağrıları
+        for prefix in prefixes:
+            address, _, length = prefix.partition('/')
+            try:
+                if ':' in address:
+                    if '.' in address:
+                        self.add(prefix)
+                        continue
+                    host_bits = 128 - int(length) if length else 0
+                    value = from_bytes(inet_pton(socket.AF_INET6, address), 'big')
+                    target, bits = pending6, 128
+                else:
+                    host_bits = 32 - int(length) if length else 0
+                    value = from_bytes(inet_pton(socket.AF_INET, address), 'big')
+                    target, bits = pending4, 32
+            except OSError:
+                self.invalid += 1
+                continue
+            if not 0 <= host_bits <= bits:
+                self.invalid += 1
+                continue
+                
+            start = value >> host_bits << host_bits
+            target.append((start << bits) | start | ((1 << host_bits) - 1))
+            added += 1
+            
+        return added
+        
+    def build(self):
+        for family, keys in self.pending.items():
+            if not keys:
+                continue
+            bits = FAMILY_BITS[family]
+            mask = (1 << bits) - 1
+            keys.extend((start << bits) | end for start, end in zip(self.starts[family], self.ends[family]))
+            keys.sort()
+            
+            starts: List[int] = []
+            ends: List[int] = []
+            for key in keys:
+                start = key >> bits
+                end = key & mask
+                # çakışan veya bitişik aralıklar birleştirilir
+                if ends and start <= ends[-1] + 1:
+                    if end > ends[-1]:
+                        ends[-1] = end
+                else:
+                    starts.append(start)
+                    ends.append(end)
+                    
+            if family == 4:
+                self.starts[4] = array('I', starts)
+                self.ends[4] = array('I', ends)
+            else:
+                self.starts[6] = starts
+                self.ends[6] = ends
+            self.pending[family] = []
+            
+    def contains(self, ip: str) -> bool:
+        parsed = parse_address(ip)
+        if parsed is None:
+            return False
+        family, value = parsed
+        
+        index = bisect_right(self.starts[family], value) - 1
+        return index >= 0 and value <= self.ends[family][index]
+        
+    def __contains__(self, ip: str) -> bool:
+        return self.contains(ip)
+        
+    def __len__(self) -> int:
+        return len(self.starts[4]) + len(self.starts[6])
+        
+    def __bool__(self) -> bool:
+        return len(self) > 0
+        
+    def save(self, path, signature: bytes):
+        v4_starts = array('I', self.starts[4])
+        v4_ends = array('I', self.ends[4])
+        if sys.byteorder != 'little':
+            v4_starts.byteswap()
+            v4_ends.byteswap()
+            
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, signature, len(v4_starts), len(self.starts[6])))
+            f.write(v4_starts.tobytes())
+            f.write(v4_ends.tobytes())
+            f.write(b''.join(value.to_bytes(16, 'big') for value in self.starts[6]))
+            f.write(b''.join(value.to_bytes(16, 'big') for value in self.ends[6]))
+            
+    @classmethod
+    def load_cache(cls, path, signature: bytes) -> Optional['IPRangeSet']:
+        try:
+            data = Path(path).read_bytes()
+            magic, cached_signature, count4, count6 = CACHE_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != CACHE_MAGIC or cached_signature != signature:
+            return None
+        if len(data) != CACHE_HEADER.size + count4 * 8 + count6 * 32:
+            return None
+            
+        ranges = cls()
+        offset = CACHE_HEADER.size
+        for bounds in (ranges.starts[4], ranges.ends[4]):
+            bounds.frombytes(data[offset:offset + count4 * 4])
+            if sys.byteorder != 'little':
+                bounds.byteswap()
+            offset += count4 * 4
+        for bounds in (ranges.starts[6], ranges.ends[6]):
+            bounds.extend(int.from_bytes(data[index:index + 16], 'big')
+                          for index in range(offset, offset + count6 * 16, 16))
+            offset += count6 * 16
+        return ranges
+        
+    @classmethod
+    def from_sources(cls, entries: Iterable[str] = (), files: Iterable = (),
+                     cache_path=None) -> 'IPRangeSet':
+        # kaynak dosyalar değişmediyse ayrıştırma atlanır, derlenmiş aralıklar doğrudan okunur
+        entries = list(entries)
+        files = [Path(path) for path in files if Path(path).exists()]
+        
+        signature = hashlib.blake2b(digest_size=8)
+        signature.update('\n'.join(entries).encode('utf-8'))
+        for path in files:
+            stat = path.stat()
+            signature.update(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+        signature = signature.digest()
+        
+        if cache_path:
+            cached = cls.load_cache(cache_path, signature)
+            if cached is not None:
+                return cached
+                
+        ranges = cls()
+        for entry in entries:
+            ranges.add(entry)
+        for path in files:
+            ranges.load_file(path)
+        ranges.build()
+        
+        if cache_path and files:
+            try:
+                ranges.save(cache_path, signature)
+            except OSError:
+                pass
+        return ranges
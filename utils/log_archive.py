@@ -0,0 +1,364 @@
+import bisect
+import gzip
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import HONEYPOT_CONFIG
+
+
+# döndürülen parça: <log>[.<worker>].<YYYYmmddTHHMMSS-ffffff>.json[.gz|.zst]
+# sıkıştırılmış dosya, her biri yaklaşık block_size ham bayt içeren bağımsız gzip üyeleri /
+# zstd çerçevelerinden oluşur; standart araçlarla (zcat, zstdcat) tek parça gibi okunur.
+# yan dosya (<parça>.idx) blokların sıkıştırılmış/ham konumlarını, zaman aralığını ve
+# IP başına kayıt konumlarını tutar; aramalar dosyanın tamamını açmadan ilgili bloğa atlar
+SEGMENT_PATTERN = re.compile(r'^(?P<stem>[^.]+(?:\.[^.]+)?)\.(?P<stamp>\d{8}T\d{6}-\d{6})\.json(?P<codec>\.gz|\.zst)?$')
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+# HoneypotFormatter alanları sabit sırayla ve JSON kaçışlı yazar; mesaj içindeki tırnaklar
+# \" olarak kaçışlandığı için bu desenler mesaj metniyle eşleşmez
+TIMESTAMP_FIELD = re.compile(rb'"timestamp": (-?[0-9.]+(?:[eE][-+]?[0-9]+)?)')
+CLIENT_IP_FIELD = re.compile(rb'"client_ip": "([^"\\]*)"')
+
+
+class GzipCodec:
+    
+    name = 'gzip'
+    suffix = '.gz'
+    
+    def __init__(self, level: int = 6):
+        self.level = level
+    
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+    
+    def decompress(self, data: bytes) -> bytes:
+        # tek blok tek gzip üyesidir
+        return zlib.decompress(data, 31)
+    
+    def iter_lines(self, f) -> Iterator[bytes]:
+        yield from gzip.GzipFile(fileobj=f)
+
+
+class ZstdCodec:
+    # isteğe bağlı: zstandard paketi kuruluysa kullanılır
+    
+    name = 'zstd'
+    suffix = '.zst'
+    
+    def __init__(self, level: int = 6):
+        import zstandard
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+    
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+    
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+    
+    def iter_lines(self, f) -> Iterator[bytes]:
+        yield from io.BufferedReader(self.decompressor.stream_reader(f, read_across_frames=True))
+
+
+CODECS = {'gzip': GzipCodec, 'zstd': ZstdCodec}
+SUFFIX_CODECS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def get_codec(name: str, level: int = 6):
+    return CODECS[name](level)
+
+
+def segment_name(base_filename: str) -> Path:
+    # aynı mikro saniyede iki döndürme olsa bile ad çakışmaz
+    path = Path(base_filename)
+    now = time.time()
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now))
+    micros = int((now % 1) * 1_000_000)
+    while True:
+        candidate = path.with_name(f"{path.stem}.{stamp}-{micros:06d}{path.suffix}")
+        if not candidate.exists():
+            return candidate
+        micros = (micros + 1) % 1_000_000
+
+
+def build_archive(source: Path, codec, block_size: int) -> Tuple[bytes, dict]:
+    # ham parça satır sınırlarında bloklara bölünür; her blok ayrı sıkıştırılır
+    data = source.read_bytes()
+    chunks: List[bytes] = []
+    blocks: List[List] = []
+    ips: Dict[str, List[int]] = {}
+    records = 0
+    start_ts = end_ts = None
+    first_offset = last_offset = None
+    compressed_offset = 0
+    
+    block_start = 0
+    length = len(data)
+    while block_start < length:
+        block_end = data.find(b'\n', min(block_start + block_size, length) - 1)
+        block_end = length if block_end < 0 else block_end + 1
+        block_first = block_last = None
+        block_ips = set()
+        
+        offset = block_start
+        while offset < block_end:
+            line_end = data.find(b'\n', offset, block_end)
+            line_end = block_end if line_end < 0 else line_end + 1
+            line = data[offset:line_end]
+            
+            match = TIMESTAMP_FIELD.search(line)
+            if match:
+                records += 1
+                ts = float(match.group(1))
+                block_first = ts if block_first is None else min(block_first, ts)
+                block_last = ts if block_last is None else max(block_last, ts)
+                if first_offset is None:
+                    first_offset = offset
+                last_offset = offset
+                
+                ip_match = CLIENT_IP_FIELD.search(line)
+                if ip_match:
+                    ip = ip_match.group(1).decode('ascii', errors='replace')
+                    # IP başına her bloktaki ilk kaydın ham konumu tutulur
+                    if ip not in block_ips:
+                        block_ips.add(ip)
+                        ips.setdefault(ip, []).append(offset)
+            offset = line_end
+        
+        compressed = codec.compress(data[block_start:block_end])
+        blocks.append([compressed_offset, block_start, block_first, block_last])
+        chunks.append(compressed)
+        compressed_offset += len(compressed)
+        
+        if block_first is not None:
+            start_ts = block_first if start_ts is None else min(start_ts, block_first)
+            end_ts = block_last if end_ts is None else max(end_ts, block_last)
+        block_start = block_end
+    
+    index = {
+        'version': INDEX_VERSION,
+        'segment': source.name,
+        'codec': codec.name,
+        'records': records,
+        'raw_size': length,
+        'compressed_size': compressed_offset,
+        'start_ts': start_ts,
+        'end_ts': end_ts,
+        'min_offset': first_offset,
+        'max_offset': last_offset,
+        'blocks': blocks,
+        'ips': ips,
+    }
+    return b''.join(chunks), index
+
+
+def index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + INDEX_SUFFIX)
+
+
+def load_index(segment: Path) -> Optional[dict]:
+    try:
+        with open(index_path(segment), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+
+def read_block(f, index: dict, block_no: int, codec) -> bytes:
+    blocks = index['blocks']
+    start = blocks[block_no][0]
+    end = blocks[block_no + 1][0] if block_no + 1 < len(blocks) else index['compressed_size']
+    f.seek(start)
+    return codec.decompress(f.read(end - start))
+
+
+def read_records(segment: Path, index: Optional[dict] = None, client_ip: Optional[str] = None,
+                 since: Optional[float] = None, until: Optional[float] = None) -> Iterator[bytes]:
+    # dizin varsa yalnızca zaman aralığına ve IP'ye uyan bloklar açılır;
+    # IP filtresi aday satırları daraltır, kesin eşleşmeyi çağıran yapar
+    segment = Path(segment)
+    codec_name = SUFFIX_CODECS.get(segment.suffix)
+    if codec_name is None:
+        with open(segment, 'rb') as f:
+            yield from f
+        return
+    
+    codec = get_codec(codec_name)
+    if index is None:
+        index = load_index(segment)
+    if index is None:
+        with open(segment, 'rb') as f:
+            yield from codec.iter_lines(f)
+        return
+    
+    blocks = index['blocks']
+    raw_starts = [block[1] for block in blocks]
+    if client_ip is not None:
+        offsets = index['ips'].get(client_ip, [])
+        wanted = [(bisect.bisect_right(raw_starts, offset) - 1, offset) for offset in offsets]
+    else:
+        wanted = [(block_no, block[1]) for block_no, block in enumerate(blocks)]
+    
+    with open(segment, 'rb') as f:
+        for block_no, offset in wanted:
+            _, raw_start, first_ts, last_ts = blocks[block_no]
+            if first_ts is None:
+                continue
+            if (since is not None and last_ts < since) or (until is not None and first_ts > until):
+                continue
+            data = read_block(f, index, block_no, codec)
+            yield from data[offset - raw_start:].splitlines(keepends=True)
+
+
+class LogArchiver:
+    
+    _STOP = object()
+    
+    def __init__(self):
+        config = HONEYPOT_CONFIG['logging']['archive']
+        
+        self.enabled = config['enabled']
+        self.codec_name = config['compression']
+        self.level = config['compression_level']
+        self.block_size = config['block_size']
+        self.retention_segments = config['retention_segments']
+        self.log_dir = Path(HONEYPOT_CONFIG['logging']['log_dir'])
+        # çok süreçli modda her worker yalnızca kendi dosyalarını kurtarır
+        self.suffix = ''
+        
+        self.queue: queue.Queue = queue.Queue(maxsize=config['queue_size'])
+        self.stats = {'archived': 0, 'deferred': 0, 'failed': 0, 'removed': 0,
+                      'raw_bytes': 0, 'compressed_bytes': 0}
+        
+        self.codec = None
+        self.logger = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if not self.enabled or self._running:
+            return
+        
+        # utils.logger bu modülü içe aktarır; döngüyü önlemek için burada alınır
+        from utils.logger import setup_logger
+        self.logger = setup_logger('log_archive')
+        
+        try:
+            self.codec = get_codec(self.codec_name, self.level)
+        except ImportError:
+            self.logger.warning(f"{self.codec_name} desteği kurulu değil, gzip kullanılıyor")
+            self.codec = get_codec('gzip', self.level)
+        
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='log-archiver', daemon=True)
+        self._thread.start()
+        
+        # önceki çalıştırmada sıkıştırılamadan kalan parçalar yeniden kuyruğa alınır
+        for segment in self.pending_segments():
+            self.submit(segment)
+        self.logger.info(f"Log arşivleyici başlatıldı - Sıkıştırma: {self.codec.name}, "
+                         f"Saklanan parça: {self.retention_segments}")
+    
+    def stop(self):
+        if not self._running:
+            return
+        
+        self._running = False
+        self.queue.put(self._STOP)
+        self._thread.join(timeout=60)
+        self.logger.info(f"Log arşivleyici durduruldu - Arşivlenen: {self.stats['archived']}, "
+                         f"Ham: {self.stats['raw_bytes']}, Sıkıştırılmış: {self.stats['compressed_bytes']}")
+    
+    def owns(self, stem: str) -> bool:
+        return stem.partition('.')[2] == self.suffix.lstrip('.')
+    
+    def pending_segments(self) -> List[Path]:
+        if not self.log_dir.exists():
+            return []
+        segments = []
+        for path in self.log_dir.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match and not match.group('codec') and self.owns(match.group('stem')):
+                segments.append(path)
+        return sorted(segments)
+    
+    def submit(self, segment: Path):
+        # döndürme log yazıcı thread'inde olur; sıkıştırma onu bekletmez.
+        # arşivleyici çalışmıyorsa parça ham kalır ve sonraki başlatmada işlenir
+        if not self._running:
+            self.stats['deferred'] += 1
+            return
+        
+        try:
+            self.queue.put_nowait(Path(segment))
+        except queue.Full:
+            self.stats['deferred'] += 1
+    
+    def archive(self, segment: Path):
+        if not segment.exists():
+            return
+        
+        compressed, index = build_archive(segment, self.codec, self.block_size)
+        target = segment.with_name(segment.name + self.codec.suffix)
+        index['segment'] = target.name
+        
+        # dizin sıkıştırılmış dosyadan önce yazılır; yarıda kalan iş ham parçayı silmez
+        temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        temp_index = index_path(temp)
+        with open(temp_index, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        with open(temp, 'wb') as f:
+            f.write(compressed)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_index, index_path(target))
+        os.replace(temp, target)
+        segment.unlink()
+        
+        self.stats['archived'] += 1
+        self.stats['raw_bytes'] += index['raw_size']
+        self.stats['compressed_bytes'] += len(compressed)
+        self.enforce_retention(SEGMENT_PATTERN.match(target.name).group('stem'))
+    
+    def enforce_retention(self, stem: str):
+        archived = []
+        for path in self.log_dir.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match and match.group('codec') and match.group('stem') == stem:
+                archived.append((match.group('stamp'), path))
+        archived.sort()
+        
+        for _, path in archived[:max(0, len(archived) - self.retention_segments)]:
+            for stale in (path, index_path(path)):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+            self.stats['removed'] += 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'queue_size': self.queue.qsize()}
+    
+    def _run(self):
+        while True:
+            segment = self.queue.get()
+            if segment is self._STOP:
+                break
+            try:
+                self.archive(segment)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.logger.error(f"Log parçası arşivlenemedi: {segment} - {e}")
+
+
+log_archiver = LogArchiver()
@@ -0,0 +1,305 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import HONEYPOT_CONFIG
+from utils.log_archive import SEGMENT_PATTERN, SUFFIX_CODECS, load_index, read_records
+
+
+# HoneypotFormatter alanları doğrudan okunur; kullanıcı adı, parola ve komut giriş/komut
+# mesajlarının içinden çıkarılır
+MESSAGE_FIELDS = {
+    'username': re.compile(r'User: ([^,]*)'),
+    'password': re.compile(r'Pass: (.*)$'),
+    'command': re.compile(r'Cmd: (.*)$'),
+}
+RECORD_FIELDS = {
+    'ip': 'client_ip',
+    'username': 'username',
+    'command': 'command',
+    'protocol': 'protocol',
+    'session': 'session_id',
+    'logger': 'logger',
+    'level': 'level',
+    'asn': 'asn',
+    'as_org': 'as_org',
+    'country': 'country',
+}
+TOP_FIELDS = sorted(set(RECORD_FIELDS) | set(MESSAGE_FIELDS))
+TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)([smhd])$')
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_time(value: str) -> float:
+    # epoch, "2024-01-01 12:00" veya göreli süre ("30m", "2h", "7d" = şimdiden geriye)
+    match = RELATIVE_TIME.match(value)
+    if match:
+        return time.time() - float(match.group(1)) * UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in TIME_FORMATS:
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"geçersiz zaman: {value}")
+
+
+def json_needle(field: str, value: str) -> bytes:
+    return f'"{field}": {json.dumps(value, ensure_ascii=False)}'.encode('utf-8')
+
+
+def field_value(entry: dict, field: str) -> Optional[str]:
+    value = entry.get(RECORD_FIELDS.get(field, field))
+    if value is None and field in MESSAGE_FIELDS:
+        match = MESSAGE_FIELDS[field].search(entry.get('message', ''))
+        if match:
+            value = match.group(1)
+    return None if value is None else str(value)
+
+
+class LogQuery:
+    # işçi süreçlere pickle ile gönderilir; ham satır ön kontrolü JSON çözümlemeden önce
+    # eşleşemeyecek satırları eler
+    
+    def __init__(self, since: Optional[float] = None, until: Optional[float] = None,
+                 client_ip: Optional[str] = None, username: Optional[str] = None,
+                 protocol: Optional[str] = None, command: Optional[str] = None,
+                 top: Optional[List[str]] = None, per_hour: bool = False, limit: Optional[int] = None):
+        self.since = since
+        self.until = until
+        self.client_ip = client_ip
+        self.username = username
+        self.protocol = protocol.lower() if protocol else None
+        self.command = command
+        self.top = top or []
+        self.per_hour = per_hour
+        self.limit = limit
+        
+        # kayıtta bulunması zorunlu ham bayt parçaları
+        self.needles: List[bytes] = []
+        if client_ip:
+            self.needles.append(json_needle('client_ip', client_ip))
+        if username:
+            self.needles.append(json.dumps(username, ensure_ascii=False)[1:-1].encode('utf-8'))
+        if command:
+            self.needles.append(json.dumps(command, ensure_ascii=False)[1:-1].encode('utf-8'))
+    
+    @property
+    def aggregating(self) -> bool:
+        return bool(self.top or self.per_hour)
+    
+    def matches(self, entry: dict) -> bool:
+        timestamp = entry.get('timestamp', 0)
+        if self.since is not None and timestamp < self.since:
+            return False
+        if self.until is not None and timestamp > self.until:
+            return False
+        if self.client_ip and entry.get('client_ip') != self.client_ip:
+            return False
+        if self.protocol and (entry.get('protocol') or '').lower() != self.protocol:
+            return False
+        if self.username and field_value(entry, 'username') != self.username:
+            return False
+        if self.command:
+            command = field_value(entry, 'command')
+            if command is None or self.command not in command:
+                return False
+        return True
+    
+    def skips_segment(self, path: Path, index: Optional[dict]) -> bool:
+        # dizinli parçalar zaman aralığı ve IP tablosuyla, diğerleri son yazma zamanıyla elenir
+        if index is None:
+            return self.since is not None and path.stat().st_mtime < self.since
+        if index['start_ts'] is None:
+            return True
+        if self.since is not None and index['end_ts'] < self.since:
+            return True
+        if self.until is not None and index['start_ts'] > self.until:
+            return True
+        return bool(self.client_ip) and self.client_ip not in index['ips']
+
+
+class SegmentResult:
+    
+    __slots__ = ('path', 'scanned', 'matched', 'skipped', 'lines', 'counters', 'hours')
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.scanned = 0
+        self.matched = 0
+        self.skipped = False
+        self.lines: List[bytes] = []
+        self.counters: Dict[str, Counter] = {}
+        self.hours: Counter = Counter()
+
+
+def scan_segment(path: Path, query: LogQuery) -> SegmentResult:
+    result = SegmentResult(path)
+    index = load_index(path) if path.suffix in SUFFIX_CODECS else None
+    if query.skips_segment(path, index):
+        result.skipped = True
+        return result
+    
+    for field in query.top:
+        result.counters[field] = Counter()
+    
+    needles = query.needles
+    records = read_records(path, index, client_ip=query.client_ip, since=query.since, until=query.until)
+    for line in records:
+        result.scanned += 1
+        if needles and not all(needle in line for needle in needles):
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if not query.matches(entry):
+            continue
+        
+        result.matched += 1
+        if not query.aggregating:
+            result.lines.append(line.rstrip(b'\n'))
+            if query.limit and result.matched >= query.limit:
+                break
+            continue
+        
+        for field, counter in result.counters.items():
+            value = field_value(entry, field)
+            if value is not None:
+                counter[value] += 1
+        if query.per_hour:
+            result.hours[time.strftime('%Y-%m-%d %H:00', time.localtime(entry.get('timestamp', 0)))] += 1
+    return result
+
+
+def find_segments(log_dir: Path, names: Optional[List[str]] = None) -> List[Path]:
+    # düz .json dosyaları ile arşivlenmiş .json.gz/.json.zst parçaları; sıralama zamana göre
+    segments: List[Tuple[float, Path]] = []
+    for path in log_dir.iterdir():
+        name = path.name
+        if not (name.endswith('.json') or any(name.endswith('.json' + suffix) for suffix in SUFFIX_CODECS)):
+            continue
+        
+        match = SEGMENT_PATTERN.match(name)
+        stem = match.group('stem') if match else name.split('.json')[0]
+        if names and stem.partition('.')[0] not in names:
+            continue
+        
+        index = load_index(path) if match and match.group('codec') else None
+        order = index['start_ts'] if index and index['start_ts'] is not None else path.stat().st_mtime
+        segments.append((order, path))
+    return [path for _, path in sorted(segments)]
+
+
+def run_scan(segments: List[Path], query: LogQuery, jobs: int) -> Iterator[SegmentResult]:
+    # parça başına bir iş; sonuçlar parça sırasıyla, hazır oldukça döner
+    if jobs <= 1 or len(segments) <= 1:
+        for path in segments:
+            yield scan_segment(path, query)
+        return
+    
+    # supervisor gibi spawn: ana süreçteki log thread'leri fork ile kopyalanmaz
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(jobs, len(segments)), mp_context=context) as pool:
+        yield from pool.map(scan_segment, segments, [query] * len(segments))
+
+
+def print_counter(title: str, counter: Counter, limit: int, ordered: bool = False):
+    print(f"\n{title}")
+    items = sorted(counter.items()) if ordered else counter.most_common(limit)
+    width = max((len(str(count)) for _, count in items), default=1)
+    for value, count in items:
+        print(f"  {count:>{width}}  {value}")
+
+
+def add_query_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--log-dir', type=Path, default=Path(HONEYPOT_CONFIG['logging']['log_dir']))
+    parser.add_argument('--log', action='append', dest='logs', metavar='NAME',
+                        help="yalnızca bu log dosyaları (ör. commands, ssh_session); tekrarlanabilir")
+    parser.add_argument('--since', type=parse_time, help="epoch, 'YYYY-MM-DD HH:MM' veya 2h/7d")
+    parser.add_argument('--until', type=parse_time)
+    parser.add_argument('--ip', dest='client_ip')
+    parser.add_argument('--user', dest='username')
+    parser.add_argument('--protocol', help="SSH veya Telnet")
+    parser.add_argument('--command', help="komut içinde geçen metin")
+    parser.add_argument('--top', action='append', choices=TOP_FIELDS, metavar='FIELD',
+                        help=f"en sık değerler; alanlar: {', '.join(TOP_FIELDS)}")
+    parser.add_argument('-n', type=int, default=10, dest='top_n', help="--top için satır sayısı")
+    parser.add_argument('--per-hour', action='store_true', help="saat başına kayıt sayısı")
+    parser.add_argument('--count', action='store_true', help="yalnızca eşleşen kayıt sayısı")
+    parser.add_argument('--limit', type=int, help="yazdırılacak en fazla kayıt")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="paralel taranan parça sayısı")
+
+
+def run_query(args: argparse.Namespace) -> int:
+    segments = find_segments(args.log_dir, args.logs) if args.log_dir.exists() else []
+    query = LogQuery(since=args.since, until=args.until, client_ip=args.client_ip,
+                     username=args.username, protocol=args.protocol, command=args.command,
+                     top=args.top, per_hour=args.per_hour,
+                     limit=None if args.count else args.limit)
+    if args.count and not query.aggregating:
+        # sayım için satırların ana sürece taşınmasına gerek yok
+        query.per_hour = True
+    
+    counters: Dict[str, Counter] = {field: Counter() for field in query.top}
+    hours: Counter = Counter()
+    matched = scanned = skipped = printed = 0
+    out = sys.stdout.buffer
+    
+    try:
+        for result in run_scan(segments, query, args.jobs):
+            scanned += result.scanned
+            matched += result.matched
+            skipped += result.skipped
+            for field, counter in result.counters.items():
+                counters[field].update(counter)
+            hours.update(result.hours)
+            
+            for line in result.lines:
+                if args.limit and printed >= args.limit:
+                    break
+                out.write(line + b'\n')
+                printed += 1
+            if not query.aggregating:
+                out.flush()
+                if args.limit and printed >= args.limit:
+                    break
+    except BrokenPipeError:
+        # head gibi komutlara yönlendirildiğinde sessizce çıkılır
+        sys.stderr.close()
+        return 0
+    
+    for field, counter in counters.items():
+        print_counter(f"En sık {field}", counter, args.top_n)
+    if args.per_hour:
+        print_counter("Saat başına kayıt", hours, 0, ordered=True)
+    if args.count:
+        print(matched)
+    
+    print(f"Parça: {len(segments)}, Atlanan: {skipped}, Taranan satır: {scanned}, Eşleşen: {matched}",
+          file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    # sunucu modüllerini içe aktarmaz; sorgu logger başlatmaz ve logs/ altına dosya açmaz
+    parser = argparse.ArgumentParser(description="JSON logları ve arşivlenmiş parçaları sorgular")
+    add_query_arguments(parser)
+    sys.exit(run_query(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
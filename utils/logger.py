@@ -1,18 +1,24 @@
+import atexit
 import logging
 import logging.handlers
 import json
-import time
+import os
+import queue
+import threading
+import uuid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from config.settings import HONEYPOT_CONFIG
+from utils.geoip import enrich_ip
+from utils.log_archive import log_archiver, segment_name
 
 
 class HoneypotFormatter(logging.Formatter):
     
     def format(self, record):
         log_entry = {
-            'timestamp': time.time(),
+            'timestamp': record.created,
             'datetime': self.formatTime(record),
             'level': record.levelname,
             'logger': record.name,
@@ -21,6 +27,10 @@ class HoneypotFormatter(logging.Formatter):
         
         if hasattr(record, 'client_ip'):
             log_entry['client_ip'] = record.client_ip
+            # kayıtlar yazıcı thread'inde biçimlendirilir; arama event loop'u bekletmez
+            enrichment = enrich_ip(record.client_ip)
+            if enrichment:
+                log_entry.update(enrichment)
         if hasattr(record, 'username'):
             log_entry['username'] = record.username
         if hasattr(record, 'command'):
@@ -33,22 +43,234 @@ class HoneypotFormatter(logging.Formatter):
         return json.dumps(log_entry, ensure_ascii=False)
 
 
-def setup_logger(name: str) -> logging.Logger:
+class ArchivingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    # arşiv açıksa dolan dosya .1, .2 ... zincirine kaydırılmaz; zaman damgalı bir parça
+    # adıyla yeniden adlandırılıp sıkıştırma ve dizinleme için arşivleyiciye verilir
+    
+    def doRollover(self):
+        if not log_archiver.enabled:
+            super().doRollover()
+            return
+            
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+            
+        if os.path.exists(self.baseFilename):
+            segment = segment_name(self.baseFilename)
+            os.rename(self.baseFilename, segment)
+            log_archiver.submit(segment)
+            
+        if not self.delay:
+            self.stream = self._open()
+            
+
+class BatchedRotatingFileHandler(ArchivingRotatingFileHandler):
+    # dosya boyutu sayaçla izlenir; her kayıtta seek/tell ve flush yapılmaz,
+    # flush yazıcı thread'i tarafından her batch sonunda çağrılır
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream_size = self.stream.tell() if self.stream else 0
+        
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or 'utf-8'))
+            
+            if self.stream is None:
+                self.stream = self._open()
+                self.stream_size = self.stream.tell()
+                
+            if self.maxBytes > 0 and self.stream_size and self.stream_size + size > self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream_size = 0
+                
+            self.stream.write(msg)
+            self.stream_size += size
+        except Exception:
+            self.handleError(record)
+
+
+class QueueLogWriter:
+    
+    _STOP = object()
+    
+    def __init__(self):
+        config = HONEYPOT_CONFIG['logging']['queue']
+        
+        self.queue: queue.Queue = queue.Queue(maxsize=config['max_size'])
+        self.overflow_policy = config['overflow_policy']
+        self.sample_every = max(1, config['sample_every'])
+        self.high_watermark = int(config['max_size'] * 0.8)
+        self.batch_size = config['batch_size']
+        self.flush_interval = config['flush_interval']
+        
+        self.handlers: Dict[str, List[logging.Handler]] = {}
+        self.stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'sampled_out': 0}
+        
+        self._sample_counter = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        
+    def register(self, name: str, handlers: List[logging.Handler]):
+        self.handlers[name] = handlers
+        
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+        
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self.queue.put(self._STOP)
+        self._thread.join(timeout=5)
+        
+    def enqueue(self, record: logging.LogRecord):
+        if not self._running:
+            # yazıcı durdurulduysa kayıt doğrudan yazılır
+            self._dispatch([record])
+            return
+            
+        if self.overflow_policy == 'block':
+            self.queue.put(record)
+            self.stats['enqueued'] += 1
+            return
+            
+        if self.overflow_policy == 'sample' and self.queue.qsize() >= self.high_watermark:
+            self._sample_counter += 1
+            if record.levelno < logging.WARNING and self._sample_counter % self.sample_every:
+                self.stats['sampled_out'] += 1
+                return
+                
+        try:
+            self.queue.put_nowait(record)
+            self.stats['enqueued'] += 1
+            return
+        except queue.Full:
+            if self.overflow_policy != 'drop_oldest':
+                self.stats['dropped'] += 1
+                return
+                
+        try:
+            self.queue.get_nowait()
+            self.stats['dropped'] += 1
+        except queue.Empty:
+            pass
+            
+        try:
+            self.queue.put_nowait(record)
+            self.stats['enqueued'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+            
+    def _dispatch(self, batch: List[logging.LogRecord]):
+        touched = set()
+        for record in batch:
+            for handler in self.handlers.get(record.name, ()):
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                    touched.add(handler)
+                    
+        for handler in touched:
+            handler.flush()
+            
+    def _run(self):
+        stopping = False
+        while not (stopping and self.queue.empty()):
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+                
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            if self._STOP in batch:
+                stopping = True
+                batch = [record for record in batch if record is not self._STOP]
+                
+            try:
+                self._dispatch(batch)
+            except Exception:
+                pass
+            self.stats['written'] += len(batch)
+
+
+class HoneypotQueueHandler(logging.handlers.QueueHandler):
+    
+    def __init__(self, writer: QueueLogWriter):
+        super().__init__(writer.queue)
+        self.writer = writer
+        
+    def prepare(self, record):
+        # JSON biçimlendirme yazıcı thread'inde yapılır, burada yalnızca mesaj çözülür
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+        
+    def enqueue(self, record):
+        self.writer.enqueue(record)
+
+
+_exc_formatter = logging.Formatter()
+_queue_writer: Optional[QueueLogWriter] = None
+_log_file_suffix = ''
+
+
+def get_queue_writer() -> QueueLogWriter:
+    global _queue_writer
+    
+    if _queue_writer is None:
+        _queue_writer = QueueLogWriter()
+        _queue_writer.start()
+        atexit.register(_queue_writer.stop)
+    return _queue_writer
+
+
+def get_log_queue_stats() -> Dict[str, int]:
+    if _queue_writer is None:
+        return {'enqueued': 0, 'written': 0, 'dropped': 0, 'sampled_out': 0, 'queue_size': 0}
+    return {**_queue_writer.stats, 'queue_size': _queue_writer.queue.qsize()}
+
+
+def setup_logger(name: str, use_queue: Optional[bool] = None) -> logging.Logger:
     logger = logging.getLogger(name)
     
     if logger.handlers:
         return logger
         
+    if use_queue is None:
+        use_queue = HONEYPOT_CONFIG['logging']['queue']['enabled']
+        
     logger.setLevel(getattr(logging, HONEYPOT_CONFIG['logging']['log_level']))
     
     log_dir = Path(HONEYPOT_CONFIG['logging']['log_dir'])
     log_dir.mkdir(parents=True, exist_ok=True)
     
-    json_handler = logging.handlers.RotatingFileHandler(
-        filename=log_dir / f"{name}.json",
+    handler_class = BatchedRotatingFileHandler if use_queue else ArchivingRotatingFileHandler
+    json_handler = handler_class(
+        filename=log_dir / f"{name}{_log_file_suffix}.json",
         maxBytes=HONEYPOT_CONFIG['logging']['max_file_size'],
         backupCount=HONEYPOT_CONFIG['logging']['backup_count'],
-        encoding='utf-8'
+        encoding='utf-8',
+        # dosya ilk kayıtta açılır; worker'da set_log_file_suffix içe aktarma sırasında
+        # oluşturulan handler'ları son ekli dosyaya yönlendirir, son eksiz dosya hiç açılmaz
+        delay=True
     )
     json_handler.setFormatter(HoneypotFormatter())
     console_handler = logging.StreamHandler()
@@ -58,25 +280,67 @@ def setup_logger(name: str) -> logging.Logger:
     )
     console_handler.setFormatter(console_formatter)
     
-    logger.addHandler(json_handler)
-    logger.addHandler(console_handler)
+    if use_queue:
+        writer = get_queue_writer()
+        writer.register(name, [json_handler, console_handler])
+        logger.addHandler(HoneypotQueueHandler(writer))
+    else:
+        logger.addHandler(json_handler)
+        logger.addHandler(console_handler)
     
     return logger
 
 
+def set_log_file_suffix(suffix: str):
+    # çok süreçli modda her worker kendi dosyalarına yazar (ör. commands.worker1.json);
+    # aynı dosyayı döndüren birden fazla süreç kayıtları bölerdi
+    global _log_file_suffix
+    _log_file_suffix = f".{suffix}"
+    log_archiver.suffix = _log_file_suffix
+    
+    handlers = []
+    if _queue_writer is not None:
+        for name_handlers in _queue_writer.handlers.values():
+            handlers.extend(name_handlers)
+    for logger in logging.Logger.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger):
+            handlers.extend(logger.handlers)
+            
+    for handler in handlers:
+        if not isinstance(handler, logging.handlers.RotatingFileHandler):
+            continue
+        path = Path(handler.baseFilename)
+        if path.stem.endswith(_log_file_suffix):
+            continue
+            
+        with handler.lock:
+            if handler.stream:
+                handler.stream.close()
+                handler.stream = None
+            handler.baseFilename = str(path.with_name(f"{path.stem}{_log_file_suffix}{path.suffix}"))
+
+
+class SessionLoggerAdapter(logging.LoggerAdapter):
+    
+    def process(self, msg, kwargs):
+        extra = kwargs.get('extra')
+        kwargs['extra'] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def get_session_logger(name: str, **context) -> logging.LoggerAdapter:
+    # tüm oturumlar aynı logger'ı paylaşır, IP/oturum bilgisi kayıt alanı olarak eklenir
+    return SessionLoggerAdapter(setup_logger(name), context)
+
+
 def log_attack_attempt(client_ip: str, protocol: str, username: str, 
                       password: str, success: bool = False):
     logger = setup_logger('attack_attempts')
     
-    log_data = {
-        'client_ip': client_ip,
-        'protocol': protocol,
-        'username': username,
-        'password': password,
-        'success': success,
-        'timestamp': time.time()
-    }
-    
     if success:
         logger.warning(f"Başarılı giriş - {protocol} - {client_ip} - {username}:{password}")
     else:
@@ -0,0 +1,204 @@
+import asyncio
+import bisect
+import math
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from utils.logger import setup_logger
+
+
+# sayaçlar yalnızca event loop thread'inden güncellenir; kilit gerekmez.
+# bir ölçüm dict araması ve tamsayı artışı, histogramda ek olarak bir bisect'tir
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DRAIN_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values: Dict[Tuple, float] = {}
+    
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name}{format_labels(self.labels, key)} {format_value(value)}"
+                for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.bounds = list(buckets)
+        # etiket -> [kova sayaçları (+Inf dahil), toplam]; kovalar çıktıda birikimli yazılır
+        self.series: Dict[Tuple, list] = {}
+    
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.bounds) + 1), 0.0]
+        series[0][bisect.bisect_left(self.bounds, value)] += 1
+        series[1] += value
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + [math.inf], counts):
+                cumulative += count
+                bucket_labels = format_labels(self.labels, key, 'le="%s"' % format_value(bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    # mevcut get_stats() sözlükleri yalnızca kazıma anında okunur; sıcak yolda maliyeti yoktur
+    
+    def __init__(self, name: str, kind: str, help_text: str, callback: Callable,
+                 label: Optional[str] = None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.callback = callback
+        self.label = label
+    
+    def samples(self) -> List[str]:
+        value = self.callback()
+        if isinstance(value, dict):
+            return [f"{self.name}{format_labels((self.label,), (key,))} {format_value(item)}"
+                    for key, item in sorted(value.items())]
+        return [f"{self.name} {format_value(value)}"]
+
+
+Metric = Union[Counter, Histogram, CallbackMetric]
+
+
+class MetricsRegistry:
+    
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+    
+    def add(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.add(Counter(name, help_text, labels))
+    
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, help_text, labels, buckets))
+    
+    def callback(self, name: str, kind: str, help_text: str, callback: Callable,
+                 label: Optional[str] = None) -> CallbackMetric:
+        return self.add(CallbackMetric(name, kind, help_text, callback, label))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception:
+                # kapanmış bir servisin istatistiği tüm çıktıyı bozmasın
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+connections_total = registry.counter(
+    'bear_connections_total', "Kabul edilen ve reddedilen bağlantılar", ('protocol', 'result'))
+auth_attempts_total = registry.counter(
+    'bear_auth_attempts_total', "Giriş denemeleri", ('protocol', 'result'))
+commands_total = registry.counter(
+    'bear_commands_total', "Çalıştırılan shell komutları", ('protocol',))
+
+accept_latency = registry.histogram(
+    'bear_accept_to_banner_seconds', "Soket kabulünden banner yazımına kadar geçen süre", ('protocol',))
+auth_latency = registry.histogram(
+    'bear_auth_seconds', "Parola doğrulamanın işlem süresi", ('protocol',))
+command_latency = registry.histogram(
+    'bear_command_seconds', "execute_command süresi (yapay gecikme hariç)", ('command',))
+drain_latency = registry.histogram(
+    'bear_output_drain_seconds', "Çıktı tamponunun dolu kaldığı süre", ('protocol',), DRAIN_BUCKETS)
+
+
+class MetricsServer:
+    # yalnızca GET /metrics yanıtlanır; istek başına tek yanıt, ardından bağlantı kapanır
+    
+    def __init__(self, host: str, port: int, metrics_registry: MetricsRegistry = registry):
+        self.host = host
+        self.port = port
+        self.registry = metrics_registry
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.logger = setup_logger('metrics')
+    
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.logger.info(f"Metrik sunucusu başlatıldı - {self.host}:{self.port}/metrics")
+    
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            # başlıklar okunup atılır
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+            
+            parts = request.decode('latin-1').split()
+            path = parts[1].split('?')[0] if len(parts) > 1 else ''
+            if len(parts) > 1 and parts[0] == 'GET' and path == '/metrics':
+                status, content_type, body = '200 OK', CONTENT_TYPE, self.registry.render().encode('utf-8')
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'not found\n'
+            
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,132 @@
+import multiprocessing
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    # GCRA: token bucket ile aynı davranış, IP başına yalnızca tek bir float (teorik varış zamanı) tutulur.
+    # Tablo erişim sırasına göre tutulur; süresi dolmuş (kovası dolmuş) kayıtlar ve kapasite aşımı baştan atılır.
+    
+    def __init__(self, max_requests: int, time_window: float, max_tracked_ips: int):
+        self.max_requests = max_requests
+        self.time_window = float(time_window)
+        self.emission_interval = self.time_window / max_requests
+        self.max_tracked_ips = max_tracked_ips
+        
+        self.tats: 'OrderedDict[str, float]' = OrderedDict()
+        self.stats = {'allowed': 0, 'rejected': 0, 'expired': 0, 'evicted': 0}
+        
+    def allow(self, ip: str, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+            
+        tat = self.tats.get(ip)
+        if tat is not None:
+            self.tats.move_to_end(ip)
+        if tat is None or tat < now:
+            tat = now
+            
+        new_tat = tat + self.emission_interval
+        if new_tat - self.time_window > now:
+            self.stats['rejected'] += 1
+            return False
+            
+        self.tats[ip] = new_tat
+        self.stats['allowed'] += 1
+        self._evict(now)
+        return True
+        
+    def _evict(self, now: float):
+        tats = self.tats
+        
+        while tats:
+            ip, tat = next(iter(tats.items()))
+            if tat <= now:
+                self.stats['expired'] += 1
+            elif len(tats) > self.max_tracked_ips:
+                self.stats['evicted'] += 1
+            else:
+                break
+            del tats[ip]
+            
+    def purge(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.monotonic()
+            
+        expired = [ip for ip, tat in self.tats.items() if tat <= now]
+        for ip in expired:
+            del self.tats[ip]
+        self.stats['expired'] += len(expired)
+        return len(expired)
+        
+    def memory_usage(self) -> int:
+        if not self.tats:
+            return sys.getsizeof(self.tats)
+            
+        sample_ip = next(iter(self.tats))
+        per_entry = sys.getsizeof(sample_ip) + sys.getsizeof(0.0)
+        return sys.getsizeof(self.tats) + len(self.tats) * per_entry
+        
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'tracked_ips': len(self.tats),
+            'max_tracked_ips': self.max_tracked_ips,
+            'memory_bytes': self.memory_usage(),
+        }
+
+
+
+class SharedRateLimiter:
+    # çok süreçli mod için GCRA: TAT değerleri paylaşımlı bellekte sabit boyutlu bir tabloda,
+    # IP'nin hash'ine göre tutulur; tüm worker'lar aynı bütçeyi paylaşır
+    
+    def __init__(self, max_requests: int, time_window: float, tats, locks):
+        self.max_requests = max_requests
+        self.time_window = float(time_window)
+        self.emission_interval = self.time_window / max_requests
+        self.tats = tats
+        self.locks = locks
+        self.stats = {'allowed': 0, 'rejected': 0, 'expired': 0, 'evicted': 0}
+        
+    @classmethod
+    def create(cls, max_requests: int, time_window: float, slots: int, lock_stripes: int = 64,
+               context=None) -> 'SharedRateLimiter':
+        context = context or multiprocessing.get_context()
+        tats = context.RawArray('d', slots)
+        locks = [context.Lock() for _ in range(lock_stripes)]
+        return cls(max_requests, time_window, tats, locks)
+        
+    def allow(self, ip: str, now: Optional[float] = None) -> bool:
+        if now is None:
+            # CLOCK_MONOTONIC sistem genelinde ortak, süreçler arası karşılaştırılabilir
+            now = time.monotonic()
+            
+        index = zlib.crc32(ip.encode()) % len(self.tats)
+        
+        with self.locks[index % len(self.locks)]:
+            tat = max(self.tats[index], now)
+            new_tat = tat + self.emission_interval
+            if new_tat - self.time_window > now:
+                self.stats['rejected'] += 1
+                return False
+            self.tats[index] = new_tat
+            
+        self.stats['allowed'] += 1
+        return True
+        
+    def purge(self, now: Optional[float] = None) -> int:
+        return 0
+        
+    def memory_usage(self) -> int:
+        return len(self.tats) * 8
+        
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'table_slots': len(self.tats),
+            'memory_bytes': self.memory_usage(),
+        }
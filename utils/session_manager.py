@@ -1,133 +1,338 @@
+import asyncio
+import heapq
+import itertools
+import math
 import time
-from collections import defaultdict, deque
-from typing import Dict, Set
+from collections import defaultdict, OrderedDict
+from typing import Dict, List, Optional, Tuple
 from threading import Lock
 
 from config.settings import HONEYPOT_CONFIG
-from utils.logger import setup_logger
+from utils.ban_store import BanStore
+from utils.ip_ranges import IPRangeSet
+from utils.logger import setup_logger, new_session_id, security_logger
+from utils.rate_limiter import RateLimiter
+
+
+_connection_ids = itertools.count(1)
+
+
+class ConnectionContext:
+    # bağlantıya ait durum; eşzamanlı el sıkışmalarda kimlik bilgileri doğru IP'ye yazılır
+    
+    __slots__ = ('connection_id', 'session_id', 'protocol', 'client_ip', 'client_port',
+                 'connected_at', 'auth_started_at', 'authenticated_at', 'username', 'authenticated',
+                 'opened_at', 'last_activity')
+    
+    def __init__(self, protocol: str, client_ip: str, client_port: Optional[int] = None):
+        self.connection_id = next(_connection_ids)
+        self.session_id = new_session_id()
+        self.protocol = protocol
+        self.client_ip = client_ip
+        self.client_port = client_port
+        self.connected_at = time.time()
+        self.auth_started_at: Optional[float] = None
+        self.authenticated_at: Optional[float] = None
+        self.username: Optional[str] = None
+        self.authenticated = False
+        # zaman aşımı hesapları için monotonic saat
+        self.opened_at = time.monotonic()
+        self.last_activity = self.opened_at
+        
+    def touch(self):
+        self.last_activity = time.monotonic()
+        
+    def mark_authenticated(self, username: str):
+        self.username = username
+        self.authenticated = True
+        self.authenticated_at = time.time()
+
+
+class ConnectionSlots:
+    # sabit zamanlı, beklemesiz bağlantı kabul sınırı; asyncssh connection_made gibi
+    # senkron callback'lerden de çağrılabildiği için await gerektirmez
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        
+    @property
+    def available(self) -> int:
+        return self.limit - self.in_use
+        
+    def try_acquire(self) -> bool:
+        if self.in_use >= self.limit:
+            return False
+        self.in_use += 1
+        return True
+        
+    def release(self):
+        if self.in_use > 0:
+            self.in_use -= 1
 
 
 class SessionManager:
     
-    def __init__(self):
+    PROTOCOLS = ('ssh', 'telnet')
+    
+    def __init__(self, rate_limiter=None, sync_channel=None, ban_store: Optional[BanStore] = None):
         self.logger = setup_logger('session_manager')
         self.lock = Lock()
+        # çok süreçli modda yasak olayları bu kanal üzerinden diğer worker'lara iletilir
+        self.sync_channel = sync_channel
         
         self.active_connections: Dict[str, int] = defaultdict(int)
+        self.total_connections = 0
+        self.max_concurrent_per_ip = HONEYPOT_CONFIG['security']['max_concurrent_per_ip']
+        self.global_slots = ConnectionSlots(HONEYPOT_CONFIG['security']['max_total_connections'])
+        self.protocol_slots: Dict[str, ConnectionSlots] = {
+            protocol: ConnectionSlots(HONEYPOT_CONFIG[protocol]['max_connections'])
+            for protocol in self.PROTOCOLS
+        }
         
-        self.connection_times: Dict[str, deque] = defaultdict(deque)
-        
-        self.blocked_ips: Set[str] = set(HONEYPOT_CONFIG['security']['blocked_ips'])
+        rate_limit_config = HONEYPOT_CONFIG['security']['rate_limit']
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_requests=rate_limit_config['max_connections_per_ip'],
+            time_window=rate_limit_config['time_window'],
+            max_tracked_ips=rate_limit_config['max_tracked_ips']
+        )
         
-        self.allowed_ips: Set[str] = set(HONEYPOT_CONFIG['security']['allowed_ips'])
+        # yapılandırma ve besleme dosyalarındaki CIDR/IPv6 önekleri; tek adresler de tam önek olarak eklenir
+        security_config = HONEYPOT_CONFIG['security']
+        cache_dir = security_config['ip_list_cache_dir']
+        self.blocked_networks = IPRangeSet.from_sources(
+            security_config['blocked_ips'], security_config['blocklist_files'],
+            cache_path=cache_dir / 'blocklist.cache' if cache_dir else None
+        )
+        self.allowed_networks = IPRangeSet.from_sources(
+            security_config['allowed_ips'], security_config['allowlist_files'],
+            cache_path=cache_dir / 'allowlist.cache' if cache_dir else None
+        )
         
-        self.current_ip = None
+        # çalışma sırasında eklenen yasaklar: IP -> bitiş zamanı (time.time); kalıcı yasaklar math.inf
+        self.blocked_ips: Dict[str, float] = {}
+        # süreli yasakların bitişleri min-heap'te tutulur; kaldırılan yasaklar heap'ten tembel silinir
+        self.ban_heap: List[Tuple[float, str]] = []
+        self.auto_ban = HONEYPOT_CONFIG['security']['auto_ban']
+        self.max_login_attempts = HONEYPOT_CONFIG['security']['max_login_attempts']
+        # IP -> [pencere başlangıcı, başarısız giriş sayısı], erişim sırasına göre
+        self.failures: 'OrderedDict[str, List[float]]' = OrderedDict()
+        self.max_tracked_failures = HONEYPOT_CONFIG['security']['rate_limit']['max_tracked_ips']
         
-    def set_current_ip(self, ip: str):
-        self.current_ip = ip
-        
-    def get_current_ip(self) -> str:
-        return self.current_ip
+        self.ban_store = ban_store
+        if ban_store:
+            for ip, expires_at in ban_store.load().items():
+                self._add_ban(ip, expires_at)
         
     def is_ip_allowed(self, ip: str) -> bool:
-        if ip in self.blocked_ips:
+        return self.ip_rejection_reason(ip) is None
+        
+    def ip_rejection_reason(self, ip: str) -> Optional[str]:
+        if self.ban_heap and self.ban_heap[0][0] <= time.time():
+            self.expire_bans()
+            
+        if ip in self.blocked_ips or ip in self.blocked_networks:
             self.logger.warning(f"Yasaklı IP bağlantı denemesi: {ip}")
-            return False
+            return 'blocked'
             
-        if self.allowed_ips and ip not in self.allowed_ips:
+        if self.allowed_networks and ip not in self.allowed_networks:
             self.logger.warning(f"İzin verilmeyen IP bağlantı denemesi: {ip}")
-            return False
+            return 'not_allowed'
             
-        return True
+        return None
         
     def check_rate_limit(self, ip: str) -> bool:
         if not HONEYPOT_CONFIG['security']['rate_limit']['enabled']:
             return True
             
-        current_time = time.time()
-        time_window = HONEYPOT_CONFIG['security']['rate_limit']['time_window']
-        max_connections = HONEYPOT_CONFIG['security']['rate_limit']['max_connections_per_ip']
-        
         with self.lock:
-            while (self.connection_times[ip] and 
-                   current_time - self.connection_times[ip][0] > time_window):
-                self.connection_times[ip].popleft()
-                
-            if len(self.connection_times[ip]) >= max_connections:
-                self.logger.warning(f"Rate limit aşıldı - IP: {ip}, Bağlantı sayısı: {len(self.connection_times[ip])}")
-                return False
-                
-            self.connection_times[ip].append(current_time)
+            allowed = self.rate_limiter.allow(ip)
             
-        return True
+        if not allowed:
+            self.logger.warning(f"Rate limit aşıldı - IP: {ip}")
+            
+        return allowed
         
-    def can_connect(self, ip: str) -> bool:
-        self.set_current_ip(ip)
+    def can_connect(self, ip: str, protocol: str = 'ssh') -> bool:
+        return self.check_connection(ip, protocol) is None
         
-        if not self.is_ip_allowed(ip):
-            return False
+    def check_connection(self, ip: str, protocol: str = 'ssh') -> Optional[str]:
+        # bağlantı kabul edilecekse None, aksi halde red sebebi döner
+        reason = self.ip_rejection_reason(ip)
+        if reason:
+            return reason
             
-        if not self.check_rate_limit(ip):
-            return False
+        if self.global_slots.available <= 0:
+            self.logger.warning(f"Maksimum toplam bağlantı sayısı aşıldı: {self.global_slots.in_use}")
+            return 'capacity'
             
-        max_connections = HONEYPOT_CONFIG['ssh']['max_connections']
-        total_connections = sum(self.active_connections.values())
-        
-        if total_connections >= max_connections:
-            self.logger.warning(f"Maksimum bağlantı sayısı aşıldı: {total_connections}")
-            return False
+        slots = self.protocol_slots[protocol.lower()]
+        if slots.available <= 0:
+            self.logger.warning(f"Maksimum bağlantı sayısı aşıldı - Protokol: {protocol}, Bağlantı: {slots.in_use}")
+            return 'capacity'
             
-        return True
+        if self.active_connections.get(ip, 0) >= self.max_concurrent_per_ip:
+            self.logger.warning(f"IP başına eşzamanlı bağlantı sınırı aşıldı - IP: {ip}")
+            return 'per_ip'
+            
+        if not self.check_rate_limit(ip):
+            return 'rate_limit'
+            
+        return None
         
-    def add_connection(self, ip: str):
+    def add_connection(self, ip: str, protocol: str = 'ssh') -> bool:
         with self.lock:
+            if self.active_connections.get(ip, 0) >= self.max_concurrent_per_ip:
+                return False
+            if not self.global_slots.try_acquire():
+                return False
+            if not self.protocol_slots[protocol.lower()].try_acquire():
+                self.global_slots.release()
+                return False
+                
             self.active_connections[ip] += 1
-            total = sum(self.active_connections.values())
-            self.logger.info(f"Bağlantı eklendi - IP: {ip}, Bu IP'den: {self.active_connections[ip]}, Toplam: {total}")
+            self.total_connections += 1
+            self.logger.info(f"Bağlantı eklendi - IP: {ip}, Bu IP'den: {self.active_connections[ip]}, "
+                             f"Toplam: {self.total_connections}")
+            return True
             
-    def remove_connection(self, ip: str):
+    def remove_connection(self, ip: str, protocol: str = 'ssh'):
         with self.lock:
-            if ip in self.active_connections:
-                self.active_connections[ip] -= 1
-                if self.active_connections[ip] <= 0:
-                    del self.active_connections[ip]
-                    
-            total = sum(self.active_connections.values())
-            self.logger.info(f"Bağlantı kaldırıldı - IP: {ip}, Kalan toplam: {total}")
+            if ip not in self.active_connections:
+                return
+                
+            self.active_connections[ip] -= 1
+            if self.active_connections[ip] <= 0:
+                del self.active_connections[ip]
+            self.total_connections -= 1
+            self.global_slots.release()
+            self.protocol_slots[protocol.lower()].release()
+            
+            self.logger.info(f"Bağlantı kaldırıldı - IP: {ip}, Kalan toplam: {self.total_connections}")
             
     def get_connection_stats(self) -> Dict:
         with self.lock:
-            total_connections = sum(self.active_connections.values())
-            unique_ips = len(self.active_connections)
-            
             return {
-                'total_connections': total_connections,
-                'unique_ips': unique_ips,
+                'total_connections': self.total_connections,
+                'connections_per_protocol': {
+                    protocol: slots.in_use for protocol, slots in self.protocol_slots.items()
+                },
+                'unique_ips': len(self.active_connections),
                 'connections_per_ip': dict(self.active_connections),
                 'blocked_ips_count': len(self.blocked_ips),
-                'allowed_ips_count': len(self.allowed_ips) if self.allowed_ips else 'unlimited'
+                'blocked_ranges_count': len(self.blocked_networks),
+                'allowed_ranges_count': len(self.allowed_networks) if self.allowed_networks else 'unlimited',
+                'tracked_failures': len(self.failures),
+                'rate_limiter': self.rate_limiter.get_stats()
             }
             
-    def block_ip(self, ip: str, reason: str = "Manual block"):
+    def _add_ban(self, ip: str, expires_at: float):
+        self.blocked_ips[ip] = expires_at
+        if expires_at != math.inf:
+            heapq.heappush(self.ban_heap, (expires_at, ip))
+            
+        # sınır aşılırsa en kısa sürede bitecek süreli yasaklar erkenden kaldırılır
+        while len(self.blocked_ips) > self.auto_ban['max_bans'] and self.ban_heap:
+            expires_at, evicted = heapq.heappop(self.ban_heap)
+            if self.blocked_ips.get(evicted) == expires_at:
+                del self.blocked_ips[evicted]
+                
+    def block_ip(self, ip: str, reason: str = "Manual block", propagate: bool = True,
+                 duration: Optional[float] = None, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = time.time() + duration if duration else math.inf
+            
         with self.lock:
-            self.blocked_ips.add(ip)
-            self.logger.warning(f"IP yasaklandı - IP: {ip}, Sebep: {reason}")
+            self._add_ban(ip, expires_at)
+            self.logger.warning(f"IP yasaklandı - IP: {ip}, Sebep: {reason}"
+                                + (f", Süre: {duration:g}s" if duration else ""))
+            
+        # çok süreçli modda yasakları supervisor kaydeder
+        if propagate and self.ban_store:
+            self.ban_store.add(ip, expires_at)
+        if propagate:
+            self._publish(('block', ip, reason, expires_at))
             
-    def unblock_ip(self, ip: str):
+    def unblock_ip(self, ip: str, propagate: bool = True):
         with self.lock:
-            if ip in self.blocked_ips:
-                self.blocked_ips.remove(ip)
+            if self.blocked_ips.pop(ip, None) is not None:
                 self.logger.info(f"IP yasağı kaldırıldı: {ip}")
                 
-    def cleanup_old_records(self):
-        current_time = time.time()
-        time_window = HONEYPOT_CONFIG['security']['rate_limit']['time_window']
-        
+        if propagate and self.ban_store:
+            self.ban_store.remove(ip)
+        if propagate:
+            self._publish(('unblock', ip, '', 0.0))
+            
+    def expire_bans(self, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+            
         with self.lock:
-            for ip in list(self.connection_times.keys()):
-                while (self.connection_times[ip] and 
-                       current_time - self.connection_times[ip][0] > time_window):
-                    self.connection_times[ip].popleft()
+            while self.ban_heap and self.ban_heap[0][0] <= now:
+                expires_at, ip = heapq.heappop(self.ban_heap)
+                if self.blocked_ips.get(ip) == expires_at:
+                    del self.blocked_ips[ip]
+                    self.logger.info(f"IP yasağının süresi doldu: {ip}")
                     
-                if not self.connection_times[ip]:
-                    del self.connection_times[ip]
\ No newline at end of file
+    def record_auth_failure(self, ip: str) -> bool:
+        # protokolden bağımsız sayılır; eşik aşılırsa IP süreli yasaklanır ve True döner
+        if not self.auto_ban['enabled']:
+            return False
+            
+        window = self.auto_ban['failure_window']
+        now = time.time()
+        
+        with self.lock:
+            entry = self.failures.get(ip)
+            if entry is None or now - entry[0] > window:
+                entry = [now, 0]
+            entry[1] += 1
+            self.failures[ip] = entry
+            self.failures.move_to_end(ip)
+            
+            while self.failures:
+                oldest_ip, oldest = next(iter(self.failures.items()))
+                if now - oldest[0] <= window and len(self.failures) <= self.max_tracked_failures:
+                    break
+                del self.failures[oldest_ip]
+                
+            attempts = entry[1]
+            if attempts < self.max_login_attempts:
+                return False
+            self.failures.pop(ip, None)
+            
+        security_logger.log_multiple_failed_logins(ip, int(attempts), window)
+        self.block_ip(ip, f"{int(attempts)} başarısız giriş", duration=self.auto_ban['ban_duration'])
+        return True
+            
+    def _publish(self, event: tuple):
+        if not self.sync_channel:
+            return
+        try:
+            self.sync_channel.send(event)
+        except (BrokenPipeError, OSError) as e:
+            self.logger.error(f"Senkronizasyon kanalı yazma hatası: {e}")
+            
+    def start_sync(self):
+        if self.sync_channel:
+            asyncio.get_running_loop().add_reader(self.sync_channel.fileno(), self._receive_sync_events)
+            
+    def stop_sync(self):
+        if self.sync_channel:
+            asyncio.get_running_loop().remove_reader(self.sync_channel.fileno())
+            
+    def _receive_sync_events(self):
+        try:
+            while self.sync_channel.poll():
+                kind, ip, reason, expires_at = self.sync_channel.recv()
+                if kind == 'block':
+                    self.block_ip(ip, reason, propagate=False, expires_at=expires_at)
+                elif kind == 'unblock':
+                    self.unblock_ip(ip, propagate=False)
+        except (EOFError, OSError):
+            self.stop_sync()
+                
+    def cleanup_old_records(self):
+        with self.lock:
+            self.rate_limiter.purge()
+        self.expire_bans()
\ No newline at end of file
@@ -0,0 +1,263 @@
+import argparse
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+# dosya: MAGIC, JSON üst veri uzunluğu + üst veri, ardından sıkıştırılmış parçalar.
+# parça: sıkıştırılmış uzunluk, ham uzunluk, zlib verisi. Ham veri olaylardan oluşur:
+# önceki olaydan bu yana geçen ms, tür (i: girdi, o: çıktı), uzunluk, veri.
+MAGIC = b'BEARREC1'
+META_HEADER = struct.Struct('<I')
+CHUNK_HEADER = struct.Struct('<II')
+EVENT_HEADER = struct.Struct('<IcI')
+INPUT = b'i'
+OUTPUT = b'o'
+
+
+class SessionRecording:
+    # olaylar oturum başına bir bytearray'de birikir; parça boyutuna veya süreye ulaşınca
+    # sıkıştırma ve yazma için kayıt thread'ine verilir
+    
+    __slots__ = ('recorder', 'path', 'prefix', 'buffer', 'last_event', 'last_flush', 'closed')
+    
+    def __init__(self, recorder: 'SessionRecorder', path: Path, meta: dict):
+        self.recorder = recorder
+        self.path = path
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        self.prefix = MAGIC + META_HEADER.pack(len(meta_bytes)) + meta_bytes
+        self.buffer = bytearray()
+        self.last_event = time.monotonic()
+        self.last_flush = self.last_event
+        self.closed = False
+        
+    def _append(self, kind: bytes, data: Union[str, bytes]):
+        if self.closed:
+            return
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+            
+        now = time.monotonic()
+        delta = min(int((now - self.last_event) * 1000), 0xFFFFFFFF)
+        self.last_event = now
+        self.buffer += EVENT_HEADER.pack(delta, kind, len(data))
+        self.buffer += data
+        
+        if (len(self.buffer) >= self.recorder.chunk_size or
+                now - self.last_flush >= self.recorder.flush_interval):
+            self.flush()
+            
+    def input(self, data: Union[str, bytes]):
+        self._append(INPUT, data)
+        
+    def output(self, data: Union[str, bytes]):
+        self._append(OUTPUT, data)
+        
+    def flush(self):
+        if not self.buffer and not self.prefix:
+            return
+        # kuyruk doluysa olaylar düşer ama başlık korunur; aksi halde sonraki parçalar
+        # MAGIC ve üst veri olmadan yazılır ve dosya okunamaz
+        if self.recorder.submit(self.path, self.prefix, bytes(self.buffer)):
+            self.prefix = b''
+        self.buffer.clear()
+        self.last_flush = time.monotonic()
+        
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+
+class SessionRecorder:
+    
+    _STOP = object()
+    
+    def __init__(self):
+        config = HONEYPOT_CONFIG['recording']
+        
+        self.enabled = config['enabled']
+        self.directory = Path(config['directory'])
+        self.chunk_size = config['chunk_size']
+        self.flush_interval = config['flush_interval']
+        self.compression_level = config['compression_level']
+        
+        self.queue: queue.Queue = queue.Queue(maxsize=config['queue_size'])
+        self.stats = {'sessions': 0, 'chunks': 0, 'raw_bytes': 0, 'written_bytes': 0, 'dropped': 0}
+        
+        self.logger = setup_logger('session_recorder')
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        
+    def start(self):
+        if not self.enabled or self._running:
+            return
+            
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='session-recorder', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Oturum kaydı başlatıldı: {self.directory}")
+        
+    def stop(self):
+        if not self._running:
+            return
+            
+        self._running = False
+        self.queue.put(self._STOP)
+        self._thread.join(timeout=10)
+        self.logger.info(f"Oturum kaydı durduruldu - Oturum: {self.stats['sessions']}, "
+                         f"Ham: {self.stats['raw_bytes']}, Diskte: {self.stats['written_bytes']}, "
+                         f"Düşürülen parça: {self.stats['dropped']}")
+        
+    def open(self, session_id: str, client_ip: str, protocol: str, username: str,
+             width: int = 80, height: int = 24) -> Optional[SessionRecording]:
+        if not self._running:
+            return None
+            
+        started_at = time.time()
+        path = self.directory / time.strftime('%Y-%m-%d', time.gmtime(started_at)) / f"{session_id}.bearrec"
+        meta = {
+            'session_id': session_id,
+            'client_ip': client_ip,
+            'protocol': protocol,
+            'username': username,
+            'started_at': started_at,
+            'width': width,
+            'height': height,
+        }
+        self.stats['sessions'] += 1
+        return SessionRecording(self, path, meta)
+        
+    def submit(self, path: Path, prefix: bytes, events: bytes) -> bool:
+        try:
+            self.queue.put_nowait((path, prefix, events))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+            
+    def _write(self, path: Path, prefix: bytes, events: bytes):
+        data = prefix
+        if events:
+            compressed = zlib.compress(events, self.compression_level)
+            data += CHUNK_HEADER.pack(len(compressed), len(events)) + compressed
+            self.stats['raw_bytes'] += len(events)
+            self.stats['chunks'] += 1
+            
+        # gün dizini kayıt sırasında değişebilir veya silinmiş olabilir
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(data)
+        self.stats['written_bytes'] += len(data)
+        
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+            try:
+                self._write(*item)
+            except OSError as e:
+                self.stats['dropped'] += 1
+                self.logger.error(f"Oturum kaydı yazma hatası - {item[0]}: {e}")
+
+
+def read_recording(f: BinaryIO) -> Tuple[dict, Iterator[Tuple[float, bytes, bytes]]]:
+    # dosyayı parça parça açar; bellekte aynı anda yalnızca tek bir parça bulunur
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Geçersiz oturum kaydı")
+    (meta_length,) = META_HEADER.unpack(f.read(META_HEADER.size))
+    meta = json.loads(f.read(meta_length).decode('utf-8'))
+    
+    def events() -> Iterator[Tuple[float, bytes, bytes]]:
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return
+            compressed_length, _ = CHUNK_HEADER.unpack(header)
+            compressed = f.read(compressed_length)
+            if len(compressed) < compressed_length:
+                return
+                
+            chunk = zlib.decompress(compressed)
+            offset = 0
+            while offset < len(chunk):
+                delta, kind, length = EVENT_HEADER.unpack_from(chunk, offset)
+                offset += EVENT_HEADER.size
+                yield delta / 1000, kind, chunk[offset:offset + length]
+                offset += length
+                
+    return meta, events()
+
+
+def replay(path: Path, speed: float, max_wait: float):
+    with open(path, 'rb') as f:
+        meta, events = read_recording(f)
+        out = sys.stdout.buffer
+        out.write(f"# {meta['protocol']} {meta['client_ip']} {meta['username']} "
+                  f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta['started_at']))}\r\n".encode('utf-8'))
+        
+        for delta, kind, data in events:
+            time.sleep(min(delta, max_wait) / speed)
+            out.write(data)
+            out.flush()
+        out.write(b"\r\n")
+        
+        
+def export_asciicast(path: Path, output: Path, input_events: bool):
+    # asciicast v2; oynatıcılar "i" olaylarını göstermediği için girdi varsayılan olarak
+    # saldırganın ekranında göründüğü gibi "o" olayı yazılır
+    with open(path, 'rb') as f, open(output, 'w', encoding='utf-8') as out:
+        meta, events = read_recording(f)
+        out.write(json.dumps({
+            'version': 2,
+            'width': meta['width'],
+            'height': meta['height'],
+            'timestamp': int(meta['started_at']),
+            'title': f"{meta['protocol']} {meta['client_ip']} {meta['username']}",
+        }) + "\n")
+        
+        elapsed = 0.0
+        for delta, kind, data in events:
+            elapsed += delta
+            event_type = 'i' if kind == INPUT and input_events else 'o'
+            out.write(json.dumps([round(elapsed, 3), event_type, data.decode('utf-8', errors='replace')],
+                                 ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oturum kayıtlarını oynatır veya asciicast olarak dışa aktarır")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    replay_parser = commands.add_parser('replay')
+    replay_parser.add_argument('path', type=Path)
+    replay_parser.add_argument('--speed', type=float, default=1.0)
+    replay_parser.add_argument('--max-wait', type=float, default=2.0, help="olaylar arası en uzun bekleme (s)")
+    
+    export_parser = commands.add_parser('export')
+    export_parser.add_argument('path', type=Path)
+    export_parser.add_argument('output', type=Path, help=".cast dosyası")
+    export_parser.add_argument('--input-events', action='store_true', help="girdiyi 'i' olayı olarak yaz")
+    
+    args = parser.parse_args()
+    if args.command == 'replay':
+        replay(args.path, args.speed, args.max_wait)
+    else:
+        export_asciicast(args.path, args.output, args.input_events)
+
+
+session_recorder = SessionRecorder()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Set
+
+from config.settings import HONEYPOT_CONFIG
+from utils.logger import setup_logger
+
+
+class TimerWheel:
+    # hashed timing wheel: bağlantı başına zamanlayıcı yoktur, her tick'te yalnızca bir yuva taranır.
+    # Aktivite sadece bağlantının last_activity alanını günceller; yuva geldiğinde süresi dolmamış
+    # kayıtlar yeni son tarihe göre tekrar yerleştirilir (tembel yeniden planlama).
+    # Kayıtlar timeout_deadline() -> monotonic zaman ve timeout_expired() sunar.
+    
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.wheel: List[Set] = [set() for _ in range(slots)]
+        self.position = 0
+        self.current_time = time.monotonic()
+        self.entries: Dict[object, int] = {}
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.logger = setup_logger('timer_wheel')
+        self.stats = {'expired': 0, 'rescheduled': 0}
+        
+    def start(self):
+        if self.handle is None:
+            self.loop = asyncio.get_running_loop()
+            self.current_time = time.monotonic()
+            self.handle = self.loop.call_later(self.tick, self._tick)
+            
+    def stop(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+            
+    def add(self, entry):
+        self.discard(entry)
+        self._schedule(entry, entry.timeout_deadline())
+        
+    def discard(self, entry):
+        slot = self.entries.pop(entry, None)
+        if slot is not None:
+            self.wheel[slot].discard(entry)
+            
+    def _schedule(self, entry, deadline: float):
+        # çarkın turundan uzak son tarihler en uzak yuvaya konur, geldiğinde tekrar yerleşir
+        ticks = math.ceil((deadline - self.current_time) / self.tick)
+        ticks = min(max(ticks, 1), len(self.wheel) - 1)
+        slot = (self.position + ticks) % len(self.wheel)
+        self.wheel[slot].add(entry)
+        self.entries[entry] = slot
+        
+    def _tick(self):
+        now = time.monotonic()
+        steps = int((now - self.current_time) // self.tick)
+        expired = []
+        
+        # event loop gecikmesinde kaçırılan yuvalar da taranır (en fazla bir tur)
+        for _ in range(min(steps, len(self.wheel))):
+            self.position = (self.position + 1) % len(self.wheel)
+            self.current_time += self.tick
+            bucket = self.wheel[self.position]
+            if not bucket:
+                continue
+            self.wheel[self.position] = set()
+            
+            for entry in bucket:
+                del self.entries[entry]
+                deadline = entry.timeout_deadline()
+                if deadline <= now:
+                    expired.append(entry)
+                else:
+                    self.stats['rescheduled'] += 1
+                    self._schedule(entry, deadline)
+                    
+        if steps > len(self.wheel):
+            self.current_time += (steps - len(self.wheel)) * self.tick
+            
+        for entry in expired:
+            self.stats['expired'] += 1
+            try:
+                entry.timeout_expired()
+            except Exception as e:
+                self.logger.error(f"Zaman aşımı kapatma hatası: {e}")
+                
+        self.handle = self.loop.call_later(max(self.current_time + self.tick - now, 0), self._tick)
+        
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'tracked': len(self.entries)}
+
+
+# SSH ve Telnet bağlantılarının boşta kalma ve en uzun oturum süresi denetimi
+idle_reaper = TimerWheel(
+    tick=HONEYPOT_CONFIG['security']['timer_wheel']['tick'],
+    slots=HONEYPOT_CONFIG['security']['timer_wheel']['slots']
+)